@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+__title__   = "Clear Highlight"
+__doc__ = """Version = 1.0
+Date    = 17.10.2026
+_____________________________________________________________________
+Description:
+Remove the red highlight of Line Continuity and Room Separation
+Continuity in one click. Both tools highlight their results with a
+selection filter; deleting the filters removes the highlight from
+every view at once and leaves no element overrides behind.
+_____________________________________________________________________
+How-to:
+
+-> Click on the button
+_____________________________________________________________________
+Last update:
+- [17.10.2026] - 1.0 RELEASE
+_____________________________________________________________________
+Author: Nizar Gharib
+"""
+
+# ╦╔╦╗╔═╗╔═╗╦═╗╔╦╗╔═╗
+# ║║║║╠═╝║ ║╠╦╝ ║ ╚═╗
+# ╩╩ ╩╩  ╚═╝╩╚═ ╩ ╚═╝ IMPORTS
+#==================================================
+from Autodesk.Revit.DB import *
+from pyrevit import forms
+
+# Custom
+from Snippets._highlight import clear_highlights, highlight_filters
+
+# ╦  ╦╔═╗╦═╗╦╔═╗╔╗ ╦  ╔═╗╔═╗
+# ╚╗╔╝╠═╣╠╦╝║╠═╣╠╩╗║  ║╣ ╚═╗
+#  ╚╝ ╩ ╩╩╚═╩╩ ╩╚═╝╩═╝╚═╝╚═╝ VARIABLES
+#==================================================
+doc = __revit__.ActiveUIDocument.Document  # type: Document
+
+# ╔╦╗╔═╗╦╔╗╔
+# ║║║╠═╣║║║║
+# ╩ ╩╩ ╩╩╝╚╝ MAIN
+#==================================================
+if not highlight_filters(doc):
+    forms.alert("No highlight filters found.", exitscript=True)
+
+t = Transaction(doc, "Clear QAQC Highlight")
+t.Start()
+try:
+    removed = clear_highlights(doc)
+    t.Commit()
+except Exception:
+    t.RollBack()
+    raise
+print("Removed {} highlight filter(s).".format(removed))
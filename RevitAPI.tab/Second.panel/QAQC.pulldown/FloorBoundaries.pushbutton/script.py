@@ -1,86 +1,202 @@
 # -*- coding: utf-8 -*-
 __title__ = "Split Floor Boundaries"
-__doc__ = """Splits multi-boundary floor into individual floor elements."""
+__doc__ = """Splits multi-boundary floor into individual floor elements.
+The loops of the top face are nested into islands and holes: every outer
+island becomes one floor that keeps its own holes. Instance parameter
+values (height offset included, Mark excluded) are copied from the
+original floor to every new one, and colinear
+edge runs / sub-tolerance edges are simplified away before creation.
+
+Pick Floor  : split one picked floor.
+All Floors  : split every multi-island floor in the project, inside one
+              transaction group.
+
+Shift+Click: probe every floor in the active view before picking, so the
+first hover over each floor is instant too."""
 
 from Autodesk.Revit.DB import *
 from Autodesk.Revit.UI.Selection import *
-from pyrevit import forms
+from pyrevit import forms, script
 import clr
 clr.AddReference("System")
 from System.Collections.Generic import List
 
+# Custom
+from Snippets._geocache import probe_cache, change_token
+from Snippets._shared   import document_key
+from Snippets._snapshot import id_value
+from Snippets._loops    import islands, simplify_curve_loops
+from Snippets._params   import ParameterTransfer
+
 # Revit document context
 uidoc = __revit__.ActiveUIDocument
 doc = uidoc.Document
 selection = uidoc.Selection
+app = __revit__.Application
+output = script.get_output()
+
+MODE_PICK = "Pick Floor"
+MODE_ALL  = "All Floors"
+
+# floor topology probes, cached by element id and change token between hovers and runs
+cache = probe_cache(document_key(doc), "FloorBoundaries.islands")
+FLOORS = int(BuiltInCategory.OST_Floors)
+# writable instance parameters, planned once per floor type
+transfer = ParameterTransfer()
+
+
+def top_face_loops(floor):
+    """Edge loops of the floor's top face(s)."""
+    loops = []
+    try:
+        for ref in HostObjectUtils.GetTopFaces(floor):
+            face = floor.GetGeometryObjectFromReference(ref)
+            if face is not None:
+                loops.extend(face.GetEdgesAsCurveLoops())
+    except Exception:
+        loops = []
+    if loops:
+        return loops
+
+    # fallback: horizontal faces pointing up on the first solid
+    for obj in floor.get_Geometry(Options()):
+        if isinstance(obj, Solid):
+            for face in obj.Faces:
+                normal = face.ComputeNormal(UV(0.5, 0.5))  # sample midpoint
+                if abs(normal.Z - 1.0) < 0.01:
+                    loops.extend(face.GetEdgesAsCurveLoops())
+            break  # we only need one solid
+    return loops
+
+
+def loop_points(loop):
+    """Loop as a list of (x, y), arcs and splines tessellated."""
+    pts = []
+    for crv in loop:
+        pts.extend((p.X, p.Y) for p in list(crv.Tessellate())[:-1])
+    return pts
+
+
+def split_plan(loops):
+    """One profile per outer island: [outer CurveLoop, hole CurveLoops...]."""
+    polygons = [loop_points(loop) for loop in loops]
+    return [[loops[outer]] + [loops[h] for h in holes] for outer, holes in islands(polygons)]
+
 
-# Selection filter for Floors with multiple boundary loops
+def island_count(floor):
+    """Number of outer islands of the top face, holes not counted (as split_plan)."""
+    loops = top_face_loops(floor)
+    if len(loops) <= 1:
+        return len(loops)
+    return len(split_plan(loops))
+
+
+def has_multiple_islands(element):
+    """Memoized probe: only the first visit of an (unchanged) floor reads geometry."""
+    return cache.get(id_value(element.Id), change_token(element), lambda: island_count(element)) > 1
+
+
+# Selection filter for Floors with more than one island
 class FloorSelectionFilter(ISelectionFilter):
     def AllowElement(self, element):
-        if element.Category.Id.IntegerValue == int(BuiltInCategory.OST_Floors):
-            options = Options()
-            geo = element.get_Geometry(options)
-            for obj in geo:
-                if isinstance(obj, Solid):
-                    loops = []
-                    for face in obj.Faces:
-                        edgeLoops = face.GetEdgesAsCurveLoops()
-                        if edgeLoops.Count > 1:
-                            return True
-        return False
+        category = element.Category
+        if category is None or category.Id.IntegerValue != FLOORS:
+            return False
+        return has_multiple_islands(element)
 
     def AllowReference(self, reference, position):
         return True
 
-# Ask user to pick a floor
-with forms.WarningBar(title='Pick Floor with multiple boundary loops'):
+
+def split_floor(floor, plan):
+    """Create one floor per island profile (simplified first), copy the
+    instance parameters and delete the original. Runs in its own
+    SubTransaction, so it must be called inside a Transaction: if any
+    island fails, the floor is rolled back and left as it was.
+    :return: (created count, error messages, edges removed)"""
+    floor_type_id = floor.GetTypeId()
+    level_id      = floor.LevelId
+    st = SubTransaction(doc)
+    st.Start()
     try:
-        ref_picked = selection.PickObject(ObjectType.Element, FloorSelectionFilter(), "Select a Floor")
-        floor = doc.GetElement(ref_picked)
-    except:
-        forms.alert("No valid Floor selected.", exitscript=True)
-
-# Get geometry and extract curve loops only from the top face
-options = Options()
-geometry = floor.get_Geometry(options)
-
-boundary_loops = []
-
-for obj in geometry:
-    if isinstance(obj, Solid):
-        for face in obj.Faces:
-            normal = face.ComputeNormal(UV(0.5, 0.5))  # sample midpoint
-            # Only include horizontal top face (normal pointing up)
-            if abs(normal.Z - 1.0) < 0.01:
-                loops = face.GetEdgesAsCurveLoops()
-                for loop in loops:
-                    # Avoid duplicate loops by checking for uniqueness (optional, but safe)
-                    if loop not in boundary_loops:
-                        boundary_loops.append(loop)
-        break  # we only need one solid
-
-
-if len(boundary_loops) <= 1:
-    forms.alert("Selected floor has only one boundary. Nothing to split.", exitscript=True)
-
-# Start transaction
-t = Transaction(doc, "Split Floor Boundaries")
-t.Start()
-
-# Get properties to recreate floors
-floor_type_id = floor.GetTypeId()
-level_id = floor.LevelId
-
-# Create a new floor for each loop
-for loop in boundary_loops:
+        created, removed = [], 0
+        for profile in plan:
+            profile, n = simplify_curve_loops(profile, app.ShortCurveTolerance)
+            removed += n
+            created.append(Floor.Create(doc, List[CurveLoop](profile), floor_type_id, level_id))
+        transfer.copy(floor, created)
+        doc.Delete(floor.Id)
+        st.Commit()
+    except Exception as e:
+        st.RollBack()
+        return 0, [str(e)], 0
+    return len(created), [], removed
+
+
+# Ask how to run
+mode = forms.alert("Split multi-boundary floors:", options=[MODE_PICK, MODE_ALL], exitscript=True)
+
+if mode == MODE_PICK:
+    # Pre-warm: probe all floors in the view up front
+    if __shiftclick__:
+        for el in FilteredElementCollector(doc, doc.ActiveView.Id).OfCategory(BuiltInCategory.OST_Floors) \
+                .WhereElementIsNotElementType():
+            has_multiple_islands(el)
+
+    # Ask user to pick a floor
+    with forms.WarningBar(title='Pick Floor with more than one island'):
+        try:
+            ref_picked = selection.PickObject(ObjectType.Element, FloorSelectionFilter(), "Select a Floor")
+            floor = doc.GetElement(ref_picked)
+        except:
+            forms.alert("No valid Floor selected.", exitscript=True)
+
+    plan = split_plan(top_face_loops(floor))
+    if len(plan) <= 1:
+        forms.alert("Selected floor has only one island. Nothing to split.", exitscript=True)
+
+    t = Transaction(doc, "Split Floor Boundaries")
+    t.Start()
     try:
-        new_loops = List[CurveLoop]()
-        new_loops.Add(loop)
-        Floor.Create(doc, new_loops, floor_type_id, level_id)
+        created, errors, removed = split_floor(floor, plan)
+        t.Commit()
     except Exception as e:
+        t.RollBack()
+        created, errors, removed = 0, [str(e)], 0
+    for e in errors:
         print("Error creating floor:", e)
+    print("Created {} floors from {} islands ({} redundant edges removed).".format(created, len(plan), removed))
+
+else:
+    # single collector pass; the cached probe skips single-island floors cheaply
+    plans = []
+    for floor in FilteredElementCollector(doc).OfClass(Floor):
+        if not has_multiple_islands(floor):
+            continue
+        plan = split_plan(top_face_loops(floor))
+        if len(plan) > 1:
+            plans.append((floor, plan))
+    if not plans:
+        forms.alert("No floors with more than one island found.", exitscript=True)
 
-# Optional: Delete original floor
-doc.Delete(floor.Id)
+    rows = []
+    tg = TransactionGroup(doc, "Split Floor Boundaries - All Floors")
+    tg.Start()
+    for floor, plan in plans:
+        floor_id = floor.Id
+        t = Transaction(doc, "Split Floor {}".format(id_value(floor_id)))
+        t.Start()
+        try:
+            created, errors, removed = split_floor(floor, plan)
+            t.Commit()
+        except Exception as e:
+            t.RollBack()
+            created, errors, removed = 0, [str(e)], 0
+        rows.append([output.linkify(floor_id), len(plan), sum(len(p) - 1 for p in plan), created, removed,
+                     "; ".join(errors)])
+    tg.Assimilate()
 
-t.Commit()
+    output.print_table(table_data=rows, title="Split Floor Boundaries",
+                       columns=["Floor", "Islands", "Holes", "Created", "Edges removed", "Errors"])
+    print("Split {} floors into {} new floors, {} redundant edges removed.".format(
+        len(plans), sum(row[3] for row in rows), sum(row[4] for row in rows)))
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+__title__   = "Floor Mutual Edges"
+__doc__ = """Version = 2.0
+Date    = 17.10.2026
+_____________________________________________________________________
+Description:
+Project-wide check of the edges floors share. The top-face edges of
+every floor go into one edge index and each pair of floors is reported:
+
+coincident : the edges match end to end
+near       : both ends within the tolerance - a small gap or misalignment
+overlap    : colinear edges sharing part of their length without
+             matching end to end (one long edge against shorter ones)
+
+💡 Snap mode edits the sketches so near edges become exact: the floor
+with the higher id moves its sketch vertices onto the other floor.
+_____________________________________________________________________
+How-to:
+
+-> Click on the button
+-> Enter the near tolerance in mm
+-> Review the report, then choose whether to snap
+_____________________________________________________________________
+Last update:
+- [17.10.2026] - 2.0 Project-wide edge index replaces the single-floor
+                 C# command (which did not compile)
+_____________________________________________________________________
+Author: Nizar Gharib
+"""
+
+# ╦╔╦╗╔═╗╔═╗╦═╗╔╦╗╔═╗
+# ║║║║╠═╝║ ║╠╦╝ ║ ╚═╗
+# ╩╩ ╩╩  ╚═╝╩╚═ ╩ ╚═╝ IMPORTS
+#==================================================
+from Autodesk.Revit.DB import *
+from pyrevit import forms, script
+
+# Custom
+from Snippets._snapshot import CurveSnapshot, id_value
+from Snippets._spatial  import EndpointIndex
+from Snippets._edges    import mutual_edges, snap_moves, NEAR, OVERLAP, MM
+
+# ╦  ╦╔═╗╦═╗╦╔═╗╔╗ ╦  ╔═╗╔═╗
+# ╚╗╔╝╠═╣╠╦╝║╠═╣╠╩╗║  ║╣ ╚═╗
+#  ╚╝ ╩ ╩╩╚═╩╩ ╩╚═╝╩═╝╚═╝╚═╝ VARIABLES
+#==================================================
+uidoc  = __revit__.ActiveUIDocument
+doc    = __revit__.ActiveUIDocument.Document  # type: Document
+app    = __revit__.Application
+output = script.get_output()
+
+SKETCH_TOLERANCE = 1.0e-6   # feet. Plan distance between a face vertex and its sketch vertex.
+
+# ╔═╗╦  ╔═╗╔═╗╔═╗╔═╗╔═╗
+# ║  ║  ╠═╣╚═╗╚═╗║╣ ╚═╗
+# ╚═╝╩═╝╩ ╩╚═╝╚═╝╚═╝╚═╝ CLASSES
+#==================================================
+class SwallowWarnings(IFailuresPreprocessor):
+    """Let sketch edits through their warnings (joins, overlaps)."""
+    def PreprocessFailures(self, accessor):
+        for failure in accessor.GetFailureMessages():
+            if failure.GetSeverity() == FailureSeverity.Warning:
+                accessor.DeleteWarning(failure)
+        return FailureProcessingResult.Continue
+
+# ╔═╗╦ ╦╔═╗╔╗╔╔╦╗╦╔═╗╔╗╔╔═╗
+# ╠╣ ║ ║║  ║║║ ║ ║║ ║║║║╚═╗
+# ╚  ╚═╝╚═╝╝╚╝ ╩ ╩╚═╝╝╚╝╚═╝ HELPERS
+#==================================================
+def read_edges(floors):
+    """Straight top-face edges of all floors, one row per edge, id = floor id."""
+    snapshot = CurveSnapshot()
+    for floor in floors:
+        try:
+            refs = HostObjectUtils.GetTopFaces(floor)
+        except Exception:
+            continue
+        for ref in refs:
+            face = floor.GetGeometryObjectFromReference(ref)
+            if face is None:
+                continue
+            for loop in face.GetEdgesAsCurveLoops():
+                for crv in loop:
+                    if isinstance(crv, Line):
+                        p0, p1 = crv.GetEndPoint(0), crv.GetEndPoint(1)
+                        snapshot.append(id_value(floor.Id), (p0.X, p0.Y, p0.Z), (p1.X, p1.Y, p1.Z))
+    return snapshot
+
+
+def snap_floor(floor, moves):
+    """Move the floor's sketch vertices found in `moves` ([(from, to)], plan
+    positions from the top face). Uses a SketchEditScope, so it must run
+    outside of a Transaction.
+    :return: number of sketch lines changed"""
+    index = EndpointIndex(SKETCH_TOLERANCE)
+    for k, (src, _dst) in enumerate(moves):
+        index.insert(src[0], src[1], 0.0, k)
+
+    def moved(p):
+        found = index.query(p.X, p.Y, 0.0)
+        if not found:
+            return p
+        dst = moves[found[0]][1]
+        return XYZ(dst[0], dst[1], p.Z)
+
+    scope = SketchEditScope(doc, "Snap Floor Edges")
+    scope.Start(floor.SketchId)
+    t = Transaction(doc, "Snap Sketch Lines")
+    t.Start()
+    changed = 0
+    try:
+        sketch = doc.GetElement(floor.SketchId)
+        for el_id in sketch.GetAllElements():
+            el  = doc.GetElement(el_id)
+            crv = getattr(el, "GeometryCurve", None)
+            if not isinstance(crv, Line):
+                continue
+            p0, p1 = crv.GetEndPoint(0), crv.GetEndPoint(1)
+            q0, q1 = moved(p0), moved(p1)
+            if (q0 is p0 and q1 is p1) or q0.DistanceTo(q1) <= app.ShortCurveTolerance:
+                continue
+            el.SetGeometryCurve(Line.CreateBound(q0, q1), True)
+            changed += 1
+        t.Commit()
+        scope.Commit(SwallowWarnings())
+    except Exception:
+        if t.HasStarted() and not t.HasEnded():
+            t.RollBack()
+        scope.Cancel()
+        raise
+    return changed
+
+# ╔╦╗╔═╗╦╔╗╔
+# ║║║╠═╣║║║║
+# ╩ ╩╩ ╩╩╝╚╝ MAIN
+#==================================================
+tol_mm = forms.ask_for_string(default="10", prompt="Near tolerance (mm):", title=__title__)
+try:
+    near = float(tol_mm) * MM
+except (TypeError, ValueError):
+    forms.alert("Near tolerance must be a number.", exitscript=True)
+
+# one collector pass, one edge index for the whole project
+floors   = list(FilteredElementCollector(doc).OfClass(Floor).WhereElementIsNotElementType())
+snapshot = read_edges(floors)
+if not len(snapshot):
+    forms.alert("No floor edges found.", exitscript=True)
+
+owners = snapshot.ids
+found  = mutual_edges(snapshot.cols, owners, near=near)
+if not found:
+    forms.alert("No shared edges between {} floors.".format(len(floors)), exitscript=True)
+
+#>>>>>>>>>> REPORT
+# one row per pair of floors and kind
+pairs = {}
+for kind, i, j, value in found:
+    a, b = sorted((int(owners[i]), int(owners[j])))
+    entry = pairs.setdefault((a, b, kind), [0, 0.0])
+    entry[0] += 1
+    entry[1] = max(entry[1], value)
+
+rows = []
+for (a, b, kind), (count, value) in sorted(pairs.items()):
+    measure = "{:.1f} mm length".format(value / MM) if kind == OVERLAP else "{:.2f} mm".format(value / MM)
+    rows.append([output.linkify(ElementId(a)), output.linkify(ElementId(b)), kind, count, measure])
+
+output.print_md("## Floor Mutual Edges - {} floors, {} edges".format(len(floors), len(snapshot)))
+output.print_table(table_data=rows, columns=["Floor", "Floor", "Kind", "Edges", "Max gap / shared"])
+for kind in sorted(set(k for k, _i, _j, _v in found)):
+    print("{}: {} edge pairs".format(kind, sum(1 for f in found if f[0] == kind)))
+
+#>>>>>>>>>> SNAP
+near_count = sum(1 for f in found if f[0] == NEAR)
+if near_count and forms.alert("Snap {} near edge pairs to make them exact?".format(near_count), yes=True, no=True):
+    moves = snap_moves(snapshot.cols, owners, found)
+    tg = TransactionGroup(doc, "Snap Floor Mutual Edges")
+    tg.Start()
+    snapped, skipped = 0, []
+    for owner, floor_moves in moves.items():
+        floor = doc.GetElement(ElementId(int(owner)))
+        try:
+            snapped += snap_floor(floor, floor_moves)
+        except Exception as e:
+            skipped.append((owner, str(e)))
+    tg.Assimilate()
+    print("Snapped {} sketch lines on {} floors.".format(snapped, len(moves) - len(skipped)))
+    for owner, why in skipped:
+        print(" - skipped {}: {}".format(owner, why))
@@ -1,68 +1,92 @@
-# pyRevit script: Match floor subelement points to Toposolid surface
+# pyRevit script: Match floor shape points to Toposolid surface
 # Requires Revit 2024+ for Toposolid API
 
 from Autodesk.Revit.DB import *
 from Autodesk.Revit.UI.Selection import ObjectType
 
+from Snippets._tin       import TIN
+from Snippets._meshcache import cached_tin
+from Snippets._geocache  import change_token
+
 doc = __revit__.ActiveUIDocument.Document
 uidoc = __revit__.ActiveUIDocument
 
 
 # -------------------------------------------------------------
-# Extract triangulated points from Toposolid geometry
+# Extract triangulated meshes from the Toposolid's top faces
 # -------------------------------------------------------------
-def get_toposolid_points(toposolid):
+def is_top_face(face):
+    """Face pointing up at the middle of its UV box."""
+    box = face.GetBoundingBox()
+    mid = UV((box.Min.U + box.Max.U) / 2.0, (box.Min.V + box.Max.V) / 2.0)
+    return face.ComputeNormal(mid).Z > 0.0
+
+
+def get_toposolid_meshes(toposolid):
+    """Triangulated top faces only: sides and bottom would hand their Z to
+    the nearest-vertex fallback for points just off the surface."""
+    meshes = []
+    try:
+        refs = HostObjectUtils.GetTopFaces(toposolid)
+    except Exception:
+        refs = []
+    for ref in refs:
+        face = toposolid.GetGeometryObjectFromReference(ref)
+        if face is not None:
+            meshes.append(face.Triangulate())
+    if any(mesh.NumTriangles for mesh in meshes):
+        return meshes
+
+    # fallback: upward faces of the solids
     opts = Options()
     opts.ComputeReferences = True
     opts.IncludeNonVisibleObjects = True
     geo_elem = toposolid.get_Geometry(opts)
 
-    points = []
+    meshes = []
     for geo_obj in geo_elem:
         solid = geo_obj if isinstance(geo_obj, Solid) else None
         if not solid or solid.Faces.Size == 0:
             continue
 
         for face in solid.Faces:
-            mesh = face.Triangulate()
-            for i in range(mesh.Vertices.Count):
-                pt = mesh.Vertices[i]
-                points.append(pt)
+            if is_top_face(face):
+                meshes.append(face.Triangulate())   # keep the triangles, not only the vertices
 
-    if not points:
+    if not any(mesh.NumTriangles for mesh in meshes):
         raise Exception("No triangulated geometry found on Toposolid")
 
-    return points
-
-
-# -------------------------------------------------------------
-# Find nearest Z from triangulated Toposolid vertices
-# -------------------------------------------------------------
-def get_nearest_z_from_points(points, x, y):
-    min_dist = float('inf')
-    nearest_z = None
-    for pt in points:
-        dist = ((pt.X - x)**2 + (pt.Y - y)**2)**0.5
-        if dist < min_dist:
-            min_dist = dist
-            nearest_z = pt.Z
-    return nearest_z
+    return meshes
 
 
 # -------------------------------------------------------------
-# Match floor subelements to Toposolid surface
+# Match floor shape points to Toposolid surface
 # -------------------------------------------------------------
-def match_floor_subelements_to_toposolid(floor, points):
-    for subelem_id in floor.SlabShapeEditor():
-        subelem = doc.GetElement(subelem_id)
-        if hasattr(subelem, "GetPoints") and hasattr(subelem, "SetPoints"):
-            pts = subelem.GetPoints()
-            new_pts = []
-            for pt in pts:
-                x, y = pt.X, pt.Y
-                new_z = get_nearest_z_from_points(points, x, y)
-                new_pts.append(XYZ(x, y, new_z))
-            subelem.SetPoints(new_pts)
+def match_floor_subelements_to_toposolid(floor, tin):
+    """Move every shape vertex of the floor (boundary corners and points
+    already added) onto the surface. Shape editing is enabled if needed.
+    :return: number of vertices moved"""
+    editor = floor.SlabShapeEditor
+    if editor is None:
+        return 0
+    if not editor.IsEnabled:
+        editor.Enable()
+    vertices = list(editor.SlabShapeVertices)
+    if not vertices:
+        return 0
+
+    # one batch query for every point of the floor; points off the
+    # surface fall back to the nearest Toposolid vertex
+    xs = [v.Position.X for v in vertices]
+    ys = [v.Position.Y for v in vertices]
+    zs = tin.heights(xs, ys, outside="nearest")
+
+    # shape offsets are relative to the unmodified top of the floor
+    level = doc.GetElement(floor.LevelId)
+    top   = level.ProjectElevation + floor.get_Parameter(BuiltInParameter.FLOOR_HEIGHTABOVELEVEL_PARAM).AsDouble()
+    for vertex, z in zip(vertices, zs):
+        editor.ModifySubElement(vertex, float(z) - top)
+    return len(vertices)
 
 
 # -------------------------------------------------------------
@@ -85,7 +109,10 @@ def main():
     # Pick Toposolid
     toposolid_ref = uidoc.Selection.PickObject(ObjectType.Element, "Pick Toposolid")
     toposolid = doc.GetElement(toposolid_ref)
-    points = get_toposolid_points(toposolid)
+    # triangulated surface with its triangle index, shared by every floor;
+    # read from the on-disk cache while the Toposolid is unchanged
+    tin, _ = cached_tin(toposolid.UniqueId, "top faces|{}".format(change_token(toposolid)),
+                        lambda: TIN.from_meshes(get_toposolid_meshes(toposolid)))
 
     # Pick Floors
     floors = pick_multiple_floors()
@@ -93,7 +120,7 @@ def main():
     with Transaction(doc, "Match Floor Subelements to Toposolid") as t:
         t.Start()
         for floor in floors:
-            match_floor_subelements_to_toposolid(floor, points)
+            match_floor_subelements_to_toposolid(floor, tin)
         t.Commit()
 
 
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+__title__   = "Gap Finder"
+__doc__ = """Version = 1.0
+Date    = 17.10.2026
+_____________________________________________________________________
+Description:
+Find the near-miss gaps (1-5 mm) that break room boundaries and line
+networks: every dangling endpoint of a Room Separation / Detail Line
+that has another endpoint within the tolerance is reported.
+
+💡 Heal mode snaps those endpoints together in one transaction.
+A dangling endpoint snaps onto a connected endpoint if there is one,
+otherwise the dangling endpoints meet half way.
+_____________________________________________________________________
+How-to:
+
+-> Click on the button
+-> Choose Room Separation Lines or Detail Lines
+-> Enter the gap tolerance in mm
+-> Review the report, then choose whether to heal
+_____________________________________________________________________
+Last update:
+- [17.10.2026] - 1.0 RELEASE
+_____________________________________________________________________
+Author: Nizar Gharib
+"""
+
+# ╦╔╦╗╔═╗╔═╗╦═╗╔╦╗╔═╗
+# ║║║║╠═╝║ ║╠╦╝ ║ ╚═╗
+# ╩╩ ╩╩  ╚═╝╩╚═ ╩ ╚═╝ IMPORTS
+#==================================================
+from Autodesk.Revit.DB import *
+from pyrevit import forms, script
+
+# Custom
+from Snippets._snapshot import CurveSnapshot
+from Snippets._gaps     import find_gaps, heal_positions, endpoint, MM
+
+# ╦  ╦╔═╗╦═╗╦╔═╗╔╗ ╦  ╔═╗╔═╗
+# ╚╗╔╝╠═╣╠╦╝║╠═╣╠╩╗║  ║╣ ╚═╗
+#  ╚╝ ╩ ╩╩╚═╩╩ ╩╚═╝╩═╝╚═╝╚═╝ VARIABLES
+#==================================================
+uidoc  = __revit__.ActiveUIDocument
+doc    = __revit__.ActiveUIDocument.Document  # type: Document
+app    = __revit__.Application
+view   = doc.ActiveView
+output = script.get_output()
+
+ROOM_SEPARATION = "Room Separation Lines"
+DETAIL_LINES    = "Detail Lines"
+
+# ╔═╗╦ ╦╔═╗╔╗╔╔╦╗╦╔═╗╔╗╔╔═╗
+# ╠╣ ║ ║║  ║║║ ║ ║║ ║║║║╚═╗
+# ╚  ╚═╝╚═╝╝╚╝ ╩ ╩╚═╝╝╚╝╚═╝ HELPERS
+#==================================================
+def collect_lines(kind):
+    """Lines of the chosen kind in the active view."""
+    if kind == ROOM_SEPARATION:
+        return list(FilteredElementCollector(doc, view.Id)
+                    .OfCategory(BuiltInCategory.OST_RoomSeparationLines)
+                    .WhereElementIsNotElementType()
+                    .ToElements())
+    return [e for e in FilteredElementCollector(doc, view.Id).OfClass(CurveElement).ToElements()
+            if isinstance(e, DetailCurve)]
+
+
+def heal(snapshot, moves):
+    """Move the endpoints in `moves` ({end_id: (x, y, z)}). Must run inside a Transaction.
+    :return: (healed segment count, [(element id value, reason)] skipped)"""
+    by_segment = {}
+    for end_id, target in moves.items():
+        by_segment.setdefault(end_id >> 1, {})[end_id & 1] = target
+
+    healed, skipped = 0, []
+    for seg, ends in by_segment.items():
+        el_id = int(snapshot.ids[seg])
+        el    = doc.GetElement(ElementId(el_id))
+        crv   = el.GeometryCurve if el is not None else None
+        if not isinstance(crv, Line):
+            skipped.append((el_id, "not a straight line"))
+            continue
+        p0 = XYZ(*ends.get(0, snapshot.start(seg)))
+        p1 = XYZ(*ends.get(1, snapshot.end(seg)))
+        if p0.DistanceTo(p1) <= app.ShortCurveTolerance:
+            skipped.append((el_id, "would become too short"))
+            continue
+        try:
+            el.SetGeometryCurve(Line.CreateBound(p0, p1), True)
+            healed += 1
+        except Exception as e:
+            skipped.append((el_id, str(e)))
+    return healed, skipped
+
+
+# ╔╦╗╔═╗╦╔╗╔
+# ║║║╠═╣║║║║
+# ╩ ╩╩ ╩╩╝╚╝ MAIN
+#==================================================
+kind = forms.alert("Find near-miss gaps between:", options=[ROOM_SEPARATION, DETAIL_LINES], exitscript=True)
+
+tol_mm = forms.ask_for_string(default="5", prompt="Gap tolerance (mm):", title=__title__)
+try:
+    gap_tolerance = float(tol_mm) * MM
+except (TypeError, ValueError):
+    forms.alert("Gap tolerance must be a number.", exitscript=True)
+
+snapshot = CurveSnapshot.from_elements(collect_lines(kind))
+if not len(snapshot):
+    forms.alert("No {} found in the active view.".format(kind), exitscript=True)
+
+cols = snapshot.cols
+gaps = find_gaps(cols, gap_tolerance)
+if not gaps:
+    forms.alert("No gaps up to {} mm found between {} {}.".format(tol_mm, len(snapshot), kind), exitscript=True)
+
+#>>>>>>>>>> REPORT
+output.print_md("## Gap Finder - {} in '{}'".format(kind, view.Name))
+rows = []
+for end_id, other, dist in gaps:
+    x, y, z = endpoint(cols, end_id)
+    rows.append([output.linkify(ElementId(int(snapshot.ids[end_id >> 1]))),
+                 "end" if end_id & 1 else "start",
+                 output.linkify(ElementId(int(snapshot.ids[other >> 1]))),
+                 "{:.2f}".format(dist / MM),
+                 "({:.3f}, {:.3f})".format(x, y)])
+output.print_table(table_data=rows, columns=["Element", "End", "Nearest", "Gap (mm)", "Location (ft)"])
+print("{} dangling endpoints with a neighbour within {} mm.".format(len(gaps), tol_mm))
+
+#>>>>>>>>>> HEAL
+if forms.alert("Snap {} endpoints together?".format(len(gaps)), yes=True, no=True):
+    moves = heal_positions(cols, gaps)
+    t = Transaction(doc, "Heal Line Gaps")
+    t.Start()
+    try:
+        healed, skipped = heal(snapshot, moves)
+        t.Commit()
+    except Exception:
+        t.RollBack()
+        raise
+    print("Healed {} lines ({} endpoints moved).".format(healed, len(moves)))
+    for el_id, why in skipped:
+        print(" - skipped {}: {}".format(el_id, why))
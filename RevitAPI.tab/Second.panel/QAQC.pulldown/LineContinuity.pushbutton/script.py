@@ -1,27 +1,38 @@
 # -*- coding: utf-8 -*-
-__title__   = "Split Floors with Line"
-__doc__ = """Version = 1.0
-Date    = 25.08.2025
+__title__   = "Line Continuity"
+__doc__ = """Version = 1.1
+Date    = 17.10.2026
 _____________________________________________________________________
 Description:
-Split Selected Floors with a Detail Line.
+Merge colinear lines in the active view that touch, overlap or contain
+each other into single lines, and co-circular arcs into single arcs
+(fragmented arcs from DWG cleanup), and highlight the merged lines in red
+through one selection filter - use Clear Highlight to remove it.
 
-💡 The selected Detail Line defines an infinite vertical cutting plane.
-The script cuts each floor's solid and creates two new floors from the
-resulting top faces, preserving FloorType and Level.
+💡 Lines are partitioned by Line Style and by detail / model curve first,
+so merges never cross styles and every partition stays small.
+A per-style summary is printed while the partitions are processed.
 
+💡 Dry Run modes open no transaction: every group that would merge is
+streamed to a .jsonl / .csv file (ids, merged extent, removed count).
+"All Views" scans the model curves once and the detail curves of every
+view, one view at a time, so memory stays flat on large projects.
+
+💡 The analysis of the active view is kept between runs and updated from
+the document changes, so a re-check only looks at the lines that changed.
+Shift+Click to rebuild it from scratch.
 _____________________________________________________________________
 How-to:
 
+-> Open the view to clean up
 -> Click on the button
--> Select Floors
--> Select Detail Line
+-> Choose Merge, or a Dry Run and the file to write
 _____________________________________________________________________
-To-Do?:
-- Copy instance parameters from original floor to new floors
-- Handle sloped floors with non-planar top faces
+Last update:
+- [17.10.2026] - 1.1 Style-partitioned merging with per-style summary, dry run,
+                 filter highlight, incremental re-check, co-circular arcs
 _____________________________________________________________________
-Author: (based on Erik Frits' original FR splitter idea)
+Author: Nizar Gharib
 """
 
 # ╦╔╦╗╔═╗╔═╗╦═╗╔╦╗╔═╗
@@ -30,7 +41,20 @@ Author: (based on Erik Frits' original FR splitter idea)
 #==================================================
 from Autodesk.Revit.DB import *
 from Autodesk.Revit.UI.Selection import *
-from pyrevit import forms
+from pyrevit import forms, script
+
+# Custom
+from Snippets._snapshot   import CurveSnapshot, ArcSnapshot, NO_ID, id_value, plane_frame
+from Snippets._continuity import (colinear_families, colinear_merge_pairs, connected_groups, merged_extent,
+                                  group_records, arc_families, arc_merge_pairs, merged_arc, arc_group_records)
+from Snippets._records    import RecordWriter
+from Snippets._highlight  import highlight
+from Snippets._incremental import tracked_index, document_key, ContinuityIndex, ArcIndex
+
+#.NET
+import clr
+clr.AddReference('System')
+from System.Collections.Generic import List
 
 # ╦  ╦╔═╗╦═╗╦╔═╗╔╗ ╦  ╔═╗╔═╗
 # ╚╗╔╝╠═╣╠╦╝║╠═╣╠╩╗║  ║╣ ╚═╗
@@ -40,196 +64,240 @@ uidoc = __revit__.ActiveUIDocument
 doc   = __revit__.ActiveUIDocument.Document  # type: Document
 app   = __revit__.Application
 selection = uidoc.Selection                  # type: Selection
+output    = script.get_output()
 
+MODE_MERGE     = "Merge"
+MODE_DRY_VIEW  = "Dry Run - Active View"
+MODE_DRY_ALL   = "Dry Run - All Views"
+RECORD_COLUMNS = ["view", "style", "kind", "ids", "count", "removed", "start", "end", "length"]
+LINE, ARC      = "line", "arc"
+HIGHLIGHT      = "Line Continuity"
+
+# Get the active view
+view = doc.ActiveView
 
 
 # ╔═╗╦ ╦╔═╗╔╗╔╔╦╗╦╔═╗╔╗╔╔═╗
 # ╠╣ ║ ║║  ║║║ ║ ║║ ║║║║╚═╗
 # ╚  ╚═╝╚═╝╝╚╝ ╩ ╩╚═╝╝╚╝╚═╝ HELPERS
 #==================================================
-# -*- coding: utf-8 -*-
+def _eid(value):
+    return ElementId(int(value))
 
-# Get the active view
-view = doc.ActiveView
-# red override
-ogs = OverrideGraphicSettings()
-ogs.SetProjectionLineColor(Color(255, 0, 0))
-
-# collect all CurveElements in the active view
-collector = FilteredElementCollector(doc, view.Id).OfClass(CurveElement).ToElements()
-lines = [e for e in collector if isinstance(e, CurveElement)]
-
-# find colinear + touching pairs and collect their ElementIds
-to_override = set()
-for i in range(len(lines)):
-    l1 = lines[i]
-    c1 = l1.GeometryCurve
-    if c1 is None: 
-        continue
-    try:
-        dir1 = (c1.GetEndPoint(1) - c1.GetEndPoint(0)).Normalize()
-    except:
-        continue
 
-    for j in range(i + 1, len(lines)):
-        l2 = lines[j]
-        c2 = l2.GeometryCurve
-        if c2 is None:
-            continue
-        try:
-            dir2 = (c2.GetEndPoint(1) - c2.GetEndPoint(0)).Normalize()
-        except:
-            continue
+def style_label(style_id, detail):
+    style = doc.GetElement(_eid(style_id)) if style_id != NO_ID else None
+    name  = style.Name if style is not None else "<No Style>"
+    return "{} ({})".format(name, "detail" if detail else "model")
 
-        # colinear (same or opposite direction)
-        if dir1.IsAlmostEqualTo(dir2) or dir1.IsAlmostEqualTo(dir2.Negate()):
-            touching = (
-                c1.GetEndPoint(0).IsAlmostEqualTo(c2.GetEndPoint(0)) or
-                c1.GetEndPoint(0).IsAlmostEqualTo(c2.GetEndPoint(1)) or
-                c1.GetEndPoint(1).IsAlmostEqualTo(c2.GetEndPoint(0)) or
-                c1.GetEndPoint(1).IsAlmostEqualTo(c2.GetEndPoint(1))
-            )
-            if touching:
-                to_override.add(l1.Id)
-                to_override.add(l2.Id)
-
-if not to_override:
-    forms.alert("No touching colinear lines found in the active view.", exitscript=True)
-
-# ...existing code...
-# apply overrides in a single transaction
-def _colinear_and_touching(c1, c2):
-    if c1 is None or c2 is None:
-        return False
-    try:
-        a0 = c1.GetEndPoint(0); a1 = c1.GetEndPoint(1)
-        b0 = c2.GetEndPoint(0); b1 = c2.GetEndPoint(1)
-    except:
-        return False
-    v1 = a1 - a0; v2 = b1 - b0
-    if v1.IsZeroLength() or v2.IsZeroLength():
-        return False
-    u1 = v1.Normalize(); u2 = v2.Normalize()
-    if not (u1.IsAlmostEqualTo(u2) or u1.IsAlmostEqualTo(u2.Negate())):
-        return False
-    return (a0.IsAlmostEqualTo(b0) or a0.IsAlmostEqualTo(b1) or a1.IsAlmostEqualTo(b0) or a1.IsAlmostEqualTo(b1))
-
-# map ids -> elements for the set we collected earlier
-proc_lines = [doc.GetElement(eid) for eid in to_override]
-if not proc_lines:
-    forms.alert("No touching colinear lines found in the active view.", exitscript=True)
-
-# build adjacency for connected components
-n = len(proc_lines)
-adj = [[] for _ in range(n)]
-for i in range(n):
-    for j in range(i + 1, n):
-        if _colinear_and_touching(proc_lines[i].GeometryCurve, proc_lines[j].GeometryCurve):
-            adj[i].append(j); adj[j].append(i)
-
-# find groups (connected components)
-visited = [False] * n
-groups = []
-for i in range(n):
-    if visited[i]:
-        continue
-    stack = [i]; group_idx = []
-    while stack:
-        cur = stack.pop()
-        if visited[cur]:
-            continue
-        visited[cur] = True
-        group_idx.append(cur)
-        for nb in adj[cur]:
-            if not visited[nb]:
-                stack.append(nb)
-    if len(group_idx) > 0:
-        groups.append([proc_lines[k] for k in group_idx])
 
-t = Transaction(doc, "Merge Colinear Touching Lines")
-t.Start()
-try:
-    new_ids = []
-    for grp in groups:
-        # collect endpoints from all curves in the group
-        pts = []
-        for el in grp:
-            c = el.GeometryCurve
-            if c is None: 
-                continue
-            pts.append(c.GetEndPoint(0)); pts.append(c.GetEndPoint(1))
-
-        if not pts:
-            continue
+def find_groups(snapshot, rows, kind=LINE):
+    """Colinear (or co-circular) groups to merge inside one style partition."""
+    cols = snapshot.cols
+    if kind == ARC:
+        # bucket the arcs by quantized plane, centre and radius, then sweep
+        # the angular intervals of each bucket
+        return connected_groups(arc_merge_pairs(cols, families=arc_families(cols, indices=rows)))
+    # bucket the rows into colinear families by their canonical line key,
+    # then sweep each family for touching, overlapping and contained segments
+    families = colinear_families(cols, indices=rows)
+    pairs    = colinear_merge_pairs(cols, families=families)
+    # find groups (connected components): union-find fed by the detected pairs
+    return connected_groups(pairs)
 
-        # choose a reference direction (first non-zero)
-        ref_dir = None; ref_origin = pts[0]
-        for el in grp:
-            c = el.GeometryCurve
-            if c is None:
-                continue
-            v = c.GetEndPoint(1) - c.GetEndPoint(0)
-            if not v.IsZeroLength():
-                ref_dir = v.Normalize()
-                ref_origin = c.GetEndPoint(0)
-                break
-        if ref_dir is None:
-            continue
 
-        # project endpoints onto ref_dir to find extremities
-        projections = [(p, (p - ref_origin).DotProduct(ref_dir)) for p in pts]
-        min_pt = min(projections, key=lambda x: x[1])[0]
-        max_pt = max(projections, key=lambda x: x[1])[0]
+def merged_curve(snapshot, grp, kind=LINE):
+    """The single Line / Arc replacing a group, straight from the snapshot -
+    no GeometryCurve calls. None if the group is degenerate."""
+    if kind == ARC:
+        merged = merged_arc(snapshot.cols, grp)
+        if merged is None:
+            return None
+        ref, start, end = merged
+        u, v  = plane_frame(snapshot.nx[ref], snapshot.ny[ref], snapshot.nz[ref])
+        plane = Plane.CreateByOriginAndBasis(XYZ(snapshot.cx[ref], snapshot.cy[ref], snapshot.cz[ref]), XYZ(*u), XYZ(*v))
+        return Arc.Create(plane, snapshot.r[ref], start, end)
+    extent = merged_extent(snapshot.cols, grp)
+    if extent is None:
+        return None
+    return Line.CreateBound(XYZ(*extent[0]), XYZ(*extent[1]))
 
-        # skip degenerate
-        if min_pt.IsAlmostEqualTo(max_pt):
-            continue
 
-        new_line = Line.CreateBound(min_pt, max_pt)
+def merge_group(snapshot, grp, style_id, detail, kind=LINE):
+    """Replace one group with a single curve. Must run inside a Transaction.
+    :return: created element or None"""
+    new_curve = merged_curve(snapshot, grp, kind)
+    if new_curve is None:
+        return None
 
-        # create a new detail curve in the active view (preferred)
+    # detail curves stay in the view, model curves stay on their sketch plane
+    created = None
+    try:
+        if detail:
+            created = doc.Create.NewDetailCurve(view, new_curve)
+        else:
+            first  = doc.GetElement(_eid(snapshot.ids[grp[0]]))
+            sketch = getattr(first, "SketchPlane", None) or getattr(view, "SketchPlane", None)
+            created = doc.Create.NewModelCurve(new_curve, sketch)
+    except Exception:
         created = None
-        first = grp[0]
-        try:
-            created = doc.Create.NewDetailCurve(view, new_line)
-        except Exception:
-            # fallback: try model curve if sketch plane is available
-            try:
-                sketch = getattr(first, "SketchPlane", None) or getattr(view, "SketchPlane", None)
-                if sketch is not None:
-                    created = doc.Create.NewModelCurve(new_line, sketch)
-                else:
-                    created = doc.Create.NewDetailCurve(view, new_line)
-            except Exception:
-                created = None
-
-        # copy line style from first segment (best effort)
-        try:
-            if created is not None and hasattr(created, "LineStyle") and hasattr(first, "LineStyle"):
-                created.LineStyle = first.LineStyle
-        except:
-            pass
-
-        if created is not None:
-            new_ids.append(created.Id)
-            # apply the same graphic override to the new merged line
+    if created is None:
+        return None
+
+    # the whole partition shares this line style
+    try:
+        if style_id != NO_ID:
+            created.LineStyle = doc.GetElement(_eid(style_id))
+    except:
+        pass
+
+    # delete originals
+    grp_ids = List[ElementId]([_eid(snapshot.ids[k]) for k in grp])
+    try:
+        doc.Delete(grp_ids)
+    except:
+        for el_id in grp_ids:
             try:
-                view.SetElementOverrides(created.Id, ogs)
+                doc.Delete(el_id)
             except:
                 pass
+    return created
+
+
+def read_curves(id_values):
+    """CurveSnapshot of the straight lines among the given element id values."""
+    return CurveSnapshot.from_elements([doc.GetElement(_eid(v)) for v in id_values], lines_only=True)
+
+
+def read_arcs(id_values):
+    """ArcSnapshot of the circular arcs among the given element id values."""
+    return ArcSnapshot.from_elements([doc.GetElement(_eid(v)) for v in id_values])
+
+
+def view_indexes():
+    """Persistent continuity indexes of the active view, {LINE: index, ARC: index}.
+    Only the elements that were added, deleted or changed since the last run
+    are read and re-examined. Shift+Click rebuilds them from scratch."""
+    doc_key = document_key(doc)
+    current = [id_value(el_id) for el_id in FilteredElementCollector(doc, view.Id).OfClass(CurveElement).ToElementIds()]
+    indexes = {}
+    for kind, index_class, read in ((LINE, ContinuityIndex, read_curves), (ARC, ArcIndex, read_arcs)):
+        scope = ("LineContinuity", id_value(view.Id), kind)
+        index = tracked_index(doc_key, scope, reset=__shiftclick__, kind=index_class)
+        index.refresh(current, read)
+        indexes[kind] = index
+    return indexes
+
+
+def scan_scopes():
+    """(scope name, kind, snapshot, {(style, detail): groups}) for a full-project
+    dry run, one scope at a time: model curves once, then the detail curves
+    owned by each view. Lines and arcs come as two entries per scope."""
+    def _scope(name, elements):
+        for kind, snapshot in ((LINE, CurveSnapshot.from_elements(elements, lines_only=True)),
+                               (ARC, ArcSnapshot.from_elements(elements))):
+            if len(snapshot):
+                yield name, kind, snapshot, dict((key, find_groups(snapshot, rows, kind))
+                                                 for key, rows in snapshot.partition().items())
+
+    model = [e for e in FilteredElementCollector(doc).OfClass(CurveElement).WhereElementIsNotElementType()
+             if not e.ViewSpecific]
+    for entry in _scope("<Model>", model):
+        yield entry
+    for v in FilteredElementCollector(doc).OfClass(View).ToElements():
+        if v.IsTemplate:
+            continue
+        owned = list(FilteredElementCollector(doc).OwnedByView(v.Id).OfClass(CurveElement).ToElements())
+        for entry in _scope(v.Name, owned):
+            yield entry
+
+
+def dry_run(scopes, path):
+    """Write the groups only - no transaction. Every group is streamed to
+    disk as it is found and each scope is dropped before the next one."""
+    n_lines = n_groups = n_removed = 0
+    with RecordWriter(path, columns=RECORD_COLUMNS) as writer:
+        for scope, kind, snapshot, partitions in scopes:
+            n_lines += len(snapshot)
+            records  = arc_group_records if kind == ARC else group_records
+            for (style_id, detail), groups in partitions.items():
+                for record in records(snapshot, groups, view=scope, style=style_label(style_id, detail), kind=kind):
+                    writer.write(record)
+                    n_groups  += 1
+                    n_removed += record["removed"]
+    return n_lines, n_groups, n_removed
+
+
+# ╔╦╗╔═╗╦╔╗╔
+# ║║║╠═╣║║║║
+# ╩ ╩╩ ╩╩╝╚╝ MAIN
+#==================================================
+mode = forms.alert("Merge colinear lines, or only report what would change:",
+                   options=[MODE_MERGE, MODE_DRY_VIEW, MODE_DRY_ALL], exitscript=True)
+
+# active view: snapshots, buckets and groups are kept between runs
+if mode != MODE_DRY_ALL:
+    indexes = view_indexes()
 
-        # delete originals
-        try:
-            doc.Delete([el.Id for el in grp])
-        except:
-            for el in grp:
-                try:
-                    doc.Delete(el.Id)
-                except:
-                    pass
+if mode != MODE_MERGE:
+    path = forms.save_file(files_filter="JSON Lines (*.jsonl)|*.jsonl|CSV (*.csv)|*.csv",
+                           default_name="LineContinuity_DryRun")
+    if not path:
+        script.exit()
+    if mode == MODE_DRY_ALL:
+        scopes = scan_scopes()
+    else:
+        scopes = [(view.Name, kind, index.snapshot, index.groups()) for kind, index in sorted(indexes.items())]
+    n_lines, n_groups, n_removed = dry_run(scopes, path)
+    print("Dry run: {} lines scanned, {} groups would merge, {} elements would be removed.".format(
+        n_lines, n_groups, n_removed))
+    print("Records written to {}".format(path))
+    script.exit()
 
+# groups per style / detail partition, straight from the indexes
+work  = []          # (partition, kind, snapshot, groups)
+sizes = {}          # partition -> lines and arcs in the view
+for kind, index in sorted(indexes.items()):
+    for key, groups in index.groups().items():
+        work.append((key, kind, index.snapshot, groups))
+    for key, count in index.partition_sizes().items():
+        sizes[key] = sizes.get(key, 0) + count
+work.sort(key=lambda item: (-sizes.get(item[0], 0), item[0], item[1]))
+
+output.print_md("## Line Continuity - '{}'".format(view.Name))
+stats = {}          # partition -> [groups, merged, removed]
+created_ids = []
+t = Transaction(doc, "Merge Colinear Touching Lines")
+t.Start()
+try:
+    for (style_id, detail), kind, snapshot, groups in work:
+        merged = removed = 0
+        for grp in groups:
+            created = merge_group(snapshot, grp, style_id, detail, kind)
+            if created is not None:
+                created_ids.append(created.Id)
+                merged  += 1
+                removed += len(grp) - 1
+        row = stats.setdefault((style_id, detail), [0, 0, 0])
+        row[0] += len(groups); row[1] += merged; row[2] += removed
+        print("{} - {}s: {} groups merged, {} elements removed.".format(
+            style_label(style_id, detail), kind, merged, removed))
+
+    if not stats:
+        t.RollBack()
+        forms.alert("No touching colinear lines or co-circular arcs found in the active view.", exitscript=True)
+    # highlight all merged curves with one filter on the view
+    for v, why in highlight(doc, [view], created_ids, HIGHLIGHT):
+        print("Could not highlight merged lines: {}".format(why))
     t.Commit()
 except Exception as ex:
-    t.Rollback()
+    if t.HasStarted() and not t.HasEnded():
+        t.RollBack()
     raise
-# ...existing code...
\ No newline at end of file
+
+summary = [[style_label(*key), sizes.get(key, 0)] + row
+           for key, row in sorted(stats.items(), key=lambda item: -sizes.get(item[0], 0))]
+output.print_table(table_data=summary, title="Per style summary",
+                   columns=["Line Style", "Curves", "Groups", "Merged", "Removed"])
+print("View '{}': merged {} groups; {} elements removed.".format(
+    view.Name, sum(row[3] for row in summary), sum(row[4] for row in summary)))
@@ -1,27 +1,36 @@
 # -*- coding: utf-8 -*-
-__title__   = "Split Floors with Line"
-__doc__ = """Version = 1.0
-Date    = 25.08.2025
+__title__   = "Room Separation Continuity"
+__doc__ = """Version = 1.1
+Date    = 17.10.2026
 _____________________________________________________________________
 Description:
-Split Selected Floors with a Detail Line.
-
-💡 The selected Detail Line defines an infinite vertical cutting plane.
-The script cuts each floor's solid and creates two new floors from the
-resulting top faces, preserving FloorType and Level.
-
+Merge colinear Room Separation Lines that touch, overlap or contain
+each other into single lines, and co-circular arcs into single arcs. Merged lines are highlighted in red through
+one selection filter per run - use Clear Highlight to remove it.
+
+💡 Modes:
+- Active View    : only the lines visible in the active view. The analysis
+                   is kept between runs and updated from the document
+                   changes, so a re-check only looks at the changed lines
+                   (Shift+Click rebuilds it).
+- All Levels     : every Room Separation Line in the project, partitioned
+                   by level and sketch plane, merged inside one
+                   TransactionGroup with a per-level summary.
+- Check Topology : read-only report of loose ends, T-junctions and open
+                   networks in the active view - why a room is "not enclosed".
+- Dry Run        : no transaction; every group All Levels would merge is
+                   streamed to a .jsonl / .csv file, level by level.
 _____________________________________________________________________
 How-to:
 
 -> Click on the button
--> Select Floors
--> Select Detail Line
+-> Choose Active View, All Levels, Check Topology or Dry Run
 _____________________________________________________________________
-To-Do?:
-- Copy instance parameters from original floor to new floors
-- Handle sloped floors with non-planar top faces
+Last update:
+- [17.10.2026] - 1.1 Project-wide batch mode, topology check, dry run, filter highlight,
+                 incremental re-check, co-circular arcs
 _____________________________________________________________________
-Author: (based on Erik Frits' original FR splitter idea)
+Author: Nizar Gharib
 """
 
 # ╦╔╦╗╔═╗╔═╗╦═╗╔╦╗╔═╗
@@ -31,10 +40,24 @@ Author: (based on Erik Frits' original FR splitter idea)
 from Autodesk.Revit.Creation import ItemFactoryBase
 from Autodesk.Revit.DB import *
 from Autodesk.Revit.UI.Selection import *
-from pyrevit import forms
+from pyrevit import forms, script
 from Autodesk.Revit.DB import APIObject
 from Autodesk.Revit.DB import CurveArray
 
+#.NET
+import clr
+clr.AddReference('System')
+from System.Collections.Generic import List
+
+# Custom
+from Snippets._snapshot   import CurveSnapshot, ArcSnapshot, id_value, plane_frame
+from Snippets._continuity import (colinear_families, colinear_merge_pairs, connected_groups, merged_extent,
+                                  group_records, arc_merge_pairs, merged_arc, arc_group_records)
+from Snippets._records    import RecordWriter
+from Snippets._topology   import PlanarGraph
+from Snippets._highlight  import highlight
+from Snippets._incremental import tracked_index, document_key, ContinuityIndex, ArcIndex
+
 # ╦  ╦╔═╗╦═╗╦╔═╗╔╗ ╦  ╔═╗╔═╗
 # ╚╗╔╝╠═╣╠╦╝║╠═╣╠╩╗║  ║╣ ╚═╗
 #  ╚╝ ╩ ╩╩╚═╩╩ ╩╚═╝╩═╝╚═╝╚═╝ VARIABLES
@@ -43,258 +66,400 @@ uidoc = __revit__.ActiveUIDocument
 doc   = __revit__.ActiveUIDocument.Document  # type: Document
 app   = __revit__.Application
 selection = uidoc.Selection                  # type: Selection
+output    = script.get_output()
 
+MODE_VIEW  = "Active View"
+MODE_BATCH = "All Levels"
+MODE_CHECK = "Check Topology"
+MODE_DRY   = "Dry Run"
+RECORD_COLUMNS = ["level", "kind", "ids", "count", "removed", "start", "end", "length"]
+HIGHLIGHT      = "Room Separation Continuity"
 
 
 # ╔═╗╦ ╦╔═╗╔╗╔╔╦╗╦╔═╗╔╗╔╔═╗
 # ╠╣ ║ ║║  ║║║ ║ ║║ ║║║║╚═╗
 # ╚  ╚═╝╚═╝╝╚╝ ╩ ╩╚═╝╝╚╝╚═╝ HELPERS
 #==================================================
-# -*- coding: utf-8 -*-
-
-# Get the active view
-view = doc.ActiveView
-# red override
-ogs = OverrideGraphicSettings()
-ogs.SetProjectionLineColor(Color(255, 0, 0))
-
-# collect all CurveElements in the active view
-# collect only Room Separation model lines (no detail lines, no other types)
-room_sep_lines = FilteredElementCollector(doc, view.Id) \
-    .OfCategory(BuiltInCategory.OST_RoomSeparationLines) \
-    .WhereElementIsNotElementType() \
-    .ToElements()
-
-# keep only ModelCurve instances (safest) and dedupe by Id
-lines_by_id = {}
-for e in room_sep_lines:
-    if e is None:
-        continue
-    # prefer ModelCurve; sometimes the element class can be different in some API contexts,
-    # so also allow any CurveElement that belongs to the RoomSeparation category
-    if isinstance(e, ModelCurve) or (hasattr(e, "Category") and e.Category and e.Category.Id.IntegerValue == int(BuiltInCategory.OST_RoomSeparationLines)):
-        lines_by_id[e.Id.IntegerValue] = e
-lines = list(lines_by_id.values())
-
-# find colinear + touching pairs among room separation lines
-to_process = set()
-for i in range(len(lines)):
-    l1 = lines[i]
-    c1 = l1.GeometryCurve
-    if c1 is None:
-        continue
-    try:
-        dir1 = (c1.GetEndPoint(1) - c1.GetEndPoint(0)).Normalize()
-    except:
-        continue
-
-    for j in range(i + 1, len(lines)):
-        l2 = lines[j]
-        c2 = l2.GeometryCurve
-        if c2 is None:
+def collect_room_separation_lines(view=None):
+    """Room Separation Lines in a view, or in the whole project if view is None."""
+    collector = FilteredElementCollector(doc, view.Id) if view is not None else FilteredElementCollector(doc)
+    room_sep_lines = collector \
+        .OfCategory(BuiltInCategory.OST_RoomSeparationLines) \
+        .WhereElementIsNotElementType() \
+        .ToElements()
+
+    # keep only ModelCurve instances (safest) and dedupe by Id
+    lines_by_id = {}
+    for e in room_sep_lines:
+        if e is None:
             continue
-        try:
-            dir2 = (c2.GetEndPoint(1) - c2.GetEndPoint(0)).Normalize()
-        except:
+        # prefer ModelCurve; sometimes the element class can be different in some API contexts,
+        # so also allow any CurveElement that belongs to the RoomSeparation category
+        if isinstance(e, ModelCurve) or (hasattr(e, "Category") and e.Category and e.Category.Id.IntegerValue == int(BuiltInCategory.OST_RoomSeparationLines)):
+            lines_by_id[id_value(e.Id)] = e
+    return list(lines_by_id.values())
+
+
+def partition_by_level(lines):
+    """{(level id, sketch plane id): [lines]} - each partition merges independently."""
+    partitions = {}
+    for e in lines:
+        sketch_plane = getattr(e, "SketchPlane", None)
+        key = (id_value(e.LevelId), id_value(sketch_plane.Id) if sketch_plane else -1)
+        partitions.setdefault(key, []).append(e)
+    return partitions
+
+
+def plan_views_by_level():
+    """{level id: first non-template floor plan of that level}."""
+    views = {}
+    for v in FilteredElementCollector(doc).OfClass(ViewPlan).ToElements():
+        if v.IsTemplate or v.GenLevel is None or v.ViewType != ViewType.FloorPlan:
             continue
-
-        # colinear (same or opposite direction)
-        if dir1.IsAlmostEqualTo(dir2) or dir1.IsAlmostEqualTo(dir2.Negate()):
-            touching = (
-                c1.GetEndPoint(0).IsAlmostEqualTo(c2.GetEndPoint(0)) or
-                c1.GetEndPoint(0).IsAlmostEqualTo(c2.GetEndPoint(1)) or
-                c1.GetEndPoint(1).IsAlmostEqualTo(c2.GetEndPoint(0)) or
-                c1.GetEndPoint(1).IsAlmostEqualTo(c2.GetEndPoint(1))
-            )
-            if touching:
-                to_process.add(l1.Id)
-                to_process.add(l2.Id)
-
-if not to_process:
-    forms.alert("No touching Room Separation lines found in the active view.", exitscript=True)
-
-# map ids -> elements for the set we collected earlier
-colinear_lines = [doc.GetElement(eid) for eid in to_process]
-# ...existing code continues (adjacency, grouping, transaction, create ModelCurve, delete originals) ...
-# apply overrides in a single transaction
-def _colinear_and_touching(c1, c2):
-    if c1 is None or c2 is None:
-        return False
-    try:
-        a0 = c1.GetEndPoint(0); a1 = c1.GetEndPoint(1)
-        b0 = c2.GetEndPoint(0); b1 = c2.GetEndPoint(1)
-    except:
-        return False
-    v1 = a1 - a0; v2 = b1 - b0
-    if v1.IsZeroLength() or v2.IsZeroLength():
-        return False
-    u1 = v1.Normalize(); u2 = v2.Normalize()
-    if not (u1.IsAlmostEqualTo(u2) or u1.IsAlmostEqualTo(u2.Negate())):
-        return False
-    return (a0.IsAlmostEqualTo(b0) or a0.IsAlmostEqualTo(b1) or a1.IsAlmostEqualTo(b0) or a1.IsAlmostEqualTo(b1))
-
-# map ids -> elements for the set we collected earlier
-colinear_lines = [doc.GetElement(eid) for eid in to_process]
-if not colinear_lines:
-    forms.alert("No touching colinear lines found in the active view.", exitscript=True)
-
-# build adjacency for connected components
-n = len(colinear_lines)
-adj = [[] for _ in range(n)]
-for i in range(n):
-    for j in range(i + 1, n):
-        if _colinear_and_touching(colinear_lines[i].GeometryCurve, colinear_lines[j].GeometryCurve):
-            adj[i].append(j); adj[j].append(i)
-
-# find groups (connected components)
-visited = [False] * n
-groups = []
-for i in range(n):
-    if visited[i]:
-        continue
-    stack = [i]; group_idx = []
-    while stack:
-        cur = stack.pop()
-        if visited[cur]:
+        views.setdefault(id_value(v.GenLevel.Id), v)
+    return views
+
+
+def get_view_sketch_plane(view):
+    """Get or create a sketch plane that exists in the document and assign to view if needed."""
+    sketch_plane = getattr(view, "SketchPlane", None)
+    if sketch_plane is None:
+        level = view.GenLevel
+        if level is None:
+            return None
+        plane = Plane.CreateByNormalAndOrigin(XYZ.BasisZ, XYZ(0, 0, level.Elevation))
+        sketch_plane = SketchPlane.Create(doc, plane)
+        try:
+            view.SketchPlane = sketch_plane
+        except Exception as e:
+            # assignment may fail in some contexts; proceed but keep the instance
+            print("Note: could not assign SketchPlane to view:", e)
+    return sketch_plane
+
+
+def _end_key(pt):
+    """Rounded (X, Y) of a point, to match created curves back to their groups."""
+    return round(pt.X, 6), round(pt.Y, 6)
+
+
+def find_groups(lines):
+    """Colinear line groups and co-circular arc groups to merge.
+    :return: [(snapshot, groups of snapshot rows)] - lines, then arcs"""
+    # snapshot every curve once into float columns, bucket the lines into
+    # colinear families by their canonical line key, then sweep each family
+    # for touching, overlapping and contained segments
+    snapshot = CurveSnapshot.from_elements(lines, lines_only=True)
+    cols     = snapshot.cols
+    families = colinear_families(cols)
+    pairs    = colinear_merge_pairs(cols, families=families)
+
+    # arcs: bucketed by plane, centre and radius, swept by angle
+    arcs = ArcSnapshot.from_elements(lines)
+
+    # find groups (connected components): union-find fed by the detected pairs
+    return [(snapshot, connected_groups(pairs)), (arcs, connected_groups(arc_merge_pairs(arcs.cols)))]
+
+
+def view_groups(view):
+    """Groups of the active view from its persistent indexes: only the lines
+    added, deleted or changed since the last run are read and re-examined.
+    Shift+Click rebuilds the indexes from scratch.
+    :return: [(snapshot, groups of snapshot rows)] - lines, then arcs"""
+    current = [id_value(el_id) for el_id in FilteredElementCollector(doc, view.Id)
+               .OfCategory(BuiltInCategory.OST_RoomSeparationLines)
+               .WhereElementIsNotElementType()
+               .ToElementIds()]
+    found = []
+    for kind, index_class, read in (("line", ContinuityIndex, lambda els: CurveSnapshot.from_elements(els, lines_only=True)),
+                                    ("arc",  ArcIndex,        ArcSnapshot.from_elements)):
+        scope = ("RoomSeparationContinuity", id_value(view.Id), kind)
+        index = tracked_index(document_key(doc), scope, reset=__shiftclick__, kind=index_class)
+        index.refresh(current, lambda id_values: read([doc.GetElement(ElementId(v)) for v in id_values]))
+        found.append((index.snapshot, [grp for groups in index.groups().values() for grp in groups]))
+    return found
+
+
+def merged_curve(snapshot, grp, elevation=None):
+    """The Line / Arc replacing a group, straight from the snapshot - no
+    GeometryCurve calls - with its end points held at the level elevation
+    to avoid tiny Z mismatches. None if the group is degenerate."""
+    if isinstance(snapshot, ArcSnapshot):
+        merged = merged_arc(snapshot.cols, grp)
+        if merged is None:
+            return None
+        ref, start, end = merged
+        u, v = plane_frame(snapshot.nx[ref], snapshot.ny[ref], snapshot.nz[ref])
+        cz   = snapshot.cz[ref] if elevation is None else elevation
+        plane = Plane.CreateByOriginAndBasis(XYZ(snapshot.cx[ref], snapshot.cy[ref], cz), XYZ(*u), XYZ(*v))
+        return Arc.Create(plane, snapshot.r[ref], start, end)
+
+    extent = merged_extent(snapshot.cols, grp)
+    if extent is None:
+        return None
+    min_pt = XYZ(*extent[0])
+    max_pt = XYZ(*extent[1])
+    if elevation is not None:
+        if abs(min_pt.Z - elevation) > 1e-6 or abs(max_pt.Z - elevation) > 1e-6:
+            # small tolerance projection - keeps geometry planar
+            min_pt = XYZ(min_pt.X, min_pt.Y, elevation)
+            max_pt = XYZ(max_pt.X, max_pt.Y, elevation)
+    return Line.CreateBound(min_pt, max_pt)
+
+
+def merge_lines(found, view, sketch_plane, elevation=None):
+    """Merge colinear touching/overlapping lines and co-circular arcs.
+    Must run inside a Transaction. All merged curves are created with a
+    single NewRoomBoundaryLines call and all originals are removed with a
+    single Delete, so rooms regenerate once.
+    :param found: [(snapshot, groups)] from find_groups() / view_groups()
+    :return: (created_ids, removed, failed_groups, mapping) where mapping is a
+             list of (created ElementId, [original id values])"""
+    groups = [(snapshot, grp) for snapshot, kind_groups in found for grp in kind_groups]
+    failed_groups = []
+    planned = []        # (group index, Line / Arc)
+    ca = CurveArray()
+    for grp_idx, (snapshot, grp) in enumerate(groups):
+        new_curve = merged_curve(snapshot, grp, elevation)
+        if new_curve is None:
+            print("Group {}: degenerate merged curve, skipping".format(grp_idx))
             continue
-        visited[cur] = True
-        group_idx.append(cur)
-        for nb in adj[cur]:
-            if not visited[nb]:
-                stack.append(nb)
-    if len(group_idx) > 0:
-        groups.append([colinear_lines[k] for k in group_idx])
+        planned.append((grp_idx, new_curve))
+        ca.Append(new_curve)
 
+    if not planned:
+        return [], 0, failed_groups, []
 
-
-t = Transaction(doc, "Merge Colinear Room Separation Lines")
-t.Start()
-
-view = doc.ActiveView
-
-# Ensure view is plan-type where room separation lines are allowed
-# (This is a helpful early check; remove if you know view is correct)
-try:
-    from Autodesk.Revit.DB import ViewPlan
+    # one creation call for the whole sketch plane
+    try:
+        created_array = doc.Create.NewRoomBoundaryLines(sketch_plane, ca, view)
+    except Exception as e:
+        print("NewRoomBoundaryLines failed for {} merged lines: {}".format(len(planned), e))
+        failed_groups.extend((grp_idx, str(e)) for grp_idx, _ in planned)
+        return [], 0, failed_groups, []
+    created = [mc for mc in created_array if mc is not None]
+
+    # map created curves back to their groups (by order, or by endpoints if Revit dropped any)
+    if len(created) == len(planned):
+        matches = [(mc, grp_idx) for mc, (grp_idx, _) in zip(created, planned)]
+    else:
+        by_ends = {}
+        for grp_idx, line in planned:
+            by_ends[tuple(sorted((_end_key(line.GetEndPoint(0)), _end_key(line.GetEndPoint(1)))))] = grp_idx
+        matches = []
+        for mc in created:
+            crv = mc.GeometryCurve
+            grp_idx = by_ends.get(tuple(sorted((_end_key(crv.GetEndPoint(0)), _end_key(crv.GetEndPoint(1))))))
+            if grp_idx is not None:
+                matches.append((mc, grp_idx))
+
+    created_ids = []
+    mapping     = []
+    to_delete   = List[ElementId]()
+    done        = set()
+    for mc, grp_idx in matches:
+        created_ids.append(mc.Id)
+        snapshot, grp = groups[grp_idx]
+        originals = [int(snapshot.ids[k]) for k in grp]
+        mapping.append((mc.Id, originals))
+        for value in originals:
+            to_delete.Add(ElementId(value))
+        done.add(grp_idx)
+    for grp_idx, _ in planned:
+        if grp_idx not in done:
+            failed_groups.append((grp_idx, "no created elements"))
+
+    # Only delete originals of groups that actually got a new line - in one call
+    removed = 0
+    if to_delete.Count:
+        try:
+            doc.Delete(to_delete)
+            removed = to_delete.Count - len(created_ids)
+        except Exception as dd:
+            print("Bulk delete failed ({}), deleting one by one.".format(dd))
+            deleted = 0
+            for el_id in to_delete:
+                try:
+                    doc.Delete(el_id)
+                    deleted += 1
+                except Exception as de:
+                    print("Could not delete original element {}: {}".format(id_value(el_id), de))
+            removed = deleted - len(created_ids)
+
+    return created_ids, removed, failed_groups, mapping
+
+
+def dry_run(partitions, path):
+    """Group every level / sketch plane partition without a transaction and
+    stream one record per group that would merge. Each partition's snapshot
+    is dropped before the next one is read.
+    :return: (lines scanned, groups, elements that would be removed)"""
+    n_lines = n_groups = n_removed = 0
+    with RecordWriter(path, columns=RECORD_COLUMNS) as writer:
+        for (level_id, _sketch_plane_id), lines in sorted(partitions.items()):
+            level = doc.GetElement(ElementId(level_id))
+            level_name = level.Name if level is not None else "<No Level>"
+            for snapshot, groups in find_groups(lines):
+                n_lines += len(snapshot)
+                kind     = "arc" if isinstance(snapshot, ArcSnapshot) else "line"
+                records  = arc_group_records if kind == "arc" else group_records
+                for record in records(snapshot, groups, level=level_name, kind=kind):
+                    writer.write(record)
+                    n_groups  += 1
+                    n_removed += record["removed"]
+    return n_lines, n_groups, n_removed
+
+
+def report_topology(lines, view):
+    """Explain why rooms are "not enclosed": loose ends, T-junctions, open chains."""
+    snapshot = CurveSnapshot.from_elements(lines)
+    graph    = PlanarGraph(snapshot.cols)
+    link     = lambda seg: output.linkify(ElementId(int(snapshot.ids[seg])))
+    fmt_pt   = lambda v: "({:.3f}, {:.3f})".format(*graph.vertices[v][:2])
+
+    info = graph.summary()
+    output.print_md("## Room Separation Topology - '{}'".format(view.Name))
+    output.print_md("**{segments}** lines, **{vertices}** vertices, **{components}** networks "
+                    "(**{closed}** closed, **{open}** open), **{dangling}** loose ends, "
+                    "**{t_junctions}** T-junctions".format(**info))
+
+    loose = graph.dangling_ends()
+    if loose:
+        output.print_table(table_data=[[link(graph.incident[v][0]), fmt_pt(v)] for v in loose],
+                           title="Loose ends (degree 1)", columns=["Line", "Location (ft)"])
+    if graph.t_junctions():
+        output.print_table(table_data=[[link(graph.incident[v][0]), link(seg), fmt_pt(v)]
+                                       for v, seg in graph.t_junctions()],
+                           title="T-junctions (end on another line, not joined)",
+                           columns=["Line", "Touches", "Location (ft)"])
+    open_comps = graph.open_components()
+    if open_comps:
+        output.print_table(table_data=[[len(c["segments"]), len(c["open_ends"]), c["cycles"],
+                                        ", ".join(link(seg) for seg in c["segments"][:10])]
+                                       for c in sorted(open_comps, key=lambda c: -len(c["segments"]))],
+                           title="Open networks", columns=["Lines", "Loose ends", "Loops", "Lines (first 10)"])
+
+
+# ╔╦╗╔═╗╦╔╗╔
+# ║║║╠═╣║║║║
+# ╩ ╩╩ ╩╩╝╚╝ MAIN
+#==================================================
+mode = forms.alert("Merge colinear Room Separation Lines or check their topology:",
+                   options=[MODE_VIEW, MODE_BATCH, MODE_CHECK, MODE_DRY], exitscript=True)
+
+if mode == MODE_CHECK:
+    # read-only: no transaction, nothing is regenerated
+    view  = doc.ActiveView
+    lines = collect_room_separation_lines(view)
+    if not lines:
+        forms.alert("No Room Separation lines found in the active view.", exitscript=True)
+    report_topology(lines, view)
+
+elif mode == MODE_DRY:
+    # read-only: what All Levels would merge, streamed to .jsonl / .csv
+    partitions = partition_by_level(collect_room_separation_lines())
+    if not partitions:
+        forms.alert("No Room Separation lines found in the project.", exitscript=True)
+    path = forms.save_file(files_filter="JSON Lines (*.jsonl)|*.jsonl|CSV (*.csv)|*.csv",
+                           default_name="RoomSeparationContinuity_DryRun")
+    if not path:
+        script.exit()
+    n_lines, n_groups, n_removed = dry_run(partitions, path)
+    print("Dry run: {} lines scanned, {} groups would merge, {} elements would be removed.".format(
+        n_lines, n_groups, n_removed))
+    print("Records written to {}".format(path))
+
+elif mode == MODE_VIEW:
+    # Get the active view
+    view = doc.ActiveView
+    found = view_groups(view)
+    if not any(len(snapshot) for snapshot, _groups in found):
+        forms.alert("No Room Separation lines found in the active view.", exitscript=True)
+
+    # Ensure view is plan-type where room separation lines are allowed
     if not isinstance(view, ViewPlan):
-        # still attempt, but warn (you said root causes don't apply, keep optional)
         print("Warning: active view is not a ViewPlan. Creation may still fail.")
-except:
-    pass
-
-# Get or create a sketch plane that exists in the document and assign to view if needed
-sketch_plane = getattr(view, "SketchPlane", None)
-if sketch_plane is None:
-    level = view.GenLevel
-    if level is None:
-        t.Rollback()
+
+    t = Transaction(doc, "Merge Colinear Room Separation Lines")
+    t.Start()
+    sketch_plane = get_view_sketch_plane(view)
+    if sketch_plane is None:
+        t.RollBack()
         forms.alert("Active view must have an associated level.", exitscript=True)
-    plane = Plane.CreateByNormalAndOrigin(XYZ.BasisZ, XYZ(0, 0, level.Elevation))
-    sketch_plane = SketchPlane.Create(doc, plane)
-    try:
-        view.SketchPlane = sketch_plane
-    except Exception as e:
-        # assignment may fail in some contexts; proceed but keep the instance
-        print("Note: could not assign SketchPlane to view:", e)
-
-created_ids = []
-failed_groups = []
-
-for grp_idx, grp in enumerate(groups):
-    # collect endpoints
-    pts = []
-    for el in grp:
-        c = el.GeometryCurve
-        if c:
-            pts.append(c.GetEndPoint(0)); pts.append(c.GetEndPoint(1))
-    if not pts:
-        continue
-
-    # find direction and origin
-    ref_dir = None; ref_origin = pts[0]
-    for el in grp:
-        c = el.GeometryCurve
-        if c:
-            v = c.GetEndPoint(1) - c.GetEndPoint(0)
-            if not v.IsZeroLength():
-                ref_dir = v.Normalize()
-                ref_origin = c.GetEndPoint(0)
-                break
-    if ref_dir is None:
-        print("Group {}: no non-degenerate segment found, skipping".format(grp_idx))
-        continue
-
-    # project endpoints along ref_dir to get min/max points
-    projections = [(p, (p - ref_origin).DotProduct(ref_dir)) for p in pts]
-    min_pt = min(projections, key=lambda x: x[1])[0]
-    max_pt = max(projections, key=lambda x: x[1])[0]
-
-    if min_pt.IsAlmostEqualTo(max_pt):
-        print("Group {}: degenerate merged line (min==max), skipping".format(grp_idx))
-        continue
-
-    # ensure endpoints are at view level elevation to avoid tiny Z mismatches
     level_elev = view.GenLevel.Elevation if view.GenLevel is not None else None
-    if level_elev is not None:
-        if abs(min_pt.Z - level_elev) > 1e-6 or abs(max_pt.Z - level_elev) > 1e-6:
-            # small tolerance projection - keeps geometry planar
-            print("Group {}: projecting Z to level elevation {:.6f}".format(grp_idx, level_elev))
-            min_pt = XYZ(min_pt.X, min_pt.Y, level_elev)
-            max_pt = XYZ(max_pt.X, max_pt.Y, level_elev)
-
-    new_line = Line.CreateBound(min_pt, max_pt)
-
-    # Build a CurveArray (even if only one curve) and call the plural API
-    ca = CurveArray()
-    ca.Append(new_line)
-
     try:
-        # Note: use the document creation API that returns ModelCurveArray
-        # Many doc.Create.NewRoomBoundaryLines(...) wrappers exist in different versions
-        # Try the Creation.NewRoomBoundaryLines variant if available on doc.Create
-        created_array = None
-        try:
-            # This is the canonical documented call: Document.Create.NewRoomBoundaryLines(SketchPlane, CurveArray, View)
-            created_array = doc.Create.NewRoomBoundaryLines(sketch_plane, ca, view)
-            print("Group {}: NewRoomBoundaryLines returned {} items".format(grp_idx, len(created_array)))
-        except Exception as ex1:
-            # Fallback: some API wrappers expose Creation via doc.Application or doc.Creation
-            try:
-                created_array = doc.Document.Create.NewRoomBoundaryLines(sketch_plane, ca, view)
-                print("Group {}: fallback Document.Create call succeeded".format(grp_idx))
-            except Exception as ex2:
-                # Most likely the standard doc.Create.NewRoomBoundaryLines will work; if not, report errors
-                raise Exception("NewRoomBoundaryLines failed (primary and fallback): {}, {}".format(ex1, ex2))
-
-        # collect created elements and apply overrides
-        if created_array is not None:
-            this_group_new_ids = []
-            # ModelCurveArray is iterable
-            for mc in created_array:
-                if mc is not None:
-                    this_group_new_ids.append(mc.Id)
-                    try:
-                        view.SetElementOverrides(mc.Id, ogs)
-                    except Exception as eov:
-                        print("Could not set overrides on created element:", eov)
-            # Only delete originals if we actually created something
-            if this_group_new_ids:
-                for el in grp:
-                    try:
-                        doc.Delete(el.Id)
-                    except Exception as dd:
-                        print("Could not delete original element {}: {}".format(el.Id.IntegerValue, dd))
-                created_ids.extend(this_group_new_ids)
-                print("Group {}: created and cleaned up {} new elements.".format(grp_idx, len(this_group_new_ids)))
-            else:
-                print("Group {}: NewRoomBoundaryLines returned no elements".format(grp_idx))
-                failed_groups.append((grp_idx, "no created elements"))
+        created_ids, removed, failed_groups, mapping = merge_lines(found, view, sketch_plane, level_elev)
+        # highlight the merged lines with one filter on the view
+        for v, why in highlight(doc, [view], created_ids, HIGHLIGHT):
+            print("Could not highlight in view '{}': {}".format(v.Name, why))
+        t.Commit()
     except Exception as e:
-        print("Group {}: Failed to create room boundary lines: {}".format(grp_idx, e))
-        failed_groups.append((grp_idx, str(e)))
-
-t.Commit()
+        t.RollBack()
+        forms.alert("Merge failed and was rolled back: {}".format(e), exitscript=True)
+
+    if mapping:
+        output.print_table(table_data=[[id_value(new_id), len(originals), ", ".join(str(v) for v in originals)]
+                                       for new_id, originals in mapping],
+                           columns=["Created", "Merged", "Original Ids"])
+    print("Finished. Created {} new elements; {} failed groups.".format(len(created_ids), len(failed_groups)))
+    print("View '{}': {} elements removed.".format(view.Name, removed))
+    for f in failed_groups:
+        print(" - failed group:", f)
+
+else:
+    # collect every Room Separation Line once, then split by level / sketch plane
+    partitions = partition_by_level(collect_room_separation_lines())
+    if not partitions:
+        forms.alert("No Room Separation lines found in the project.", exitscript=True)
+    views = plan_views_by_level()
+
+    summary = {}    # level name -> [lines, created, removed, failed groups]
+    all_created, touched_views = [], {}
+    tg = TransactionGroup(doc, "Merge Colinear Room Separation Lines - All Levels")
+    tg.Start()
+    for (level_id, sketch_plane_id), lines in sorted(partitions.items()):
+        level = doc.GetElement(ElementId(level_id))
+        level_name = level.Name if level is not None else "<No Level>"
+        stats = summary.setdefault(level_name, [0, 0, 0, 0])
+        stats[0] += len(lines)
+
+        view         = views.get(level_id)
+        sketch_plane = doc.GetElement(ElementId(sketch_plane_id))
+        if view is None or sketch_plane is None:
+            print("Level '{}': no floor plan or sketch plane to create lines in, skipping {} lines.".format(level_name, len(lines)))
+            continue
 
-print("Finished. Created {} new elements; {} failed groups.".format(len(created_ids), len(failed_groups)))
-for f in failed_groups:
-    print(" - failed group:", f)
\ No newline at end of file
+        t = Transaction(doc, "Merge Room Separation Lines - {}".format(level_name))
+        t.Start()
+        try:
+            elevation = sketch_plane.GetPlane().Origin.Z
+            created_ids, removed, failed_groups, _mapping = merge_lines(find_groups(lines), view, sketch_plane, elevation)
+            t.Commit()
+        except Exception as e:
+            t.RollBack()
+            print("Level '{}': merge failed and was rolled back: {}".format(level_name, e))
+            continue
+        stats[1] += len(created_ids)
+        stats[2] += removed
+        stats[3] += len(failed_groups)
+        if created_ids:
+            all_created.extend(created_ids)
+            touched_views[id_value(view.Id)] = view
+
+    # highlight every merged line at once: one filter, one edit per level view
+    if all_created:
+        t = Transaction(doc, "Highlight Merged Room Separation Lines")
+        t.Start()
+        try:
+            for v, why in highlight(doc, touched_views.values(), all_created, HIGHLIGHT):
+                print("Could not highlight in view '{}': {}".format(v.Name, why))
+            t.Commit()
+        except Exception as e:
+            t.RollBack()
+            print("Highlight failed and was rolled back: {}".format(e))
+    tg.Assimilate()
+
+    output.print_md("## Room Separation Continuity - All Levels")
+    output.print_table(table_data=[[name] + stats for name, stats in sorted(summary.items())],
+                       columns=["Level", "Lines", "Created", "Removed", "Failed Groups"])
+    print("Finished. {} elements removed across {} levels.".format(
+        sum(s[2] for s in summary.values()), len(summary)))
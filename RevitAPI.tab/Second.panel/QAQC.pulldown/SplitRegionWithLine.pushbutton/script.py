@@ -1,17 +1,42 @@
 # -*- coding: utf-8 -*-
 __title__   = "Split Floors with Line"
-__doc__ = """Version = 1.1
-Date    = 30.10.2025
+__doc__ = """Version = 1.3
+Date    = 17.10.2026
 _____________________________________________________________________
-Split selected Floors with a Detail Line (infinite vertical plane).
-Creates two new floors (same type & level) from the bottom faces.
+Split selected Floors with one or more Detail Lines (each an infinite
+vertical plane) - e.g. a grid of cut lines for pour zones.
+All cuts are applied in one pass; every resulting piece becomes a new
+floor (same type & level) that keeps its holes, height offset and the
+original's instance parameter values (except Mark). Floors whose bounding box no line crosses are
+skipped without reading their geometry. Before creation, colinear edge
+runs are merged and sub-tolerance edges dropped.
+
+Flat floors are split in 2D on their sketch profile (lines and arcs).
+Sketches with other curve types and cuts through a sketch vertex fall
+back to Solid booleans and the bottom face of every piece.
+Shape-edited or sloped floors are skipped: neither path can rebuild them.
+
+Every line cuts along its whole (infinite) length. Lines chained end to
+end like a polyline are refused on any floor they bend or end inside,
+since the extended lines would cut pieces the polyline does not.
 """
 
+import math
+
 from Autodesk.Revit.DB import *
 from Autodesk.Revit.UI.Selection import *
 from pyrevit import forms
+import clr
+clr.AddReference("System")
+from System.Collections.Generic import List
+
+# Custom
+from Snippets._clip   import chain_loop, split_region, box_side, line_seg, arc_seg, seg_point, LINE
+from Snippets._params import ParameterTransfer
+from Snippets._loops  import simplify_curve_loops
 
 uidoc = __revit__.ActiveUIDocument
+app   = __revit__.Application
 doc   = uidoc.Document
 sel   = uidoc.Selection
 
@@ -40,14 +65,140 @@ def get_main_solid(geom_elem):
             maxvol, best = g.Volume, g
     return best
 
-def find_planar_face_by_normal(solid, target):
-    if not solid: return None
-    for face in solid.Faces:
-        pf = face if isinstance(face, PlanarFace) else None
-        if pf and pf.FaceNormal.IsAlmostEqualTo(target):
-            return pf
+def bottom_faces(solid):
+    """Planar faces of the solid pointing down (-Z)."""
+    down = XYZ.BasisZ.Negate()
+    return [f for f in solid.Faces if isinstance(f, PlanarFace) and f.FaceNormal.IsAlmostEqualTo(down)]
+
+def is_flat(fl):
+    """No shape edits, and every top face (one per island, or split by
+    joins) horizontal and at the same elevation."""
+    editor = fl.SlabShapeEditor
+    if editor is not None and editor.IsEnabled:
+        return False
+    faces = [fl.GetGeometryObjectFromReference(r) for r in HostObjectUtils.GetTopFaces(fl)]
+    if not faces:
+        return False
+    for face in faces:
+        if not isinstance(face, PlanarFace) or not face.FaceNormal.IsAlmostEqualTo(XYZ.BasisZ):
+            return False
+    z = faces[0].Origin.Z
+    return all(abs(face.Origin.Z - z) <= app.ShortCurveTolerance for face in faces)
+
+def to_seg(crv):
+    """Sketch curve -> 2D segment, None for curve types the clipper can't take."""
+    p0, p1 = crv.GetEndPoint(0), crv.GetEndPoint(1)
+    if isinstance(crv, Line):
+        return line_seg((p0.X, p0.Y), (p1.X, p1.Y))
+    if isinstance(crv, Arc) and crv.IsBound:
+        c, r = crv.Center, crv.Radius
+        a0 = math.atan2(p0.Y - c.Y, p0.X - c.X)
+        a1 = math.atan2(p1.Y - c.Y, p1.X - c.X)
+        sweep = (a1 - a0) % (2 * math.pi)
+        if crv.Normal.Z < 0:                      # clockwise in plan
+            sweep -= 2 * math.pi
+        return arc_seg((c.X, c.Y), r, a0, sweep)
     return None
 
+def sketch_loops(fl):
+    """(loops of 2D segments, sketch elevation), or None if the sketch can't be clipped in 2D."""
+    sketch = doc.GetElement(fl.SketchId)
+    if sketch is None:
+        return None
+    loops, z = [], None
+    for crv_arr in sketch.Profile:
+        segs = []
+        for crv in crv_arr:
+            seg = to_seg(crv)
+            if seg is None:
+                return None
+            segs.append(seg)
+            z = crv.GetEndPoint(0).Z
+        if segs:
+            loops.append(chain_loop(segs))
+    return (loops, z) if loops else None
+
+def to_curve_loop(loop, z):
+    cl = CurveLoop()
+    for seg in loop:
+        p0 = XYZ(seg[1][0], seg[1][1], z)
+        p1 = XYZ(seg[2][0], seg[2][1], z)
+        if seg[0] == LINE:
+            cl.Append(Line.CreateBound(p0, p1))
+        else:
+            mx, my = seg_point(seg, 0.5)
+            cl.Append(Arc.Create(p0, p1, XYZ(mx, my, z)))
+    return cl
+
+def chained_lines(segments, tolerance):
+    """Indices of the lines that share an end point with another picked line."""
+    ends    = [(k, p) for k, (p0, p1) in enumerate(segments) for p in (p0, p1)]
+    chained = set()
+    for a, (i, p) in enumerate(ends):
+        for j, q in ends[a + 1:]:
+            if i != j and abs(p[0] - q[0]) <= tolerance and abs(p[1] - q[1]) <= tolerance:
+                chained.update((i, j))
+    return chained
+
+def ends_inside(fl, ends):
+    """True if any (x, y) lies on one of the floor's (horizontal) top faces."""
+    for ref in HostObjectUtils.GetTopFaces(fl):
+        face = fl.GetGeometryObjectFromReference(ref)
+        for x, y in ends:
+            if face.Project(XYZ(x, y, face.Origin.Z)) is not None:
+                return True
+    return False
+
+def plan_box(fl):
+    bb = fl.get_BoundingBox(None)
+    return bb.Min.X, bb.Min.Y, bb.Max.X, bb.Max.Y
+
+def split_in_2d(fl, fl_cuts):
+    """Profiles of all pieces from the sketch, or None to fall back to solids."""
+    found = sketch_loops(fl)
+    if found is None:
+        return None
+    loops, z = found
+    pieces = split_region(loops, fl_cuts)
+    if pieces is None:
+        return None
+    return [[to_curve_loop(loop, z) for loop in piece] for piece in pieces]
+
+def split_with_solids(fl, fl_planes):
+    """Profiles of all pieces from Solid booleans, or an error message.
+    A half may hold several lumps: each one must have exactly one planar
+    bottom face, otherwise the floor is rejected rather than losing a lump.
+    Only valid for flat floors (is_flat)."""
+    opt = Options()
+    opt.DetailLevel = ViewDetailLevel.Fine
+    opt.IncludeNonVisibleObjects = True
+    solid = get_main_solid(fl.get_Geometry(opt))
+    if not solid:
+        return "No solid geometry."
+
+    solids = [solid]
+    for plane in fl_planes:
+        halves = []
+        for piece in solids:
+            for half_plane in (plane, mirror_plane(plane)):
+                half = BooleanOperationsUtils.CutWithHalfSpace(piece, half_plane)
+                if half and half.Volume > 1e-9:
+                    halves.append(half)
+        solids = halves
+
+    # Use BOTTOM faces (normal ≈ -Z) for proper sketch elevation, one per lump
+    profiles = []
+    for half in solids:
+        for lump in SolidUtils.SplitVolumes(half):
+            faces = bottom_faces(lump)
+            if len(faces) != 1:
+                return "A piece has {} planar bottom faces, expected one.".format(len(faces))
+            loops = list(faces[0].GetEdgesAsCurveLoops())
+            if not loops:
+                return "No CurveLoops from bottom faces."
+            profiles.append(loops)
+    return profiles
+
 # ------------------------ Selection filters -----------------------
 class FloorFilter(ISelectionFilter):
     def AllowElement(self, e): return isinstance(e, Floor)
@@ -62,70 +213,91 @@ try:
 except:
     forms.alert("No floors selected. Try again.", exitscript=True)
 
+dlines = []
 try:
-    r = sel.PickObject(ObjectType.Element, DLineFilter(), "Select the cutting detail line")
-    dline = doc.GetElement(r)
+    refs = sel.PickObjects(ObjectType.Element, DLineFilter(), "Select the cutting detail lines")
+    dlines = [doc.GetElement(r) for r in refs]
 except:
+    pass
+if not dlines:
     forms.alert("No detail line selected. Try again.", exitscript=True)
 
 # ------------------------ Build cutting planes ---------------------
-cut_plane      = create_vertical_plane_from_detail_line(dline)
-cut_plane_mirr = mirror_plane(cut_plane)
+# per line: (2D cut as (origin, direction), vertical plane for the Solid fallback,
+#            end points to keep off the floor - only for lines chained into a polyline)
+segments = []
+for dline in dlines:
+    p0 = dline.GeometryCurve.GetEndPoint(0)
+    p1 = dline.GeometryCurve.GetEndPoint(1)
+    segments.append(((p0.X, p0.Y), (p1.X, p1.Y)))
+chained = chained_lines(segments, app.ShortCurveTolerance)
+
+cuts = []
+for k, dline in enumerate(dlines):
+    (x0, y0), (x1, y1) = segments[k]
+    cuts.append((((x0, y0), (x1 - x0, y1 - y0)),
+                 create_vertical_plane_from_detail_line(dline),
+                 segments[k] if k in chained else ()))
 
 # ------------------------ Main transaction ------------------------
-skipped = []
+skipped  = []
+transfer = ParameterTransfer()
+removed  = 0        # edges simplified away before Floor.Create
 t = Transaction(doc, "Split Floors with Line")
 t.Start()
 try:
     for fl in floors:
         try:
-            # 1) Get a usable solid
-            opt = Options()
-            opt.DetailLevel = ViewDetailLevel.Fine
-            opt.IncludeNonVisibleObjects = True
-            geom = fl.get_Geometry(opt)
-            solid = get_main_solid(geom)
-            if not solid:
-                skipped.append((fl, "No solid geometry."))
+            # 0) Bounding-box prefilter: only the lines that cross the floor's box
+            box      = plan_box(fl)
+            crossing = [cut for cut in cuts if box_side(box, *cut[0]) == 0]
+            if not crossing:
+                skipped.append((fl, "No cut line crosses the floor."))
                 continue
 
-            # 2) Cut with half-spaces
-            half1 = BooleanOperationsUtils.CutWithHalfSpace(solid, cut_plane)
-            half2 = BooleanOperationsUtils.CutWithHalfSpace(solid, cut_plane_mirr)
-
-            # 3) Use BOTTOM faces (normal ≈ -Z) for proper sketch elevation
-            bottom1 = find_planar_face_by_normal(half1, XYZ.BasisZ.Negate())
-            bottom2 = find_planar_face_by_normal(half2, XYZ.BasisZ.Negate())
-            if not (bottom1 and bottom2):
-                skipped.append((fl, "Could not find planar bottom faces (sloped/shape-edited floor?)."))
+            # 1) Profiles of all pieces: 2D clip of the sketch, Solid booleans as fallback.
+            #    Both rebuild flat slabs only; sloped / shape-edited floors are left alone.
+            if not is_flat(fl):
+                skipped.append((fl, "Sloped or shape-edited floor: not supported."))
                 continue
-
-            loops1 = list(bottom1.GetEdgesAsCurveLoops())
-            loops2 = list(bottom2.GetEdgesAsCurveLoops())
-            if not loops1 or not loops2:
-                skipped.append((fl, "No CurveLoops from bottom faces."))
+            if any(ends_inside(fl, ends) for _, _, ends in crossing if ends):
+                skipped.append((fl, "Cut lines chained into a polyline bend or end inside the floor. "
+                                    "Each line cuts along its whole length: draw straight lines across the floor."))
+                continue
+            profiles = split_in_2d(fl, [cut for cut, _, _ in crossing])
+            if profiles is None:
+                profiles = split_with_solids(fl, [plane for _, plane, _ in crossing])
+                if isinstance(profiles, str):
+                    skipped.append((fl, profiles))
+                    continue
+            if len(profiles) < 2:
+                skipped.append((fl, "No cut line crosses the floor."))
                 continue
 
-            # 4) Recreate floors (same type & level)
+            # 2) Recreate floors (same type & level), one per island, and 3) delete
+            #    the original - in a SubTransaction, so a floor is split completely or not at all
             ftype_id = fl.FloorType.Id
             lvl_id   = fl.LevelId
 
-            new1 = Floor.Create(doc, loops1, ftype_id, lvl_id)
-            new2 = Floor.Create(doc, loops2, ftype_id, lvl_id)
-
-            # Optional: copy a few simple instance params (safe whitelist)
-            # for pname in ["Comments", "Mark"]:
-            #     p_src = fl.LookupParameter(pname)
-            #     if p_src and not p_src.IsReadOnly:
-            #         val = p_src.AsString()
-            #         for nf in (new1, new2):
-                #             p_dst = nf.LookupParameter(pname)
-                #             if p_dst and not p_dst.IsReadOnly and val is not None:
-                #                 p_dst.Set(val)
-
-            # 5) Delete original
-            if new1 and new2:
+            st = SubTransaction(doc)
+            st.Start()
+            try:
+                new_floors, fl_removed = [], 0
+                for profile in profiles:
+                    profile, n = simplify_curve_loops(profile, app.ShortCurveTolerance)
+                    fl_removed += n
+                    new_floors.append(Floor.Create(doc, List[CurveLoop](profile), ftype_id, lvl_id))
+
+                # Copy the instance parameters (writable ones, planned once per floor type),
+                # height offset included: new floors are created at offset 0
+                transfer.copy(fl, new_floors)
                 doc.Delete(fl.Id)
+                st.Commit()
+            except Exception as ex:
+                st.RollBack()
+                skipped.append((fl, "Rolled back: {}".format(ex)))
+                continue
+            removed += fl_removed
 
         except Exception as ex:
             skipped.append((fl, str(ex)))
@@ -136,6 +308,8 @@ except:
     raise
 
 # ------------------------ Feedback --------------------------------
+if removed:
+    print("{} redundant edges (colinear runs, sub-tolerance edges) removed before creating the floors.".format(removed))
 if skipped:
     lines = ["Some floors were skipped:"]
     for fl, why in skipped:
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""Feed changed element ids to the continuity indexes of the document.
+Runs after every transaction, so it only copies id values - no geometry
+is read here. Does nothing until a continuity tool has built an index."""
+# ╦╔╦╗╔═╗╔═╗╦═╗╔╦╗╔═╗
+# ║║║║╠═╝║ ║╠╦╝ ║ ╚═╗
+# ╩╩ ╩╩  ╚═╝╩╚═ ╩ ╚═╝ IMPORTS
+#==================================================
+from pyrevit import EXEC_PARAMS
+
+# Custom
+from Snippets._incremental import record_changes, is_tracked, document_key
+from Snippets._snapshot    import id_value
+
+# ╔╦╗╔═╗╦╔╗╔
+# ║║║╠═╣║║║║
+# ╩ ╩╩ ╩╩╝╚╝ MAIN
+#==================================================
+args    = EXEC_PARAMS.event_args
+doc_key = document_key(args.GetDocument())
+
+if is_tracked(doc_key):
+    changed = []
+    for ids in (args.GetAddedElementIds(), args.GetModifiedElementIds(), args.GetDeletedElementIds()):
+        changed.extend(id_value(el_id) for el_id in ids)
+    record_changes(doc_key, changed)
@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+"""Drop the continuity indexes of a document when it closes."""
+# ╦╔╦╗╔═╗╔═╗╦═╗╔╦╗╔═╗
+# ║║║║╠═╝║ ║╠╦╝ ║ ╚═╗
+# ╩╩ ╩╩  ╚═╝╩╚═ ╩ ╚═╝ IMPORTS
+#==================================================
+from pyrevit import EXEC_PARAMS
+
+# Custom
+from Snippets._incremental import forget, document_key
+
+# ╔╦╗╔═╗╦╔╗╔
+# ║║║╠═╣║║║║
+# ╩ ╩╩ ╩╩╝╚╝ MAIN
+#==================================================
+forget(document_key(EXEC_PARAMS.event_args.Document))
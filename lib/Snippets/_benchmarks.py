@@ -0,0 +1,660 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks for the pure-Python engines in Snippets.
+Runs outside of Revit on synthetic data:
+    cd lib
+    python -m Snippets._benchmarks [endpoint families snapshot ...]"""
+# ╦╔╦╗╔═╗╔═╗╦═╗╔╦╗╔═╗
+# ║║║║╠═╝║ ║╠╦╝ ║ ╚═╗
+# ╩╩ ╩╩  ╚═╝╩╚═ ╩ ╚═╝ IMPORTS
+#==================================================
+import math
+import random
+import os
+import sys
+import tempfile
+import time
+
+from Snippets._continuity import (colinear_families, colinear_touching_pairs, colinear_merge_pairs,
+                                  connected_groups, merged_extent, is_colinear, arc_merge_pairs, merged_arc,
+                                  TOLERANCE, TWO_PI)
+from Snippets._snapshot   import CurveSnapshot
+from Snippets._gaps       import find_gaps, heal_positions, MM
+from Snippets._topology   import PlanarGraph
+from Snippets._incremental import ContinuityIndex
+from Snippets._snapshot   import ArcSnapshot
+from Snippets._spatial    import PointTree
+from Snippets._tin        import TIN
+from Snippets._meshcache  import save_tin, load_tin
+from Snippets              import _vectorized
+from Snippets._clip       import split_loops, split_region, line_seg, arc_seg
+from Snippets._edges      import (mutual_edges, snap_moves, COINCIDENT, NEAR, OVERLAP,
+                                  NEAR_TOLERANCE, NEAR_ANGLE)
+
+try:
+    import tracemalloc          # CPython only
+except ImportError:
+    tracemalloc = None
+
+# ╔═╗╦ ╦╔╗╔╔═╗╔╦╗╦╔═╗╔╗╔╔═╗
+# ╠╣ ║ ║║║║║   ║ ║║ ║║║║╚═╗
+# ╚  ╚═╝╝╚╝╚═╝ ╩ ╩╚═╝╝╚╝╚═╝ FUNCTIONS
+#==================================================
+def synthetic_segments(n, chain=4, seed=0):
+    """n planar segments as coordinate columns, laid out in colinear chains
+    of `chain` touching pieces at random angles (like exploded DWG lines)."""
+    rnd = random.Random(seed)
+    side = math.sqrt(n) * 10.0
+    x0, y0, z0, x1, y1, z1 = [], [], [], [], [], []
+    while len(x0) < n:
+        ang = rnd.choice((0.0, math.pi / 2, math.pi / 4, rnd.uniform(0, math.pi)))
+        dx, dy = math.cos(ang), math.sin(ang)
+        px, py = rnd.uniform(0, side), rnd.uniform(0, side)
+        for _ in range(min(chain, n - len(x0))):
+            length = rnd.uniform(0.5, 3.0)
+            qx, qy = px + dx * length, py + dy * length
+            if rnd.random() < 0.5:
+                x0.append(px); y0.append(py); x1.append(qx); y1.append(qy)
+            else:
+                x0.append(qx); y0.append(qy); x1.append(px); y1.append(py)
+            z0.append(0.0); z1.append(0.0)
+            px, py = qx, qy
+    return x0, y0, z0, x1, y1, z1
+
+
+def _naive_pairs(cols, tolerance=TOLERANCE):
+    """The original O(n²) scan, kept here for comparison."""
+    x0, y0, z0, x1, y1, z1 = cols
+    tol2  = tolerance * tolerance
+    pairs = []
+    n = len(x0)
+    for i in range(n):
+        a = ((x0[i], y0[i], z0[i]), (x1[i], y1[i], z1[i]))
+        for j in range(i + 1, n):
+            if not is_colinear(cols, i, j):
+                continue
+            b = ((x0[j], y0[j], z0[j]), (x1[j], y1[j], z1[j]))
+            if any((p[0] - q[0]) ** 2 + (p[1] - q[1]) ** 2 + (p[2] - q[2]) ** 2 <= tol2
+                   for p in a for q in b):
+                pairs.append((i, j))
+    return pairs
+
+
+def _timed(func, *args, **kwargs):
+    start  = time.time()
+    result = func(*args, **kwargs)
+    return time.time() - start, result
+
+
+def bench_endpoint_index(sizes=(1000, 10000, 100000), naive_limit=3000):
+    """Colinear families + endpoint grid vs pairwise scan for detection."""
+    print("{:>8} {:>10} {:>10} {:>10}".format("segments", "pairs", "index s", "naive s"))
+    for n in sizes:
+        cols = synthetic_segments(n)
+        t_idx, pairs = _timed(colinear_touching_pairs, cols)
+        naive = "-"
+        if n <= naive_limit:
+            t_naive, ref = _timed(_naive_pairs, cols)
+            assert sorted(ref) == sorted(pairs)
+            naive = "{:.3f}".format(t_naive)
+        print("{:>8} {:>10} {:>10.3f} {:>10}".format(n, len(pairs), t_idx, naive))
+
+
+def bench_colinear_families(sizes=(1000, 10000, 100000)):
+    """Single-pass line-key bucketing: families and worst-case comparisons left."""
+    print("{:>8} {:>10} {:>14} {:>14} {:>10}".format("segments", "families", "pairwise cmp", "in-family cmp", "bucket s"))
+    for n in sizes:
+        cols = synthetic_segments(n)
+        t_fam, families = _timed(colinear_families, cols)
+        in_family = sum(len(f) * (len(f) - 1) // 2 for f in families)
+        print("{:>8} {:>10} {:>14} {:>14} {:>10.3f}".format(n, len(families), n * (n - 1) // 2, in_family, t_fam))
+
+
+_INTEROP_CALLS = [0]
+
+
+class _FakeXYZ(object):
+    """Stand-in for Autodesk.Revit.DB.XYZ: a new object on every read."""
+    def __init__(self, x, y, z):
+        self.X = x; self.Y = y; self.Z = z
+
+    def __sub__(self, other):
+        _INTEROP_CALLS[0] += 1
+        return _FakeXYZ(self.X - other.X, self.Y - other.Y, self.Z - other.Z)
+
+    def DotProduct(self, other):
+        _INTEROP_CALLS[0] += 1
+        return self.X * other.X + self.Y * other.Y + self.Z * other.Z
+
+
+class _FakeCurve(object):
+    def __init__(self, p0, p1):
+        self._pts = (p0, p1)
+
+    def GetEndPoint(self, i):
+        _INTEROP_CALLS[0] += 1
+        return _FakeXYZ(*self._pts[i])
+
+
+class _FakeId(object):
+    def __init__(self, value):
+        self.IntegerValue = value
+
+
+class _FakeElement(object):
+    """Stand-in for a CurveElement: GeometryCurve builds a new curve per call,
+    like every call across the IronPython/.NET boundary does."""
+    def __init__(self, value, p0, p1):
+        self.Id   = _FakeId(value)
+        self._pts = (p0, p1)
+
+    @property
+    def GeometryCurve(self):
+        _INTEROP_CALLS[0] += 1
+        return _FakeCurve(*self._pts)
+
+    @property
+    def LineStyle(self):
+        _INTEROP_CALLS[0] += 1
+        return self
+
+
+def _object_path(elements, groups):
+    """The pre-snapshot pipeline: endpoints re-read in detection, grouping
+    and twice in the merge (reference direction + extremities)."""
+    held = [(e.GeometryCurve.GetEndPoint(0), e.GeometryCurve.GetEndPoint(1)) for e in elements]
+    for grp in groups:
+        for k in grp:                                   # grouping pass
+            c = elements[k].GeometryCurve
+            c.GetEndPoint(0); c.GetEndPoint(1)
+    result = []
+    for grp in groups:
+        pts = []
+        for k in grp:
+            c = elements[k].GeometryCurve
+            pts.append(c.GetEndPoint(0)); pts.append(c.GetEndPoint(1))
+        c = elements[grp[0]].GeometryCurve
+        origin = c.GetEndPoint(0)
+        ref    = c.GetEndPoint(1) - origin
+        proj   = [(p, (p - origin).DotProduct(ref)) for p in pts]
+        result.append((min(proj, key=lambda x: x[1])[0], max(proj, key=lambda x: x[1])[0]))
+    return held, result
+
+
+def _array_path(elements, groups):
+    snap = CurveSnapshot.from_elements(elements)
+    return snap, [merged_extent(snap.cols, grp) for grp in groups]
+
+
+def _measure(func, *args):
+    """(seconds, interop calls, peak bytes or None)."""
+    _INTEROP_CALLS[0] = 0
+    elapsed, _ = _timed(func, *args)
+    calls = _INTEROP_CALLS[0]
+    peak  = None
+    if tracemalloc is not None:
+        tracemalloc.start()
+        func(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed, calls, peak
+
+
+def bench_snapshot(sizes=(10000, 100000)):
+    """Array snapshot vs object-based endpoint access: time, API calls, peak memory.
+    Fake CPython objects are far cheaper than real .NET interop calls, so
+    the call count is the number to read for Revit."""
+    print("{:>8} {:>8} {:>10} {:>10} {:>8}".format("segments", "path", "seconds", "api calls", "peak MB"))
+    for n in sizes:
+        cols = synthetic_segments(n)
+        elements = [_FakeElement(i, (cols[0][i], cols[1][i], cols[2][i]), (cols[3][i], cols[4][i], cols[5][i]))
+                    for i in range(n)]
+        groups = connected_groups(colinear_merge_pairs(cols))
+        for name, func in (("object", _object_path), ("array", _array_path)):
+            elapsed, calls, peak = _measure(func, elements, groups)
+            peak = "-" if peak is None else "{:.1f}".format(peak / 1048576.0)
+            print("{:>8} {:>8} {:>10.3f} {:>10} {:>8}".format(n, name, elapsed, calls, peak))
+
+
+def _with_gaps(cols, ratio=0.05, seed=1):
+    """Copy of cols with a 1-5 mm gap opened at the start of `ratio` of the segments."""
+    rnd = random.Random(seed)
+    x0, y0, z0, x1, y1, z1 = [list(c) for c in cols]
+    for i in range(len(x0)):
+        if rnd.random() < ratio:
+            gap = rnd.uniform(1.0, 5.0) * MM
+            ang = rnd.uniform(0, 2 * math.pi)
+            x0[i] += gap * math.cos(ang); y0[i] += gap * math.sin(ang)
+    return x0, y0, z0, x1, y1, z1
+
+
+def bench_gaps(sizes=(10000, 50000)):
+    """Near-miss gap finder + heal plan on a full level."""
+    print("{:>8} {:>8} {:>8} {:>10}".format("segments", "gaps", "moves", "seconds"))
+    for n in sizes:
+        cols = _with_gaps(synthetic_segments(n))
+        elapsed, gaps = _timed(find_gaps, cols, 6.0 * MM)
+        t_heal, moves = _timed(heal_positions, cols, gaps)
+        print("{:>8} {:>8} {:>8} {:>10.3f}".format(n, len(gaps), len(moves), elapsed + t_heal))
+
+
+def topology_case():
+    """Segments with a known topology: a closed square with a stub off one
+    corner and a tee onto its bottom side, plus a separate closed triangle.
+    :return: (cols, expected) - expected loose ends, T-junctions (point,
+             segment) and (segments, cycles, open) per component"""
+    segs = [((0, 0), (10, 0)), ((10, 0), (10, 10)), ((10, 10), (0, 10)), ((0, 10), (0, 0)),  # square
+            ((10, 10), (15, 15)),                                                            # stub
+            ((5, 0), (5, -5)),                                                               # tee
+            ((20, 0), (25, 0)), ((25, 0), (20, 5)), ((20, 5), (20, 0))]                      # triangle
+    cols = ([float(a[0]) for a, b in segs], [float(a[1]) for a, b in segs], [0.0] * len(segs),
+            [float(b[0]) for a, b in segs], [float(b[1]) for a, b in segs], [0.0] * len(segs))
+    expected = {"dangling_ends": [(15.0, 15.0), (5.0, -5.0)],
+                "t_junctions"  : [((5.0, 0.0), 0)],
+                "components"   : [([0, 1, 2, 3, 4, 5], 1, True), ([6, 7, 8], 1, False)]}
+    return cols, expected
+
+
+def check_topology():
+    """PlanarGraph results on topology_case() against the known answer."""
+    cols, expected = topology_case()
+    graph = PlanarGraph(cols)
+    point = lambda v: graph.vertices[v][:2]
+    found = {"dangling_ends": sorted(point(v) for v in graph.dangling_ends()),
+             "t_junctions"  : sorted((point(v), seg) for v, seg in graph.t_junctions()),
+             "components"   : sorted((sorted(c["segments"]), c["cycles"], bool(c["open_ends"]))
+                                     for c in graph.components())}
+    return all(found[key] == sorted(value) for key, value in expected.items())
+
+
+def check_merged_arc():
+    """merged_arc on unit-circle groups with known spans, including a member
+    that wraps past 2*pi and covers the low angles too."""
+    cases = [([(0.1, 0.5), (0.5, 1.0)],              (0.1, 1.0)),
+             ([(6.0, 0.717 + TWO_PI), (0.1, 0.5)],   (6.0, 0.717 + TWO_PI)),
+             ([(5.0, 0.2 + TWO_PI), (0.1, 3.0)],     (5.0, 3.0 + TWO_PI)),
+             ([(0.0, 4.0), (3.5, 0.5 + TWO_PI)],     None)]
+    same = True
+    for intervals, expected in cases:
+        n    = len(intervals)
+        cols = ([0.0] * n, [0.0] * n, [0.0] * n, [0.0] * n, [0.0] * n, [1.0] * n, [1.0] * n,
+                [a0 for a0, _ in intervals], [a1 for _, a1 in intervals])
+        merged = merged_arc(cols, list(range(n)))
+        if expected is None or merged is None:
+            same = same and merged is expected
+        else:
+            same = same and abs(merged[1] - expected[0]) < 1e-9 and abs(merged[2] - expected[1]) < 1e-9
+    return same
+
+
+def bench_topology(sizes=(10000, 50000, 100000)):
+    """Planar graph build + loose ends / T-junctions / open components."""
+    print("known case (square + stub + tee, triangle): same {}".format(check_topology()))
+    print("{:>8} {:>9} {:>9} {:>8} {:>10}".format("segments", "vertices", "dangling", "open", "seconds"))
+    for n in sizes:
+        cols = synthetic_segments(n)
+        elapsed, info = _timed(lambda: PlanarGraph(cols).summary())
+        print("{:>8} {:>9} {:>9} {:>8} {:>10.3f}".format(n, info["vertices"], info["dangling"], info["open"], elapsed))
+
+
+def synthetic_arcs(n, pieces=4, seed=0):
+    """ArcSnapshot of n arcs: circles split into `pieces` touching arcs,
+    half of them drawn clockwise (normal -Z)."""
+    rnd  = random.Random(seed)
+    side = math.sqrt(n) * 10.0
+    arcs = ArcSnapshot()
+    while len(arcs) < n:
+        cx, cy, r = rnd.uniform(0, side), rnd.uniform(0, side), rnd.uniform(0.5, 5.0)
+        t = rnd.uniform(0, 2 * math.pi)
+        for _ in range(min(pieces, n - len(arcs))):
+            step = rnd.uniform(0.2, 1.2)
+            p0 = (cx + r * math.cos(t), cy + r * math.sin(t), 0.0)
+            p1 = (cx + r * math.cos(t + step), cy + r * math.sin(t + step), 0.0)
+            if rnd.random() < 0.5:
+                arcs.append(len(arcs), (cx, cy, 0.0), (0.0, 0.0, 1.0), r, p0, p1)
+            else:
+                arcs.append(len(arcs), (cx, cy, 0.0), (0.0, 0.0, -1.0), r, p1, p0)
+            t += step
+    return arcs
+
+
+def bench_arcs(sizes=(1000, 10000, 100000)):
+    """Co-circular families + angular sweep: should scale like the lines."""
+    print("known spans (incl. a member wrapping past 2pi): same {}".format(check_merged_arc()))
+    print("{:>8} {:>8} {:>10}".format("arcs", "groups", "seconds"))
+    for n in sizes:
+        arcs = synthetic_arcs(n)
+        elapsed, groups = _timed(lambda: connected_groups(arc_merge_pairs(arcs.cols)))
+        print("{:>8} {:>8} {:>10.3f}".format(n, len(groups), elapsed))
+
+
+def _snapshot_of(cols, ids=None):
+    snap = CurveSnapshot()
+    x0, y0, z0, x1, y1, z1 = cols
+    for i in range(len(x0)):
+        snap.append(ids[i] if ids else i, (x0[i], y0[i], z0[i]), (x1[i], y1[i], z1[i]))
+    return snap
+
+
+def _id_groups(snap, groups):
+    return sorted(sorted(int(snap.ids[k]) for k in grp) for grp in groups)
+
+
+def bench_incremental(sizes=(10000, 100000), edits=10, seed=2):
+    """Persistent index: re-check after a few edits vs a full re-analysis.
+    Every incremental result is compared against the full one."""
+    print("{:>8} {:>6} {:>10} {:>10} {:>10} {:>8}".format("segments", "edits", "build s", "recheck s", "full s", "same"))
+    rnd = random.Random(seed)
+    for n in sizes:
+        cols  = synthetic_segments(n)
+        index = ContinuityIndex()
+        t_build, _ = _timed(index.update, _snapshot_of(cols))
+        t_idle, _  = _timed(index.refresh, range(n), None)
+
+        # move, delete and add a few segments
+        x0, y0, z0, x1, y1, z1 = [list(c) for c in cols]
+        current = set(range(n))
+        changed = []
+        for _ in range(edits):
+            i = rnd.randrange(n)
+            x1[i] += (x1[i] - x0[i]) * 0.5; y1[i] += (y1[i] - y0[i]) * 0.5
+            changed.append(i)
+            current.discard(rnd.randrange(n))
+        index.pending.update(changed)
+        live = sorted(current)
+        edited = (x0, y0, z0, x1, y1, z1)
+        read = lambda ids: _snapshot_of([[c[i] for i in sorted(ids)] for c in edited], sorted(ids))
+        t_inc, _ = _timed(index.refresh, current, read)
+        t_get, incremental = _timed(index.groups)
+
+        full_snap = _snapshot_of([[c[i] for i in live] for c in edited], live)
+        t_full, full = _timed(lambda: connected_groups(colinear_merge_pairs(full_snap.cols)))
+        same = _id_groups(index.snapshot, incremental.get((-1, 0), [])) == _id_groups(full_snap, full)
+        print("{:>8} {:>6} {:>10.3f} {:>10.4f} {:>10.3f} {:>8}".format(
+            n, edits, t_build, t_inc + t_get, t_full, str(same)))
+        print("{:>8} {:>6} {:>10} {:>10.4f}   (no changes)".format("", 0, "", t_idle))
+
+
+def synthetic_terrain(n, seed=3):
+    """n jittered site-mesh vertices (x, y, z) on a square site."""
+    rnd  = random.Random(seed)
+    side = math.sqrt(n) * 5.0
+    xs = [rnd.uniform(0, side) for _ in range(n)]
+    ys = [rnd.uniform(0, side) for _ in range(n)]
+    zs = [math.sin(x / 40.0) * 3.0 + math.cos(y / 55.0) * 2.0 for x, y in zip(xs, ys)]
+    return xs, ys, zs
+
+
+def _linear_nearest_z(xs, ys, zs, x, y):
+    """The original per-query scan over every vertex."""
+    min_dist, nearest_z = float("inf"), None
+    for k in range(len(xs)):
+        dist = ((xs[k] - x) ** 2 + (ys[k] - y) ** 2) ** 0.5
+        if dist < min_dist:
+            min_dist, nearest_z = dist, zs[k]
+    return nearest_z
+
+
+def bench_nearest(sizes=(10000, 50000, 200000), queries=2000, linear_queries=50, seed=4):
+    """KD-tree nearest vertex vs linear scan, per slab-vertex query."""
+    print("{:>8} {:>8} {:>10} {:>12} {:>12} {:>8}".format(
+        "vertices", "queries", "build s", "tree ms/q", "linear ms/q", "same"))
+    rnd = random.Random(seed)
+    for n in sizes:
+        xs, ys, zs = synthetic_terrain(n)
+        side = math.sqrt(n) * 5.0
+        pts  = [(rnd.uniform(0, side), rnd.uniform(0, side)) for _ in range(queries)]
+        t_build, tree = _timed(PointTree, xs, ys, zs)
+        t_tree, found = _timed(lambda: [tree.nearest(x, y)[1] for x, y in pts])
+        t_lin, linear = _timed(lambda: [_linear_nearest_z(xs, ys, zs, x, y) for x, y in pts[:linear_queries]])
+        print("{:>8} {:>8} {:>10.3f} {:>12.4f} {:>12.2f} {:>8}".format(
+            n, queries, t_build, 1000.0 * t_tree / queries, 1000.0 * t_lin / linear_queries,
+            str(found[:linear_queries] == linear)))
+
+
+def _surface(x, y):
+    return math.sin(x / 40.0) * 3.0 + math.cos(y / 55.0) * 2.0 + 0.01 * x
+
+
+def synthetic_tin(n, seed=5):
+    """Site mesh of about n vertices: a jittered grid split into triangles,
+    Z sampled from a smooth surface."""
+    rnd  = random.Random(seed)
+    cols = max(2, int(math.sqrt(n)))
+    step = 5.0
+    xs, ys, zs = [], [], []
+    for i in range(cols):
+        for j in range(cols):
+            x = i * step + (rnd.uniform(-1, 1) if 0 < i < cols - 1 else 0.0)
+            y = j * step + (rnd.uniform(-1, 1) if 0 < j < cols - 1 else 0.0)
+            xs.append(x); ys.append(y); zs.append(_surface(x, y))
+    ia, ib, ic = [], [], []
+    for i in range(cols - 1):
+        for j in range(cols - 1):
+            a, b, c, d = i * cols + j, (i + 1) * cols + j, (i + 1) * cols + j + 1, i * cols + j + 1
+            ia += [a, a]; ib += [b, c]; ic += [c, d]
+    return (xs, ys, zs, ia, ib, ic), (cols - 1) * step
+
+
+def bench_tin(sizes=(10000, 50000, 200000), queries=20000, seed=6):
+    """Barycentric TIN heights vs nearest-vertex Z: speed and error against the true surface."""
+    print("{:>8} {:>9} {:>8} {:>10} {:>12} {:>12} {:>12} {:>12}".format(
+        "vertices", "triangles", "queries", "build s", "tin ms/q", "tin err", "near ms/q", "near err"))
+    rnd = random.Random(seed)
+    for n in sizes:
+        mesh, side = synthetic_tin(n)
+        qx = [rnd.uniform(0, side) for _ in range(queries)]
+        qy = [rnd.uniform(0, side) for _ in range(queries)]
+        truth = [_surface(x, y) for x, y in zip(qx, qy)]
+        t_build, tin = _timed(TIN, *mesh)
+        t_tin, zs = _timed(tin.heights, qx, qy)
+        t_tree, tree = _timed(PointTree, mesh[0], mesh[1], mesh[2])
+        t_near, near = _timed(lambda: [tree.nearest(x, y)[1] for x, y in zip(qx, qy)])
+        print("{:>8} {:>9} {:>8} {:>10.3f} {:>12.4f} {:>12.4f} {:>12.4f} {:>12.4f}".format(
+            len(mesh[0]), len(tin), queries, t_build, 1000.0 * t_tin / queries,
+            max(abs(z - t) for z, t in zip(zs, truth)), 1000.0 * t_near / queries,
+            max(abs(z - t) for z, t in zip(near, truth))))
+
+
+def bench_meshcache(sizes=(50000, 200000), queries=5000, seed=7):
+    """Cold TIN build (triangles + grid) vs reading it back from the binary cache."""
+    print("{:>8} {:>9} {:>10} {:>10} {:>10} {:>8} {:>8}".format(
+        "vertices", "triangles", "build s", "save s", "load s", "MB", "same"))
+    rnd    = random.Random(seed)
+    folder = tempfile.mkdtemp()
+    for n in sizes:
+        mesh, side = synthetic_tin(n)
+        path = os.path.join(folder, "bench{}.tin".format(n))
+        t_build, tin = _timed(TIN, *mesh)
+        t_save, _    = _timed(save_tin, path, tin, "token")
+        t_load, back = _timed(load_tin, path, "token")
+        qx = [rnd.uniform(0, side) for _ in range(queries)]
+        qy = [rnd.uniform(0, side) for _ in range(queries)]
+        print("{:>8} {:>9} {:>10.3f} {:>10.3f} {:>10.3f} {:>8.1f} {:>8}".format(
+            len(mesh[0]), len(tin), t_build, t_save, t_load, os.path.getsize(path) / 1048576.0,
+            str(tin.heights(qx, qy) == back.heights(qx, qy) and load_tin(path, "other") is None)))
+        os.remove(path)
+    os.rmdir(folder)
+
+
+def bench_numpy(n=200000, queries=1000000, python_queries=100000, seed=8):
+    """NumPy backend vs pure Python for batch heights and nearest vertices.
+    The pure-Python side runs on the first `python_queries` points only."""
+    if _vectorized.np is None:
+        print("NumPy is not installed - nothing to compare.")
+        return
+    np = _vectorized.np
+    rnd  = random.Random(seed)
+    mesh, side = synthetic_tin(n)
+    tin  = TIN(*mesh)
+    qx = [rnd.uniform(0, side) for _ in range(queries)]
+    qy = [rnd.uniform(0, side) for _ in range(queries)]
+    sub = slice(0, python_queries)
+
+    t_vtin, vtin  = _timed(_vectorized.VectorTIN, tin)
+    t_vh, vz      = _timed(vtin.heights, qx, qy)
+    t_ph, pz      = _timed(lambda: [tin.height(x, y) for x, y in zip(qx[sub], qy[sub])])
+    same_h = bool(np.allclose(vz[sub], np.array(pz, dtype=float), equal_nan=True))
+
+    t_vpts, vpts  = _timed(_vectorized.VectorPoints, mesh[0], mesh[1])
+    t_vn, vn      = _timed(vpts.nearest, qx, qy)
+    tree          = PointTree(mesh[0], mesh[1])
+    t_pn, pn      = _timed(lambda: [tree.nearest(x, y) for x, y in zip(qx[sub], qy[sub])])
+    sure = vn[sub] >= 0
+    xs, ys = np.asarray(mesh[0]), np.asarray(mesh[1])
+    vd = np.hypot(xs[vn[sub][sure]] - np.asarray(qx[sub])[sure], ys[vn[sub][sure]] - np.asarray(qy[sub])[sure])
+    same_n = bool(np.allclose(vd, np.array([d for d, _ in pn])[sure]))
+
+    print("{} vertices, {} triangles, {} queries (Python side: {})".format(
+        len(mesh[0]), len(tin), queries, python_queries))
+    print("{:>10} {:>10} {:>12} {:>12} {:>8} {:>8}".format(
+        "query", "build s", "numpy us/q", "python us/q", "misses", "same"))
+    print("{:>10} {:>10.3f} {:>12.3f} {:>12.3f} {:>8} {:>8}".format(
+        "heights", t_vtin, 1e6 * t_vh / queries, 1e6 * t_ph / python_queries,
+        int(np.isnan(vz).sum()), str(same_h)))
+    print("{:>10} {:>10.3f} {:>12.3f} {:>12.3f} {:>8} {:>8}".format(
+        "nearest", t_vpts, 1e6 * t_vn / queries, 1e6 * t_pn / python_queries,
+        int((vn < 0).sum()), str(same_n)))
+
+
+def synthetic_floor(vertices=40, holes=3, seed=9):
+    """Star-shaped floor outline of lines with one arc edge, plus square holes."""
+    rnd = random.Random(seed)
+    pts = []
+    for k in range(vertices):
+        ang = 2.0 * math.pi * k / vertices
+        r = rnd.uniform(30.0, 40.0)
+        pts.append((r * math.cos(ang), r * math.sin(ang)))
+    outer = [line_seg(pts[k], pts[k + 1]) for k in range(vertices - 2)]
+    # replace the last two edges by an arc bulging out through the closing corner
+    (ax, ay), (bx, by) = pts[-2], pts[0]
+    cx, cy = (ax + bx) / 2.0, (ay + by) / 2.0
+    a0 = math.atan2(ay - cy, ax - cx)
+    outer.append(arc_seg((cx, cy), math.hypot(ax - cx, ay - cy), a0, math.pi))
+    loops = [outer]
+    for k in range(holes):
+        hx, hy = -12.0 + 12.0 * k, rnd.uniform(-5.0, 5.0)
+        corners = [(hx - 2, hy - 2), (hx - 2, hy + 2), (hx + 2, hy + 2), (hx + 2, hy - 2)]
+        loops.append([line_seg(corners[j], corners[(j + 1) % 4]) for j in range(4)])
+    return loops
+
+
+def bench_clip(floors=1000, seed=10):
+    """Half-plane split of a floor sketch (lines, an arc, holes), per floor."""
+    rnd    = random.Random(seed)
+    loops  = synthetic_floor()
+    cuts   = [((rnd.uniform(-10, 10), rnd.uniform(-10, 10)), (rnd.uniform(-1, 1), rnd.uniform(-1, 1)))
+              for _ in range(floors)]
+    t, results = _timed(lambda: [split_loops(loops, o, d) for o, d in cuts])
+    done = [r for r in results if r is not None]
+    print("{:>8} {:>10} {:>12} {:>10} {:>10}".format("floors", "segments", "ms / floor", "islands", "fallback"))
+    print("{:>8} {:>10} {:>12.3f} {:>10.2f} {:>10}".format(
+        floors, sum(len(l) for l in loops), 1000.0 * t / floors,
+        sum(len(left) + len(right) for left, right in done) / float(max(len(done), 1)),
+        len(results) - len(done)))
+
+    # pour-zone grid: 3 + 3 cut lines applied in one pass
+    grid = [((x + 0.37, 0.0), (0.0, 1.0)) for x in (-20.0, 0.0, 20.0)] + \
+           [((0.0, y + 0.53), (1.0, 0.0)) for y in (-20.0, 0.0, 20.0)]
+    runs = max(1, floors // 10)
+    t, pieces = _timed(lambda: [split_region(loops, grid) for _ in range(runs)])
+    print("{:>8} {:>10} {:>12.3f} {:>10} {:>10}   (grid of {} cuts)".format(
+        runs, sum(len(l) for l in loops), 1000.0 * t / runs, len(pieces[0]), 0, len(grid)))
+
+
+def synthetic_floor_edges(n_floors, seed=11):
+    """Top-face edges of a grid of 20' x 20' floors sharing their sides.
+    Every 7th floor is shifted by 3 mm (NEAR matches with its neighbours),
+    every 5th has its left side in two pieces (OVERLAP with the neighbour).
+    :return: (cols, owners)"""
+    rnd  = random.Random(seed)
+    side = int(math.ceil(math.sqrt(n_floors)))
+    x0, y0, z0, x1, y1, z1, owners = [], [], [], [], [], [], []
+    for f in range(n_floors):
+        ox, oy = (f % side) * 20.0, (f // side) * 20.0
+        if f % 7 == 3:
+            ox += 3 * MM; oy -= 3 * MM
+        corners = [(ox, oy), (ox + 20.0, oy), (ox + 20.0, oy + 20.0), (ox, oy + 20.0)]
+        sides = [(corners[k], corners[(k + 1) % 4]) for k in range(3)]
+        if f % 5 == 0:
+            cut = rnd.uniform(5.0, 15.0)
+            sides += [((ox, oy + 20.0), (ox, oy + cut)), ((ox, oy + cut), (ox, oy))]
+        else:
+            sides.append((corners[3], corners[0]))
+        for (ax, ay), (bx, by) in sides:
+            x0.append(ax); y0.append(ay); z0.append(0.0)
+            x1.append(bx); y1.append(by); z1.append(0.0)
+            owners.append(f)
+    return (x0, y0, z0, x1, y1, z1), owners
+
+
+def _naive_edges(cols, owners, tolerance=TOLERANCE, near=NEAR_TOLERANCE, angle_tolerance=NEAR_ANGLE):
+    """Reference for mutual_edges: every pair of edges compared directly, O(n^2)."""
+    x0, y0, z0, x1, y1, z1 = cols
+    dist = lambda ax, ay, az, bx, by, bz: math.sqrt((ax - bx) ** 2 + (ay - by) ** 2 + (az - bz) ** 2)
+    found = []
+    for i in range(len(x0)):
+        length = math.hypot(x1[i] - x0[i], y1[i] - y0[i])
+        ux, uy = (x1[i] - x0[i]) / length, (y1[i] - y0[i]) / length
+        along  = lambda x, y: (x - x0[i]) * ux + (y - y0[i]) * uy
+        for j in range(i + 1, len(x0)):
+            if owners[i] == owners[j]:
+                continue
+            d = min(max(dist(x0[i], y0[i], z0[i], x0[j], y0[j], z0[j]), dist(x1[i], y1[i], z1[i], x1[j], y1[j], z1[j])),
+                    max(dist(x0[i], y0[i], z0[i], x1[j], y1[j], z1[j]), dist(x1[i], y1[i], z1[i], x0[j], y0[j], z0[j])))
+            if d <= tolerance:
+                found.append((COINCIDENT, i, j, d))
+            elif d <= near:
+                found.append((NEAR, i, j, d))
+            elif is_colinear(cols, i, j, angle_tolerance):
+                mx, my = (x0[j] + x1[j]) / 2.0, (y0[j] + y1[j]) / 2.0
+                if abs((mx - x0[i]) * -uy + (my - y0[i]) * ux) > near:
+                    continue
+                tj = sorted((along(x0[j], y0[j]), along(x1[j], y1[j])))
+                shared = min(length, tj[1]) - max(0.0, tj[0])
+                if shared > near:
+                    found.append((OVERLAP, i, j, shared))
+    return found
+
+
+def bench_edges(sizes=(400, 2500, 10000, 25000), naive_limit=400):
+    """Project-wide shared-edge index over floor top-face edges, checked
+    against the pairwise reference on the small sizes."""
+    print("{:>8} {:>8} {:>10} {:>6} {:>8} {:>10} {:>8} {:>10} {:>6}".format(
+        "floors", "edges", "coincident", "near", "overlap", "index s", "snaps", "naive s", "same"))
+    key = lambda f: (f[0], f[1], f[2], round(f[3], 6))
+    for n in sizes:
+        cols, owners = synthetic_floor_edges(n)
+        t, found = _timed(mutual_edges, cols, owners)
+        kinds = [k for k, _i, _j, _v in found]
+        moves = snap_moves(cols, owners, found)
+        naive, same = "-", "-"
+        if n <= naive_limit:
+            t_naive, ref = _timed(_naive_edges, cols, owners)
+            naive = "{:.3f}".format(t_naive)
+            same  = str(sorted(map(key, ref)) == sorted(map(key, found)))
+        print("{:>8} {:>8} {:>10} {:>6} {:>8} {:>10.3f} {:>8} {:>10} {:>6}".format(
+            n, len(owners), kinds.count(COINCIDENT), kinds.count(NEAR), kinds.count(OVERLAP), t,
+            sum(len(m) for m in moves.values()), naive, same))
+
+
+BENCHMARKS = {
+    "arcs": bench_arcs,
+    "incremental": bench_incremental,
+    "topology": bench_topology,
+    "gaps": bench_gaps,
+    "snapshot": bench_snapshot,
+    "endpoint": bench_endpoint_index,
+    "families": bench_colinear_families,
+    "nearest": bench_nearest,
+    "tin": bench_tin,
+    "meshcache": bench_meshcache,
+    "numpy": bench_numpy,
+    "clip": bench_clip,
+    "edges": bench_edges,
+}
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or sorted(BENCHMARKS)
+    for name in names:
+        print("== {}".format(name))
+        BENCHMARKS[name]()
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""2D clipping of sketch loops by a cutting line.
+Splits a planar region (outer loops + holes, made of lines and arcs) into
+the parts left and right of an infinite line, without any Solid booleans.
+Segments are plain tuples in plan coordinates (feet):
+    (LINE, p0, p1)
+    (ARC,  p0, p1, center, radius, a0, sweep)   sweep > 0 = counter-clockwise
+Loops are lists of segments, end to end. Regions must be oriented (outer
+loops counter-clockwise, holes clockwise - see orient_loops) so the kept
+side of every loop is on its left.
+
+Clipping walks each loop once: the pieces on the kept side become chains
+that enter and leave through the cutting line. Sorted along the line, the
+crossing points pair up exit -> entry (even-odd), and each pair is closed
+by a new line segment on the cut. Kept loops are then nested into islands
+with their holes (Snippets._loops). Several cuts are applied one after
+the other to the pieces of the previous ones (split_region)."""
+# ╦╔╦╗╔═╗╔═╗╦═╗╔╦╗╔═╗
+# ║║║║╠═╝║ ║╠╦╝ ║ ╚═╗
+# ╩╩ ╩╩  ╚═╝╩╚═ ╩ ╚═╝ IMPORTS
+#==================================================
+import math
+
+from Snippets._loops import polygon_area, polygon_bbox, nest_loops, islands
+
+# ╦  ╦╔═╗╦═╗╦╔═╗╔╗ ╦  ╔═╗╔═╗
+# ╚╗╔╝╠═╣╠╦╝║╠═╣╠╩╗║  ║╣ ╚═╗
+#  ╚╝ ╩ ╩╩╚═╩╩ ╩╚═╝╩═╝╚═╝╚═╝ VARIABLES
+#==================================================
+LINE, ARC = "L", "A"
+TOLERANCE = 1.0e-6          # feet. A vertex this close to the cut is "on" it.
+TWO_PI    = 2.0 * math.pi
+ARC_STEP  = math.pi / 16    # tessellation step for nesting tests
+
+# ╔═╗╦ ╦╔╗╔╔═╗╔╦╗╦╔═╗╔╗╔╔═╗
+# ╠╣ ║ ║║║║║   ║ ║║ ║║║║╚═╗
+# ╚  ╚═╝╝╚╝╚═╝ ╩ ╩╚═╝╝╚╝╚═╝ FUNCTIONS
+#==================================================
+def line_seg(p0, p1):
+    return (LINE, p0, p1)
+
+
+def arc_seg(center, radius, a0, sweep):
+    cx, cy = center
+    a1 = a0 + sweep
+    return (ARC, (cx + radius * math.cos(a0), cy + radius * math.sin(a0)),
+            (cx + radius * math.cos(a1), cy + radius * math.sin(a1)), center, radius, a0, sweep)
+
+
+def seg_point(seg, f):
+    """Point at fraction f (0..1) along the segment."""
+    if seg[0] == LINE:
+        (x0, y0), (x1, y1) = seg[1], seg[2]
+        return x0 + f * (x1 - x0), y0 + f * (y1 - y0)
+    (cx, cy), r, a0, sweep = seg[3:]
+    a = a0 + f * sweep
+    return cx + r * math.cos(a), cy + r * math.sin(a)
+
+
+def reverse(seg):
+    if seg[0] == LINE:
+        return (LINE, seg[2], seg[1])
+    center, r, a0, sweep = seg[3:]
+    return (ARC, seg[2], seg[1], center, r, a0 + sweep, -sweep)
+
+
+def _sub(seg, f0, f1):
+    """Part of the segment between fractions f0 < f1."""
+    if seg[0] == LINE:
+        return (LINE, seg_point(seg, f0), seg_point(seg, f1))
+    center, r, a0, sweep = seg[3:]
+    return arc_seg(center, r, a0 + f0 * sweep, (f1 - f0) * sweep)
+
+
+def tessellate(loop):
+    """Loop as a list of (x, y) points, arcs sampled every ARC_STEP."""
+    pts = []
+    for seg in loop:
+        pts.append(seg[1])
+        if seg[0] == ARC:
+            steps = int(abs(seg[6]) / ARC_STEP)
+            pts.extend(seg_point(seg, float(k) / (steps + 1)) for k in range(1, steps + 1))
+    return pts
+
+
+def chain_loop(segs, tolerance=TOLERANCE):
+    """Order and flip unordered segments into one closed loop.
+    Raises ValueError if they don't close up."""
+    tol2  = tolerance * tolerance
+    close = lambda p, q: (p[0] - q[0]) ** 2 + (p[1] - q[1]) ** 2 <= tol2
+    rest  = list(segs[1:])
+    loop  = [segs[0]]
+    while rest:
+        end = loop[-1][2]
+        for k, seg in enumerate(rest):
+            if close(seg[1], end):
+                loop.append(rest.pop(k))
+                break
+            if close(seg[2], end):
+                loop.append(reverse(rest.pop(k)))
+                break
+        else:
+            raise ValueError("Loop is not closed")
+    if not close(loop[-1][2], loop[0][1]):
+        raise ValueError("Loop is not closed")
+    return loop
+
+
+def orient_loops(loops):
+    """Outer loops counter-clockwise, holes clockwise (by nesting depth)."""
+    polygons = [tessellate(loop) for loop in loops]
+    _, depths = nest_loops(polygons)
+    oriented = []
+    for loop, pts, depth in zip(loops, polygons, depths):
+        if (polygon_area(pts) > 0) != (depth % 2 == 0):
+            loop = [reverse(seg) for seg in reversed(loop)]
+        oriented.append(loop)
+    return oriented
+
+
+def _split(seg, origin, u, n):
+    """Pieces of `seg` on either side of the line, as (piece, side) with side = +1 on the left."""
+    ox, oy = origin
+    side = lambda p: (p[0] - ox) * n[0] + (p[1] - oy) * n[1]
+    cuts = []
+    if seg[0] == LINE:
+        d0, d1 = side(seg[1]), side(seg[2])
+        if (d0 > 0) != (d1 > 0):
+            cuts.append(d0 / (d0 - d1))
+    else:
+        (cx, cy), r, a0, sweep = seg[3:]
+        dc = side((cx, cy))
+        half2 = r * r - dc * dc
+        if half2 > TOLERANCE * TOLERANCE:
+            half = math.sqrt(half2)
+            fx, fy = cx - dc * n[0], cy - dc * n[1]          # foot of the center on the line
+            for s in (-half, half):
+                angle = math.atan2(fy + s * u[1] - cy, fx + s * u[0] - cx)
+                f = ((angle - a0) * (1 if sweep > 0 else -1)) % TWO_PI / abs(sweep)
+                if 0.0 < f < 1.0:
+                    cuts.append(f)
+        cuts.sort()
+    bounds = [0.0] + cuts + [1.0]
+    pieces = []
+    for f0, f1 in zip(bounds, bounds[1:]):
+        piece = seg if len(bounds) == 2 else _sub(seg, f0, f1)
+        pieces.append((piece, 1 if side(seg_point(seg, (f0 + f1) / 2.0)) > 0 else -1))
+    return pieces
+
+
+def clip_loops(loops, origin, direction):
+    """Loops of the region left of the line through `origin` along `direction`.
+    :param loops: oriented loops (orient_loops)
+    :return: list of loops, or None if the cut runs through a vertex"""
+    length = math.hypot(direction[0], direction[1])
+    u = (direction[0] / length, direction[1] / length)
+    n = (-u[1], u[0])
+    ox, oy = origin
+    along = lambda p: (p[0] - ox) * u[0] + (p[1] - oy) * u[1]
+    for loop in loops:
+        for seg in loop:
+            if abs((seg[1][0] - ox) * n[0] + (seg[1][1] - oy) * n[1]) <= TOLERANCE:
+                return None
+
+    kept, chains, crossings = [], [], []
+    for loop in loops:
+        pieces = [piece for seg in loop for piece in _split(seg, origin, u, n)]
+        entries = [k for k in range(len(pieces)) if pieces[k][1] > 0 and pieces[k - 1][1] < 0]
+        if not entries:
+            if pieces[0][1] > 0:
+                kept.append(loop)               # whole loop on the kept side
+            continue
+        pieces = pieces[entries[0]:] + pieces[:entries[0]]
+        chain = None
+        for piece, side in pieces:
+            if side > 0:
+                if chain is None:
+                    chain = []
+                    chains.append(chain)
+                chain.append(piece)
+            elif chain is not None:
+                chain = None
+    for c, chain in enumerate(chains):
+        crossings.append((along(chain[0][1]), 1, c))            # entry
+        crossings.append((along(chain[-1][2]), 0, c))           # exit
+    crossings.sort()
+
+    # inside the region along the cut: crossings 0-1, 2-3, ... each joins an exit to an entry
+    following = {}
+    for (t0, kind0, c0), (t1, kind1, c1) in zip(crossings[::2], crossings[1::2]):
+        if kind0 == kind1:
+            return None                         # loops not oriented
+        exit_c, entry_c = (c0, c1) if kind0 == 0 else (c1, c0)
+        following[exit_c] = entry_c
+
+    visited = set()
+    for start in range(len(chains)):
+        if start in visited:
+            continue
+        loop, c = [], start
+        while c not in visited:
+            visited.add(c)
+            loop.extend(chains[c])
+            nxt = following[c]
+            loop.append(line_seg(chains[c][-1][2], chains[nxt][0][1]))
+            c = nxt
+        kept.append(loop)
+    return kept
+
+
+def split_loops(loops, origin, direction):
+    """Split a region by the line into its left and right parts.
+    :return: (left, right) - each a list of islands [outer loop, hole loops...],
+             or None if the cut runs through a vertex"""
+    loops = orient_loops(loops)
+    sides = []
+    for d in (direction, (-direction[0], -direction[1])):
+        clipped = clip_loops(loops, origin, d)
+        if clipped is None:
+            return None
+        polygons = [tessellate(loop) for loop in clipped]
+        sides.append([[clipped[outer]] + [clipped[h] for h in holes] for outer, holes in islands(polygons)])
+    return sides[0], sides[1]
+
+
+def box_side(box, origin, direction):
+    """+1 / -1 if the box (min x, min y, max x, max y) lies entirely left /
+    right of the line, 0 if the line crosses it."""
+    ox, oy = origin
+    dx, dy = direction
+    sides = set()
+    for x in (box[0], box[2]):
+        for y in (box[1], box[3]):
+            d = dx * (y - oy) - dy * (x - ox)
+            sides.add(1 if d > TOLERANCE else -1 if d < -TOLERANCE else 0)
+    return sides.pop() if len(sides) == 1 and 0 not in sides else 0
+
+
+def split_region(loops, cuts):
+    """Split a region by several infinite lines in one pass.
+    Every cut only touches the pieces whose bounding box it crosses.
+    :param cuts: list of (origin, direction)
+    :return: list of islands [outer loop, hole loops...], or None if a cut
+             runs through a vertex"""
+    loops = orient_loops(loops)
+    polygons = [tessellate(loop) for loop in loops]
+    pieces = [[loops[outer]] + [loops[h] for h in holes] for outer, holes in islands(polygons)]
+    for origin, direction in cuts:
+        next_pieces = []
+        for piece in pieces:
+            if box_side(polygon_bbox(tessellate(piece[0])), origin, direction):
+                next_pieces.append(piece)
+                continue
+            split = split_loops(piece, origin, direction)
+            if split is None:
+                return None
+            next_pieces.extend(split[0] + split[1])
+        pieces = next_pieces
+    return pieces
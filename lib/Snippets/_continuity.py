@@ -0,0 +1,403 @@
+# -*- coding: utf-8 -*-
+"""Shared engine for the LineContinuity / RoomSeparationContinuity tools.
+Finds colinear segments that touch, overlap or contain each other and
+groups them for merging; co-circular arcs are grouped the same way.
+Everything works on the float columns of a CurveSnapshot (x0, y0, z0,
+x1, y1, z1) or an ArcSnapshot, so nothing below calls back into the
+Revit API."""
+# ╦╔╦╗╔═╗╔═╗╦═╗╔╦╗╔═╗
+# ║║║║╠═╝║ ║╠╦╝ ║ ╚═╗
+# ╩╩ ╩╩  ╚═╝╩╚═ ╩ ╚═╝ IMPORTS
+#==================================================
+import math
+
+from Snippets._spatial   import touching_pairs, TOLERANCE
+from Snippets._unionfind import DisjointSet
+from Snippets._snapshot  import TWO_PI
+
+# ╦  ╦╔═╗╦═╗╦╔═╗╔╗ ╦  ╔═╗╔═╗
+# ╚╗╔╝╠═╣╠╦╝║╠═╣╠╩╗║  ║╣ ╚═╗
+#  ╚╝ ╩ ╩╩╚═╩╩ ╩╚═╝╩═╝╚═╝╚═╝ VARIABLES
+#==================================================
+ANGLE_TOLERANCE = 1.0e-6    # radians. Max angle between two "colinear" directions.
+
+# ╔═╗╦ ╦╔╗╔╔═╗╔╦╗╦╔═╗╔╗╔╔═╗
+# ╠╣ ║ ║║║║║   ║ ║║ ║║║║╚═╗
+# ╚  ╚═╝╝╚╝╚═╝ ╩ ╩╚═╝╝╚╝╚═╝ FUNCTIONS
+#==================================================
+def is_colinear(cols, i, j, angle_tolerance=ANGLE_TOLERANCE):
+    """True if segments i and j point the same (or opposite) way."""
+    x0, y0, z0, x1, y1, z1 = cols
+    ax = x1[i] - x0[i]; ay = y1[i] - y0[i]; az = z1[i] - z0[i]
+    bx = x1[j] - x0[j]; by = y1[j] - y0[j]; bz = z1[j] - z0[j]
+    la = math.sqrt(ax * ax + ay * ay + az * az)
+    lb = math.sqrt(bx * bx + by * by + bz * bz)
+    if la == 0.0 or lb == 0.0:
+        return False
+    cx = ay * bz - az * by
+    cy = az * bx - ax * bz
+    cz = ax * by - ay * bx
+    return math.sqrt(cx * cx + cy * cy + cz * cz) <= angle_tolerance * la * lb
+
+
+def line_key(x0, y0, x1, y1, origin=(0.0, 0.0), angle_step=ANGLE_TOLERANCE, offset_step=TOLERANCE):
+    """Canonical key of the infinite line through a 2D segment.
+    Hesse normal form: direction angle theta folded into [0, pi) and the
+    signed offset d = n . (p - origin) with n = (-sin theta, cos theta).
+    :return: (angle_bin, offset_bin) or None for a zero-length segment."""
+    dx = x1 - x0; dy = y1 - y0
+    if dx == 0.0 and dy == 0.0:
+        return None
+    theta = math.atan2(dy, dx)
+    if theta < 0.0:
+        theta += math.pi
+    d = (x0 - origin[0]) * -math.sin(theta) + (y0 - origin[1]) * math.cos(theta)
+
+    n_bins = int(round(math.pi / angle_step))
+    a = int(round(theta / angle_step))
+    if a >= n_bins:             # theta ~ pi is the same line as theta ~ 0
+        a -= n_bins; d = -d
+    return a, int(round(d / offset_step))
+
+
+def _neighbour_keys(key, n_bins):
+    """The 3x3 block of keys around a line key, wrapping the angle at pi."""
+    a, o = key
+    for da in (0, -1, 1):
+        na, flip = a + da, False
+        if na < 0:
+            na += n_bins; flip = True
+        elif na >= n_bins:
+            na -= n_bins; flip = True
+        base = -o if flip else o
+        for do in (0, -1, 1):
+            yield na, base + do
+
+
+def colinear_families(cols, indices=None, tolerance=TOLERANCE, angle_tolerance=ANGLE_TOLERANCE):
+    """Bucket segments into colinear families in a single pass.
+    Segments are keyed by line_key(); a segment whose key lands next to an
+    existing family's key joins that family, so values that straddle a
+    quantization boundary are not split apart. The offset step grows with
+    the extent of the data, because an angle error of angle_tolerance moves
+    the offset by up to |p| * angle_tolerance far from the origin.
+    Non-horizontal segments (z0 != z1) are collected in one extra family.
+    :return: list of families, each a list of segment indices."""
+    x0, y0, z0, x1, y1, z1 = cols
+    if indices is None:
+        indices = range(len(x0))
+    if not indices:
+        return []
+
+    xs = [x0[i] for i in indices] + [x1[i] for i in indices]
+    ys = [y0[i] for i in indices] + [y1[i] for i in indices]
+    origin = ((min(xs) + max(xs)) / 2.0, (min(ys) + max(ys)) / 2.0)
+    radius = max(max(xs) - min(xs), max(ys) - min(ys)) / 2.0
+    offset_step = max(tolerance, radius * angle_tolerance)
+    n_bins      = int(round(math.pi / angle_tolerance))
+
+    families = {}       # (z_bin, angle_bin, offset_bin) -> [indices]
+    sloped   = []
+    for i in indices:
+        if abs(z1[i] - z0[i]) > tolerance:
+            sloped.append(i)
+            continue
+        key = line_key(x0[i], y0[i], x1[i], y1[i], origin, angle_tolerance, offset_step)
+        if key is None:
+            continue
+        z_bin = int(round(z0[i] / tolerance))
+        for dz in (0, -1, 1):
+            found = None
+            for nkey in _neighbour_keys(key, n_bins):
+                found = families.get((z_bin + dz,) + nkey)
+                if found is not None:
+                    break
+            if found is not None:
+                break
+        if found is None:
+            families[(z_bin,) + key] = [i]
+        else:
+            found.append(i)
+
+    result = list(families.values())
+    if sloped:
+        result.append(sloped)
+    return result
+
+
+def colinear_touching_pairs(cols, tolerance=TOLERANCE, angle_tolerance=ANGLE_TOLERANCE, families=None):
+    """Pairs (i, j) of colinear segments that share an endpoint.
+    Candidates are only looked for inside a colinear family, using a small
+    endpoint grid per family, so distant or non-parallel lines are never
+    compared."""
+    if families is None:
+        families = colinear_families(cols, tolerance=tolerance, angle_tolerance=angle_tolerance)
+    pairs = []
+    for family in families:
+        if len(family) < 2:
+            continue
+        for i, j in touching_pairs(*cols, tolerance=tolerance, indices=family):
+            if is_colinear(cols, i, j, angle_tolerance):
+                pairs.append((i, j))
+    return pairs
+
+
+def family_frame(cols, family):
+    """Origin and 2D unit direction of the longest segment in a family."""
+    x0, y0, z0, x1, y1, z1 = cols
+    best, best_len = family[0], -1.0
+    for i in family:
+        length = (x1[i] - x0[i]) ** 2 + (y1[i] - y0[i]) ** 2
+        if length > best_len:
+            best, best_len = i, length
+    length = math.sqrt(best_len)
+    return (x0[best], y0[best]), ((x1[best] - x0[best]) / length, (y1[best] - y0[best]) / length)
+
+
+def sweep_pairs(cols, family, tolerance=TOLERANCE):
+    """Sorted-interval sweep over one colinear family, O(k log k).
+    Every segment is projected onto the family line as an interval [lo, hi].
+    Segments sitting on the same line (offset within tolerance) are swept
+    in order of lo; a segment that touches, overlaps or lies inside the
+    running interval is paired with the segment that opened it.
+    :return: list of (i, j) pairs; each maximal interval is one component."""
+    x0, y0, z0, x1, y1, z1 = cols
+    (ox, oy), (ux, uy) = family_frame(cols, family)
+
+    rows = []
+    for i in family:
+        ax = x0[i] - ox; ay = y0[i] - oy
+        bx = x1[i] - ox; by = y1[i] - oy
+        off0 = ax * -uy + ay * ux
+        off1 = bx * -uy + by * ux
+        if abs(off0 - off1) > tolerance:
+            continue                        # not parallel within tolerance
+        t0 = ax * ux + ay * uy
+        t1 = bx * ux + by * uy
+        rows.append(((off0 + off1) / 2.0, min(t0, t1), max(t0, t1), i))
+    rows.sort()
+
+    pairs = []
+    start = 0
+    for k in range(1, len(rows) + 1):
+        # split the family into distinct parallel lines by offset
+        if k < len(rows) and rows[k][0] - rows[k - 1][0] <= tolerance:
+            continue
+        line = sorted(rows[start:k], key=lambda r: r[1])
+        start = k
+        opener, reach = None, None
+        for _off, lo, hi, i in line:
+            if opener is not None and lo <= reach + tolerance:
+                pairs.append((opener, i))
+                if hi > reach:
+                    reach = hi
+            else:
+                opener, reach = i, hi
+    return pairs
+
+
+def colinear_merge_pairs(cols, tolerance=TOLERANCE, angle_tolerance=ANGLE_TOLERANCE, families=None):
+    """Pairs of colinear segments that touch, overlap or contain each other,
+    found by sweep_pairs() inside every family. Non-horizontal segments
+    fall back to endpoint-touching pairs."""
+    x0, y0, z0, x1, y1, z1 = cols
+    if families is None:
+        families = colinear_families(cols, tolerance=tolerance, angle_tolerance=angle_tolerance)
+    pairs = []
+    for family in families:
+        if len(family) < 2:
+            continue
+        i = family[0]
+        if abs(z1[i] - z0[i]) > tolerance:
+            pairs.extend(colinear_touching_pairs(cols, tolerance, angle_tolerance, [family]))
+        else:
+            pairs.extend(sweep_pairs(cols, family, tolerance))
+    return pairs
+
+
+def merged_extent(cols, members):
+    """End points of the single segment replacing a group of colinear members:
+    the two extreme endpoints along the direction of the longest member.
+    :return: ((x, y, z), (x, y, z)) or None if the group is degenerate."""
+    x0, y0, z0, x1, y1, z1 = cols
+    best, best_len = None, 0.0
+    for i in members:
+        length = (x1[i] - x0[i]) ** 2 + (y1[i] - y0[i]) ** 2 + (z1[i] - z0[i]) ** 2
+        if length > best_len:
+            best, best_len = i, length
+    if best is None:
+        return None
+    length = math.sqrt(best_len)
+    ox, oy, oz = x0[best], y0[best], z0[best]
+    ux = (x1[best] - ox) / length; uy = (y1[best] - oy) / length; uz = (z1[best] - oz) / length
+
+    lo = hi = None
+    for i in members:
+        for p in ((x0[i], y0[i], z0[i]), (x1[i], y1[i], z1[i])):
+            t = (p[0] - ox) * ux + (p[1] - oy) * uy + (p[2] - oz) * uz
+            if lo is None or t < lo[0]:
+                lo = (t, p)
+            if hi is None or t > hi[0]:
+                hi = (t, p)
+    if hi[0] - lo[0] <= TOLERANCE:
+        return None
+    return lo[1], hi[1]
+
+
+def connected_groups(pairs, components=None):
+    """Connected components (lists of indices) of the graph given by pairs.
+    Pairs are fed straight into a DisjointSet - no adjacency lists, no
+    second pass. Pass an existing DisjointSet to extend it incrementally.
+    Only indices that appear in a pair are returned."""
+    if components is None:
+        components = DisjointSet()
+    components.union_pairs(pairs)
+    return [sorted(members) for members in components.groups(min_size=2).values()]
+
+
+def group_records(snapshot, groups, **fields):
+    """One flat record per group, for dry runs: nothing is created or deleted.
+    Extra keyword fields (view, style, ...) are copied into every record.
+    Yields records lazily so they can be streamed straight to disk."""
+    cols = snapshot.cols
+    for grp in groups:
+        extent = merged_extent(cols, grp)
+        record = dict(fields)
+        record["ids"]     = [int(snapshot.ids[k]) for k in grp]
+        record["count"]   = len(grp)
+        record["removed"] = len(grp) - 1 if extent is not None else 0
+        record["start"]   = list(extent[0]) if extent is not None else None
+        record["end"]     = list(extent[1]) if extent is not None else None
+        record["length"]  = math.sqrt(sum((b - a) ** 2 for a, b in zip(*extent))) if extent is not None else 0.0
+        yield record
+
+
+#>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>> ARCS
+
+def arc_key(cols, i, tolerance=TOLERANCE, angle_tolerance=ANGLE_TOLERANCE):
+    """Canonical key of the circle an arc lies on:
+    (normal bins, (cx, cy, cz, r) bins). Normals are already canonical
+    (ArcSnapshot), so an arc and its reversed copy share a key."""
+    cx, cy, cz, nx, ny, nz, r, a0, a1 = cols
+    return ((int(round(nx[i] / angle_tolerance)), int(round(ny[i] / angle_tolerance)),
+             int(round(nz[i] / angle_tolerance))),
+            (int(round(cx[i] / tolerance)), int(round(cy[i] / tolerance)),
+             int(round(cz[i] / tolerance)), int(round(r[i] / tolerance))))
+
+
+def _arc_neighbour_keys(key):
+    """The 3x3x3x3 block of circle bins around a key (same normal bin)."""
+    normal, (x, y, z, r) = key
+    yield key
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            for dz in (-1, 0, 1):
+                for dr in (-1, 0, 1):
+                    if dx or dy or dz or dr:
+                        yield normal, (x + dx, y + dy, z + dz, r + dr)
+
+
+def arc_families(cols, indices=None, tolerance=TOLERANCE, angle_tolerance=ANGLE_TOLERANCE):
+    """Bucket arcs into co-circular families (same plane, centre and radius)
+    in a single pass, with the same neighbour absorption as colinear_families().
+    :return: list of families, each a list of arc indices."""
+    if indices is None:
+        indices = range(len(cols[0]))
+    families = {}
+    for i in indices:
+        key   = arc_key(cols, i, tolerance, angle_tolerance)
+        found = None
+        for nkey in _arc_neighbour_keys(key):
+            found = families.get(nkey)
+            if found is not None:
+                break
+        if found is None:
+            families[key] = [i]
+        else:
+            found.append(i)
+    return list(families.values())
+
+
+def arc_sweep_pairs(cols, family, tolerance=TOLERANCE):
+    """Angular-interval sweep over one co-circular family, O(k log k).
+    Every interval is swept twice, as [a0, a1] and shifted by 2pi, so arcs
+    that overlap across the 0 / 2pi seam are found by a plain linear sweep.
+    :return: list of (i, j) pairs"""
+    cx, cy, cz, nx, ny, nz, r, a0, a1 = cols
+    gap = tolerance / max(r[family[0]], tolerance)      # tolerance as an angle
+    rows = []
+    for i in family:
+        rows.append((a0[i], a1[i], i))
+        rows.append((a0[i] + TWO_PI, a1[i] + TWO_PI, i))
+    rows.sort()
+
+    pairs = []
+    opener, reach = None, None
+    for lo, hi, i in rows:
+        if opener is not None and lo <= reach + gap:
+            if i != opener:
+                pairs.append((opener, i))
+            if hi > reach:
+                reach = hi
+        else:
+            opener, reach = i, hi
+    return pairs
+
+
+def arc_merge_pairs(cols, tolerance=TOLERANCE, angle_tolerance=ANGLE_TOLERANCE, families=None):
+    """Pairs of co-circular arcs that touch, overlap or contain each other."""
+    if families is None:
+        families = arc_families(cols, tolerance=tolerance, angle_tolerance=angle_tolerance)
+    pairs = []
+    for family in families:
+        if len(family) > 1:
+            pairs.extend(arc_sweep_pairs(cols, family, tolerance))
+    return pairs
+
+
+def merged_arc(cols, members, tolerance=TOLERANCE):
+    """The single arc replacing a group of co-circular members: the circle of
+    the longest member, spanning everything but the largest uncovered gap.
+    :return: (row of the reference member, start angle, end angle) or None
+             if the members cover the whole circle."""
+    cx, cy, cz, nx, ny, nz, r, a0, a1 = cols
+    best = max(members, key=lambda i: (a1[i] - a0[i]) * r[i])
+    gap  = tolerance / max(r[best], tolerance)
+
+    # members that wrap past 2*pi also cover the low angles: add them again shifted back
+    intervals = [(a0[i], a1[i]) for i in members]
+    intervals += [(a0[i] - TWO_PI, a1[i] - TWO_PI) for i in members if a1[i] > TWO_PI]
+    intervals.sort()
+    first, reach = intervals[0]
+    largest = (0.0, None)
+    for lo, hi in intervals[1:]:
+        if lo - reach > largest[0]:
+            largest = (lo - reach, lo)
+        reach = max(reach, hi)
+    wrap = first + TWO_PI - reach
+    if wrap > largest[0]:
+        largest = (wrap, first + TWO_PI)
+    if largest[0] <= gap:
+        return None
+    end = largest[1] % TWO_PI               # the arc starts where the gap ends
+    return best, end, end + TWO_PI - largest[0]
+
+
+def arc_group_records(arcs, groups, **fields):
+    """group_records() for an ArcSnapshot: one record per arc group."""
+    cols = arcs.cols
+    for grp in groups:
+        merged = merged_arc(cols, grp)
+        record = dict(fields)
+        record["ids"]     = [int(arcs.ids[k]) for k in grp]
+        record["count"]   = len(grp)
+        record["removed"] = len(grp) - 1 if merged is not None else 0
+        if merged is not None:
+            ref, start, end = merged
+            record["start"]  = list(arcs.point(ref, start))
+            record["end"]    = list(arcs.point(ref, end))
+            record["length"] = arcs.r[ref] * (end - start)
+        else:
+            record["start"] = record["end"] = None
+            record["length"] = 0.0
+        yield record
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""Shared-edge index across elements (floor top-face edges).
+Answers which floors share boundary edges and where edges almost match:
+    COINCIDENT  both endpoints equal within TOLERANCE
+    NEAR        both endpoints within the near tolerance (a small gap or
+                misalignment that should be made exact)
+    OVERLAP     colinear edges that share part of their length without
+                matching end to end (a long edge against several short ones)
+Only edges of different owners are compared. Endpoints are hashed into an
+EndpointIndex and overlaps are swept per colinear family, so the whole
+project runs in roughly linear time. Edges are the float columns of a
+CurveSnapshot (x0, y0, z0, x1, y1, z1) plus one owner per row."""
+# ╦╔╦╗╔═╗╔═╗╦═╗╔╦╗╔═╗
+# ║║║║╠═╝║ ║╠╦╝ ║ ╚═╗
+# ╩╩ ╩╩  ╚═╝╩╚═ ╩ ╚═╝ IMPORTS
+#==================================================
+import math
+
+from Snippets._spatial    import EndpointIndex, TOLERANCE
+from Snippets._continuity import colinear_families, family_frame
+
+# ╦  ╦╔═╗╦═╗╦╔═╗╔╗ ╦  ╔═╗╔═╗
+# ╚╗╔╝╠═╣╠╦╝║╠═╣╠╩╗║  ║╣ ╚═╗
+#  ╚╝ ╩ ╩╩╚═╩╩ ╩╚═╝╩═╝╚═╝╚═╝ VARIABLES
+#==================================================
+MM              = 1 / 304.8
+NEAR_TOLERANCE  = 10 * MM   # feet. Endpoints closer than this "almost" match.
+NEAR_ANGLE      = 1.0e-3    # radians. Max angle between overlapping edges.
+COINCIDENT, NEAR, OVERLAP = "coincident", "near", "overlap"
+
+# ╔═╗╦ ╦╔╗╔╔═╗╔╦╗╦╔═╗╔╗╔╔═╗
+# ╠╣ ║ ║║║║║   ║ ║║ ║║║║╚═╗
+# ╚  ╚═╝╝╚╝╚═╝ ╩ ╩╚═╝╝╚╝╚═╝ FUNCTIONS
+#==================================================
+def _end_distance(cols, i, j):
+    """Largest endpoint distance of edges i and j, in the better of both orientations."""
+    x0, y0, z0, x1, y1, z1 = cols
+    d = lambda ax, ay, az, bx, by, bz: math.sqrt((ax - bx) ** 2 + (ay - by) ** 2 + (az - bz) ** 2)
+    same = max(d(x0[i], y0[i], z0[i], x0[j], y0[j], z0[j]), d(x1[i], y1[i], z1[i], x1[j], y1[j], z1[j]))
+    flip = max(d(x0[i], y0[i], z0[i], x1[j], y1[j], z1[j]), d(x1[i], y1[i], z1[i], x0[j], y0[j], z0[j]))
+    return min(same, flip)
+
+
+def matching_edges(cols, owners, tolerance=TOLERANCE, near=NEAR_TOLERANCE):
+    """End-to-end matches between edges of different owners.
+    Candidates share a start point within `near` (any end of the other edge),
+    found through one EndpointIndex with `near` as its cell size.
+    :return: list of (kind, i, j, distance) with i < j"""
+    index = EndpointIndex.from_segments(*cols, tolerance=near)
+    x0, y0, z0 = cols[0], cols[1], cols[2]
+    found = []
+    for i in range(len(x0)):
+        seen = set()
+        for end_id in index.query(x0[i], y0[i], z0[i], near):
+            j = end_id >> 1
+            if j <= i or j in seen or owners[j] == owners[i]:
+                continue
+            seen.add(j)
+            dist = _end_distance(cols, i, j)
+            if dist <= tolerance:
+                found.append((COINCIDENT, i, j, dist))
+            elif dist <= near:
+                found.append((NEAR, i, j, dist))
+    return found
+
+
+def overlapping_edges(cols, owners, near=NEAR_TOLERANCE, angle_tolerance=NEAR_ANGLE, exclude=()):
+    """Colinear edges of different owners sharing more than `near` of their
+    length. Per colinear family, the edges are swept by their interval on
+    the family line; only intervals still open can overlap the next one.
+    :param exclude: (i, j) pairs to skip (already matched end to end)
+    :return: list of (OVERLAP, i, j, shared length) with i < j"""
+    x0, y0, z0, x1, y1, z1 = cols
+    exclude = set(exclude)
+    found = []
+    for family in colinear_families(cols, tolerance=near, angle_tolerance=angle_tolerance):
+        if len(family) < 2 or len(set(owners[i] for i in family)) < 2:
+            continue
+        (ox, oy), (ux, uy) = family_frame(cols, family)
+        rows = []
+        for i in family:
+            t0 = (x0[i] - ox) * ux + (y0[i] - oy) * uy
+            t1 = (x1[i] - ox) * ux + (y1[i] - oy) * uy
+            off = ((x0[i] + x1[i]) / 2.0 - ox) * -uy + ((y0[i] + y1[i]) / 2.0 - oy) * ux
+            rows.append((min(t0, t1), max(t0, t1), off, i))
+        rows.sort()
+        active = []
+        for lo, hi, off, i in rows:
+            active = [row for row in active if row[1] > lo + near]
+            for _lo, a_hi, a_off, j in active:
+                if owners[j] == owners[i] or abs(a_off - off) > near:
+                    continue
+                pair   = (min(i, j), max(i, j))
+                shared = min(hi, a_hi) - lo
+                if shared > near and pair not in exclude:
+                    found.append((OVERLAP, pair[0], pair[1], shared))
+            active.append((lo, hi, off, i))
+    return found
+
+
+def mutual_edges(cols, owners, tolerance=TOLERANCE, near=NEAR_TOLERANCE, angle_tolerance=NEAR_ANGLE):
+    """All coincident, near and overlapping edge pairs between owners.
+    :return: list of (kind, i, j, value) - distance for COINCIDENT / NEAR,
+             shared length for OVERLAP"""
+    matches = matching_edges(cols, owners, tolerance, near)
+    pairs   = [(i, j) for _kind, i, j, _d in matches]
+    return matches + overlapping_edges(cols, owners, near, angle_tolerance, exclude=pairs)
+
+
+def snap_moves(cols, owners, found):
+    """Endpoint moves that make NEAR matches exact: the edge of the larger
+    owner is moved onto the edge of the smaller one, so the result does not
+    depend on the order of the pairs. A point is only moved once.
+    :return: dict {owner: [((x, y, z) from, (x, y, z) to), ...]}"""
+    x0, y0, z0, x1, y1, z1 = cols
+    ends = lambda k: ((x0[k], y0[k], z0[k]), (x1[k], y1[k], z1[k]))
+    d2   = lambda p, q: (p[0] - q[0]) ** 2 + (p[1] - q[1]) ** 2 + (p[2] - q[2]) ** 2
+    moves, moved = {}, set()
+    for kind, i, j, _dist in found:
+        if kind != NEAR:
+            continue
+        keep, move = (i, j) if owners[i] < owners[j] else (j, i)
+        (a0, a1), (b0, b1) = ends(keep), ends(move)
+        if d2(a0, b1) + d2(a1, b0) < d2(a0, b0) + d2(a1, b1):
+            a0, a1 = a1, a0
+        for src, dst in ((b0, a0), (b1, a1)):
+            key = (owners[move], src)
+            if src != dst and key not in moved:
+                moved.add(key)
+                moves.setdefault(owners[move], []).append((src, dst))
+    return moves
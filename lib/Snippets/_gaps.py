@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""Near-miss gap finder for line networks (room separation / detail lines).
+Finds dangling endpoints that have another endpoint within a small gap
+(the 1-5 mm misses that break room boundaries) and computes where to snap
+them. Works on the float columns of a CurveSnapshot."""
+# ╦╔╦╗╔═╗╔═╗╦═╗╔╦╗╔═╗
+# ║║║║╠═╝║ ║╠╦╝ ║ ╚═╗
+# ╩╩ ╩╩  ╚═╝╩╚═ ╩ ╚═╝ IMPORTS
+#==================================================
+from Snippets._spatial   import EndpointIndex, TOLERANCE
+from Snippets._unionfind import DisjointSet
+
+# ╦  ╦╔═╗╦═╗╦╔═╗╔╗ ╦  ╔═╗╔═╗
+# ╚╗╔╝╠═╣╠╦╝║╠═╣╠╩╗║  ║╣ ╚═╗
+#  ╚╝ ╩ ╩╩╚═╩╩ ╩╚═╝╩═╝╚═╝╚═╝ VARIABLES
+#==================================================
+MM = 1.0 / 304.8                # feet per millimetre
+GAP_TOLERANCE = 5.0 * MM        # default search radius for near misses
+
+# ╔═╗╦ ╦╔╗╔╔═╗╔╦╗╦╔═╗╔╗╔╔═╗
+# ╠╣ ║ ║║║║║   ║ ║║ ║║║║╚═╗
+# ╚  ╚═╝╝╚╝╚═╝ ╩ ╩╚═╝╝╚╝╚═╝ FUNCTIONS
+#==================================================
+def endpoint(cols, end_id):
+    """(x, y, z) of endpoint id 2 * i (start) or 2 * i + 1 (end)."""
+    x0, y0, z0, x1, y1, z1 = cols
+    i = end_id >> 1
+    if end_id & 1:
+        return x1[i], y1[i], z1[i]
+    return x0[i], y0[i], z0[i]
+
+
+def dangling_endpoints(cols, tolerance=TOLERANCE, index=None):
+    """Endpoint ids that touch no endpoint of another segment."""
+    if index is None:
+        index = EndpointIndex.from_segments(*cols, tolerance=tolerance)
+    dangling = []
+    for end_id in range(2 * len(cols[0])):
+        x, y, z = endpoint(cols, end_id)
+        seg = end_id >> 1
+        if not any((other >> 1) != seg for other in index.query(x, y, z, tolerance)):
+            dangling.append(end_id)
+    return dangling
+
+
+def find_gaps(cols, gap_tolerance=GAP_TOLERANCE, tolerance=TOLERANCE, k=1):
+    """Dangling endpoints with a near neighbour.
+    A k-nearest query on a grid sized to gap_tolerance, so each dangling
+    endpoint only looks at its own block of cells.
+    :return: list of (end_id, neighbour end_id, distance), closest first
+             per endpoint; neighbours already touching (<= tolerance) and
+             the other end of the same segment are ignored."""
+    dangling = dangling_endpoints(cols, tolerance)
+    if not dangling:
+        return []
+    index = EndpointIndex.from_segments(*cols, tolerance=gap_tolerance)
+    gaps  = []
+    for end_id in dangling:
+        x, y, z = endpoint(cols, end_id)
+        seg = end_id >> 1
+        for dist, other in index.nearest(x, y, z, k, gap_tolerance, skip=lambda item: (item >> 1) == seg):
+            if dist > tolerance:
+                gaps.append((end_id, other, dist))
+    return gaps
+
+
+def heal_positions(cols, gaps, dangling=None):
+    """New positions for the endpoints involved in gaps.
+    Endpoints linked by gaps form clusters (union-find). A cluster snaps onto
+    its first connected (non-dangling) endpoint if it has one, otherwise onto
+    the average of its members. Connected endpoints never move.
+    :return: {end_id: (x, y, z)} for every endpoint that has to move."""
+    if dangling is None:
+        dangling = set(end_id for end_id, _, _ in gaps)
+    else:
+        dangling = set(dangling)
+    clusters = DisjointSet()
+    for end_id, other, _ in gaps:
+        clusters.union(end_id, other)
+
+    moves = {}
+    for members in clusters.groups(min_size=2).values():
+        anchors = [m for m in members if m not in dangling]
+        if anchors:
+            target = endpoint(cols, anchors[0])
+        else:
+            pts    = [endpoint(cols, m) for m in members]
+            target = tuple(sum(p[c] for p in pts) / len(pts) for c in range(3))
+        for m in members:
+            if m in dangling and endpoint(cols, m) != target:
+                moves[m] = target
+    return moves
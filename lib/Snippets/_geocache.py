@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""Memoized geometry probes for selection filters.
+ISelectionFilter.AllowElement runs on every mouse hover during PickObject,
+so anything that reads geometry there makes picking stutter. Probes are
+computed once per element and cached with the element's change token;
+a later hover over an unchanged element is a dict lookup. The cache is
+an LRU shared between runs, so it stays bounded on large models."""
+# ╦╔╦╗╔═╗╔═╗╦═╗╔╦╗╔═╗
+# ║║║║╠═╝║ ║╠╦╝ ║ ╚═╗
+# ╩╩ ╩╩  ╚═╝╩╚═ ╩ ╚═╝ IMPORTS
+#==================================================
+from collections import OrderedDict
+
+from Snippets._shared import shared_dict
+
+# ╦  ╦╔═╗╦═╗╦╔═╗╔╗ ╦  ╔═╗╔═╗
+# ╚╗╔╝╠═╣╠╦╝║╠═╣╠╩╗║  ║╣ ╚═╗
+#  ╚╝ ╩ ╩╩╚═╩╩ ╩╚═╝╩═╝╚═╝╚═╝ VARIABLES
+#==================================================
+CACHE_KEY = "QAQC_GEOMETRY_PROBES"
+CAPACITY  = 5000            # probes kept per cache
+
+# ╔═╗╦  ╔═╗╔═╗╔═╗╔═╗╔═╗
+# ║  ║  ╠═╣╚═╗╚═╗║╣ ╚═╗
+# ╚═╝╩═╝╩ ╩╚═╝╚═╝╚═╝╚═╝ CLASSES
+#==================================================
+class LRUCache(object):
+    """Least-recently-used cache of key -> (token, value).
+    A value is only returned while its token matches the caller's token,
+    so an element edited since it was probed is probed again."""
+
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity
+        self.hits     = 0
+        self.misses   = 0
+        self._data    = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, token, compute):
+        """Cached value for key, or compute() stored under token."""
+        entry = self._data.pop(key, None)
+        if entry is not None and entry[0] == token:
+            self.hits += 1
+        else:
+            self.misses += 1
+            entry = (token, compute())
+        self._data[key] = entry                 # most recently used goes last
+        if len(self._data) > self.capacity:
+            self._data.popitem(last=False)
+        return entry[1]
+
+    def discard(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+
+# ╔═╗╦ ╦╔╗╔╔═╗╔╦╗╦╔═╗╔╗╔╔═╗
+# ╠╣ ║ ║║║║║   ║ ║║ ║║║║╚═╗
+# ╚  ╚═╝╝╚╝╚═╝ ╩ ╩╚═╝╝╚╝╚═╝ FUNCTIONS
+#==================================================
+def probe_cache(doc_key, name, capacity=CAPACITY):
+    """The shared LRU cache `name` of a document, created on first use."""
+    caches = shared_dict(CACHE_KEY).setdefault(doc_key, {})
+    cache  = caches.get(name)
+    if cache is None:
+        cache = caches[name] = LRUCache(capacity)
+    return cache
+
+
+def change_token(element):
+    """Value that changes whenever the element's geometry may have changed.
+    Element.VersionGuid where the API has it, otherwise the bounding box
+    and the computed area / volume."""
+    token = getattr(element, "VersionGuid", None)
+    if token is not None:
+        return str(token)
+    from Autodesk.Revit.DB import BuiltInParameter
+    parts = []
+    bb = element.get_BoundingBox(None)
+    if bb is not None:
+        parts.extend(round(v, 9) for p in (bb.Min, bb.Max) for v in (p.X, p.Y, p.Z))
+    for bip in (BuiltInParameter.HOST_AREA_COMPUTED, BuiltInParameter.HOST_VOLUME_COMPUTED):
+        param = element.get_Parameter(bip)
+        parts.append(round(param.AsDouble(), 9) if param is not None else None)
+    return tuple(parts)
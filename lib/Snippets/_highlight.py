@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""Filter-based highlighting of tool results.
+Instead of one SetElementOverrides call per element (slow, and the overrides
+stay behind forever), the result ids go into a single named
+SelectionFilterElement that is added to the view once with the override.
+Clearing is one call: the filter element is deleted, which removes it from
+every view it was applied to."""
+# ╦╔╦╗╔═╗╔═╗╦═╗╔╦╗╔═╗
+# ║║║║╠═╝║ ║╠╦╝ ║ ╚═╗
+# ╩╩ ╩╩  ╚═╝╩╚═ ╩ ╚═╝ IMPORTS
+#==================================================
+from Autodesk.Revit.DB import *
+
+#.NET
+import clr
+clr.AddReference('System')
+from System.Collections.Generic import List
+
+# ╦  ╦╔═╗╦═╗╦╔═╗╔╗ ╦  ╔═╗╔═╗
+# ╚╗╔╝╠═╣╠╦╝║╠═╣╠╩╗║  ║╣ ╚═╗
+#  ╚╝ ╩ ╩╩╚═╩╩ ╩╚═╝╩═╝╚═╝╚═╝ VARIABLES
+#==================================================
+# every highlight filter created by the tools starts with this prefix,
+# so the Clear Highlight button can find them all
+FILTER_PREFIX = "QAQC Highlight - "
+
+# ╔═╗╦ ╦╔╗╔╔═╗╔╦╗╦╔═╗╔╗╔╔═╗
+# ╠╣ ║ ║║║║║   ║ ║║ ║║║║╚═╗
+# ╚  ╚═╝╝╚╝╚═╝ ╩ ╩╚═╝╝╚╝╚═╝ FUNCTIONS
+#==================================================
+def red_override():
+    ogs = OverrideGraphicSettings()
+    ogs.SetProjectionLineColor(Color(255, 0, 0))
+    return ogs
+
+
+def highlight_filters(doc):
+    """SelectionFilterElements created by the tools: {name: filter}."""
+    return dict((f.Name, f) for f in FilteredElementCollector(doc).OfClass(SelectionFilterElement)
+                if f.Name.startswith(FILTER_PREFIX))
+
+
+def get_or_create_filter(doc, name):
+    """Named selection filter, created on first use. Must run inside a Transaction."""
+    name = FILTER_PREFIX + name
+    found = highlight_filters(doc).get(name)
+    if found is not None:
+        return found
+    return SelectionFilterElement.Create(doc, name)
+
+
+def highlight(doc, views, element_ids, name, ogs=None):
+    """Put `element_ids` into the `name` filter (replacing its previous content)
+    and apply it with `ogs` to each view - one edit per view, not per element.
+    Must run inside a Transaction.
+    :return: list of (view, error message) for views that could not take the filter"""
+    ogs = ogs or red_override()
+    filter_el = get_or_create_filter(doc, name)
+    filter_el.SetElementIds(List[ElementId](element_ids))
+
+    failed = []
+    for view in views:
+        try:
+            if not view.IsFilterApplied(filter_el.Id):
+                view.AddFilter(filter_el.Id)
+            view.SetFilterOverrides(filter_el.Id, ogs)
+            view.SetFilterVisibility(filter_el.Id, True)
+        except Exception as e:
+            # e.g. filters are controlled by a view template
+            failed.append((view, str(e)))
+    return failed
+
+
+def clear_highlights(doc, name=None):
+    """Delete the tool highlight filters (all of them, or only `name`).
+    Deleting the filter element removes it from every view. Must run inside a Transaction.
+    :return: number of filters removed"""
+    filters = highlight_filters(doc)
+    if name is not None:
+        filters = dict((k, v) for k, v in filters.items() if k == FILTER_PREFIX + name)
+    if filters:
+        doc.Delete(List[ElementId]([f.Id for f in filters.values()]))
+    return len(filters)
@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+"""Incremental colinear-merge checking for the continuity tools.
+A ContinuityIndex keeps the snapshot columns, the colinear buckets, the
+merge links and the components of one scope (a view) between runs. The
+doc-changed hook of the extension feeds it the ids of changed elements,
+and a later run only re-examines the buckets around those elements -
+on an unchanged model a re-check does no geometry work at all.
+
+Indexes live in a registry stored in the AppDomain, so they survive
+between script runs for as long as Revit is open."""
+# ╦╔╦╗╔═╗╔═╗╦═╗╔╦╗╔═╗
+# ║║║║╠═╝║ ║╠╦╝ ║ ╚═╗
+# ╩╩ ╩╩  ╚═╝╩╚═ ╩ ╚═╝ IMPORTS
+#==================================================
+import math
+
+from Snippets._snapshot   import CurveSnapshot, ArcSnapshot
+from Snippets._continuity import (colinear_families, colinear_merge_pairs, line_key, arc_families,
+                                  arc_merge_pairs, arc_key, ANGLE_TOLERANCE)
+from Snippets._spatial    import TOLERANCE
+from Snippets._unionfind  import DisjointSet
+from Snippets._shared     import shared_dict, document_key
+
+# ╦  ╦╔═╗╦═╗╦╔═╗╔╗ ╦  ╔═╗╔═╗
+# ╚╗╔╝╠═╣╠╦╝║╠═╣╠╩╗║  ║╣ ╚═╗
+#  ╚╝ ╩ ╩╩╚═╩╩ ╩╚═╝╩═╝╚═╝╚═╝ VARIABLES
+#==================================================
+REGISTRY_KEY = "QAQC_CONTINUITY_INDEXES"
+SLOPED       = "sloped"     # bucket of all non-horizontal segments of a partition
+RING         = 2            # bins around a changed bucket that are re-examined
+
+# ╔═╗╦  ╔═╗╔═╗╔═╗╔═╗╔═╗
+# ║  ║  ╠═╣╚═╗╚═╗║╣ ╚═╗
+# ╚═╝╩═╝╩ ╩╚═╝╚═╝╚═╝╚═╝ CLASSES
+#==================================================
+class ContinuityIndex(object):
+    """Persistent merge state of one scope.
+    snapshot  - CurveSnapshot; rows of removed / modified elements are left
+                dead in the columns and compacted away on the next rebuild
+    rows      - {element id value: live row}
+    buckets   - {(style, detail, z_bin, angle_bin, offset_bin): set of rows}
+    links     - {row: set of rows it merges with}
+    comp      - {row: component id}, components - {component id: sorted rows},
+                for components of two or more rows only
+    pending   - element id values reported changed since the last refresh
+    skipped   - element id values in scope that the reader does not take
+                (arcs for a line index, lines for an arc index)"""
+    SNAPSHOT = CurveSnapshot
+
+    def __init__(self, tolerance=TOLERANCE, angle_tolerance=ANGLE_TOLERANCE):
+        self.tolerance       = tolerance
+        self.angle_tolerance = angle_tolerance
+        self.n_bins  = int(round(math.pi / angle_tolerance))
+        self.pending = set()
+        self.skipped = set()
+        self._reset()
+
+    def _reset(self):
+        self.snapshot   = self.SNAPSHOT()
+        self.rows       = {}
+        self.keys       = {}
+        self.buckets    = {}
+        self.links      = {}
+        self.comp       = {}
+        self.components = {}
+        self._next_comp = 0
+        self._broken    = set()     # components that lost a row
+        self._frame     = None      # (origin, radius, offset step)
+        self._groups    = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    #>>>>>>>>>> UPDATES
+    def refresh(self, current_ids, read):
+        """Bring the index up to date with the scope.
+        current_ids - element id values in the scope now (cheap id-only collector)
+        read        - callable(id values) -> CurveSnapshot of those elements
+        Elements that are new, gone, or reported in `pending` are re-read.
+        :return: number of rows re-examined (0 on an unchanged scope)"""
+        current = set(current_ids)
+        known   = set(self.rows)
+        to_read = (current - known - self.skipped) | (self.pending & current)
+        self.pending = set()
+        changed = read(to_read) if to_read else self.SNAPSHOT()
+        taken   = set(int(v) for v in changed.ids)
+        self.skipped = ((self.skipped & current) - to_read) | (to_read - taken)
+        return self.update(changed, (known - current) | ((to_read & known) - taken))
+
+    def update(self, changed, removed=()):
+        """Apply a change set: `changed` is a CurveSnapshot of added or
+        modified elements, `removed` the id values that left the scope.
+        :return: number of rows re-examined"""
+        touched = set()
+        for eid in removed:
+            row = self.rows.pop(int(eid), None)
+            if row is not None:
+                touched.add(self._kill(row))
+
+        dirty = []
+        snap  = self.snapshot
+        for i in range(len(changed)):
+            eid = int(changed.ids[i])
+            old = self.rows.pop(eid, None)
+            if old is not None:
+                touched.add(self._kill(old))
+            snap.append_row(changed, i)
+            row = len(snap) - 1
+            self.rows[eid] = row
+            dirty.append(row)
+
+        if not touched and not dirty:
+            return 0
+        self._groups = None
+        if self._frame is None or not self._in_frame(dirty) or len(snap) > 2 * len(self.rows) + 1024:
+            return self.rebuild()
+        for row in dirty:
+            touched.add(self._bucket(row))
+        return self._relink(touched)
+
+    def rebuild(self):
+        """Compact the columns and recompute everything from scratch.
+        :return: number of rows examined"""
+        old, live = self.snapshot, sorted(self.rows.items(), key=lambda item: item[1])
+        self._reset()
+        snap = self.snapshot
+        for eid, row in live:
+            snap.append_row(old, row)
+            self.rows[eid] = len(snap) - 1
+        if not self.rows:
+            return 0
+        self._frame = self._make_frame(range(len(snap)))
+        for row in range(len(snap)):
+            self._bucket(row)
+        return self._relink(set(self.buckets), ring=0)
+
+    #>>>>>>>>>> RESULTS
+    def groups(self):
+        """Groups to merge per partition: {(style, detail): [[rows], ...]}.
+        Rows index into self.snapshot. Cached until the next change."""
+        if self._groups is None:
+            result = {}
+            snap = self.snapshot
+            for members in self.components.values():
+                first = members[0]
+                result.setdefault((snap.style[first], snap.detail[first]), []).append(members)
+            for groups in result.values():
+                groups.sort()
+            self._groups = result
+        return self._groups
+
+    def partition_sizes(self):
+        """Live rows per partition: {(style, detail): count}."""
+        sizes = {}
+        for key, rows in self.buckets.items():
+            sizes[key[:2]] = sizes.get(key[:2], 0) + len(rows)
+        return sizes
+
+    #>>>>>>>>>> INTERNALS
+    def _make_frame(self, rows):
+        x0, y0, z0, x1, y1, z1 = self.snapshot.cols
+        xs = [x0[i] for i in rows] + [x1[i] for i in rows]
+        ys = [y0[i] for i in rows] + [y1[i] for i in rows]
+        origin = ((min(xs) + max(xs)) / 2.0, (min(ys) + max(ys)) / 2.0)
+        radius = max(max(xs) - min(xs), max(ys) - min(ys), 1.0) / 2.0
+        return origin, radius, max(self.tolerance, radius * self.angle_tolerance)
+
+    def _in_frame(self, rows):
+        """New rows far outside the extent the offset step was chosen for
+        would need a coarser step - they trigger a rebuild instead."""
+        (ox, oy), radius, _step = self._frame
+        x0, y0, z0, x1, y1, z1 = self.snapshot.cols
+        limit = 2.0 * radius
+        for i in rows:
+            for x, y in ((x0[i], y0[i]), (x1[i], y1[i])):
+                if abs(x - ox) > limit or abs(y - oy) > limit:
+                    return False
+        return True
+
+    def _pairs(self, rows):
+        """Merge pairs among rows of one partition."""
+        cols = self.snapshot.cols
+        families = colinear_families(cols, indices=rows, tolerance=self.tolerance,
+                                     angle_tolerance=self.angle_tolerance)
+        return colinear_merge_pairs(cols, self.tolerance, self.angle_tolerance, families)
+
+    def _key(self, row):
+        snap = self.snapshot
+        x0, y0, z0, x1, y1, z1 = snap.cols
+        part = (snap.style[row], snap.detail[row])
+        if abs(z1[row] - z0[row]) > self.tolerance:
+            return part + (SLOPED,)
+        origin, _radius, step = self._frame
+        key = line_key(x0[row], y0[row], x1[row], y1[row], origin, self.angle_tolerance, step)
+        if key is None:
+            return None
+        return part + (int(round(z0[row] / self.tolerance)),) + key
+
+    def _bucket(self, row):
+        key = self._key(row)
+        if key is not None:
+            self.keys[row] = key
+            self.buckets.setdefault(key, set()).add(row)
+        return key
+
+    def _kill(self, row):
+        """Drop a row from its bucket and unlink it. :return: its old key"""
+        key = self.keys.pop(row, None)
+        if key is not None:
+            bucket = self.buckets[key]
+            bucket.discard(row)
+            if not bucket:
+                del self.buckets[key]
+        for other in self.links.pop(row, ()):
+            self.links[other].discard(row)
+        cid = self.comp.pop(row, None)
+        if cid is not None:
+            self._broken.add(cid)
+        return key
+
+    def _ring(self, key, ring):
+        """Keys within `ring` bins of key (z, angle wrapping at pi, offset)."""
+        if key is None:
+            return
+        if ring == 0 or key[2] == SLOPED:
+            yield key
+            return
+        part, (z, a, o) = key[:2], key[2:]
+        span = range(-ring, ring + 1)
+        for da in span:
+            na, flip = a + da, False
+            if na < 0:
+                na += self.n_bins; flip = True
+            elif na >= self.n_bins:
+                na -= self.n_bins; flip = True
+            base = -o if flip else o
+            for dz in span:
+                for do in span:
+                    yield part + (z + dz, na, base + do)
+
+    def _relink(self, touched, ring=RING):
+        """Recompute merge links among the rows around the touched buckets,
+        then re-run the union-find over the components they belong to."""
+        region = set()
+        for key in touched:
+            for nkey in self._ring(key, ring):
+                rows = self.buckets.get(nkey)
+                if rows:
+                    region.update(rows)
+        if not region and not touched:
+            return 0
+
+        # links inside the region are recomputed; links leaving it are kept
+        for row in region:
+            links = self.links.get(row)
+            if links:
+                links.difference_update(region)
+
+        by_part = {}
+        for row in region:
+            by_part.setdefault(self.keys[row][:2], []).append(row)
+        pairs = []
+        for rows in by_part.values():
+            rows.sort()
+            pairs.extend(self._pairs(rows))
+        for i, j in pairs:
+            self.links.setdefault(i, set()).add(j)
+            self.links.setdefault(j, set()).add(i)
+
+        # components: every component that had a row in the region (or lost
+        # a row) is dissolved and rebuilt from the links of its members
+        affected, self._broken = self._broken, set()
+        for row in region:
+            cid = self.comp.get(row)
+            if cid is not None:
+                affected.add(cid)
+        members = set(region)
+        for cid in affected:
+            members.update(r for r in self.components.pop(cid, ()) if r in self.keys)
+
+        sets = DisjointSet(members)
+        for row in members:
+            for other in self.links.get(row, ()):
+                sets.union(row, other)
+        for group in sets.groups(min_size=2).values():
+            group.sort()
+            cid = self._next_comp
+            self._next_comp += 1
+            self.components[cid] = group
+            for row in group:
+                self.comp[row] = cid
+        return len(region)
+
+
+class ArcIndex(ContinuityIndex):
+    """ContinuityIndex for circular arcs (ArcSnapshot rows), bucketed by
+    (style, detail, normal bins, (cx, cy, cz, r) bins)."""
+    SNAPSHOT = ArcSnapshot
+
+    def _make_frame(self, rows):
+        return True                 # circle keys do not depend on the extent
+
+    def _in_frame(self, rows):
+        return True
+
+    def _pairs(self, rows):
+        cols = self.snapshot.cols
+        families = arc_families(cols, indices=rows, tolerance=self.tolerance,
+                                angle_tolerance=self.angle_tolerance)
+        return arc_merge_pairs(cols, self.tolerance, self.angle_tolerance, families)
+
+    def _key(self, row):
+        snap = self.snapshot
+        return (snap.style[row], snap.detail[row]) + arc_key(snap.cols, row, self.tolerance, self.angle_tolerance)
+
+    def _ring(self, key, ring):
+        if key is None:
+            return
+        if ring == 0:
+            yield key
+            return
+        part, normal, (x, y, z, r) = key[:2], key[2], key[3]
+        span = range(-ring, ring + 1)
+        for dx in span:
+            for dy in span:
+                for dz in span:
+                    for dr in span:
+                        yield part + (normal, (x + dx, y + dy, z + dz, r + dr))
+
+
+# ╔═╗╦ ╦╔╗╔╔═╗╔╦╗╦╔═╗╔╗╔╔═╗
+# ╠╣ ║ ║║║║║   ║ ║║ ║║║║╚═╗
+# ╚  ╚═╝╝╚╝╚═╝ ╩ ╩╚═╝╝╚╝╚═╝ FUNCTIONS
+#==================================================
+def _registry():
+    """{document key: {scope: ContinuityIndex}}, shared by every script engine."""
+    return shared_dict(REGISTRY_KEY)
+
+
+def tracked_index(doc_key, scope, reset=False, kind=ContinuityIndex):
+    """The persistent index of a scope, created on first use.
+    kind - ContinuityIndex for lines, ArcIndex for arcs"""
+    indexes = _registry().setdefault(doc_key, {})
+    if reset or scope not in indexes:
+        indexes[scope] = kind()
+    return indexes[scope]
+
+
+def is_tracked(doc_key):
+    return bool(_registry().get(doc_key))
+
+
+def record_changes(doc_key, id_values):
+    """Called from the doc-changed hook: mark ids as changed in every index
+    of the document. Does nothing when no index is being tracked."""
+    indexes = _registry().get(doc_key)
+    if not indexes:
+        return
+    id_values = list(id_values)
+    for index in indexes.values():
+        index.pending.update(id_values)
+
+
+def forget(doc_key):
+    """Drop every index of a document (closing)."""
+    _registry().pop(doc_key, None)
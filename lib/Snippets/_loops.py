@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""2D loop utilities for floor boundaries.
+Loops are lists of (x, y) points (closed implicitly). The containment
+tree tells outer islands from holes: a loop at even depth is an island,
+a loop at odd depth is a hole of its parent, an island inside a hole is
+at depth 2 and so on.
+
+simplify_loop() cleans edge loops before Floor.Create: runs of colinear
+lines become one line and sub-tolerance lines are absorbed by their
+neighbours, so split results don't carry every old vertex along."""
+# ╦╔╦╗╔═╗╔═╗╦═╗╔╦╗╔═╗
+# ║║║║╠═╝║ ║╠╦╝ ║ ╚═╗
+# ╩╩ ╩╩  ╚═╝╩╚═ ╩ ╚═╝ IMPORTS
+#==================================================
+import math
+
+# ╦  ╦╔═╗╦═╗╦╔═╗╔╗ ╦  ╔═╗╔═╗
+# ╚╗╔╝╠═╣╠╦╝║╠═╣╠╩╗║  ║╣ ╚═╗
+#  ╚╝ ╩ ╩╩╚═╩╩ ╩╚═╝╩═╝╚═╝╚═╝ VARIABLES
+#==================================================
+DEVIATION = 1.0e-6          # feet. A vertex this close to the merged line is colinear.
+
+# ╔═╗╦ ╦╔╗╔╔═╗╔╦╗╦╔═╗╔╗╔╔═╗
+# ╠╣ ║ ║║║║║   ║ ║║ ║║║║╚═╗
+# ╚  ╚═╝╝╚╝╚═╝ ╩ ╩╚═╝╝╚╝╚═╝ FUNCTIONS
+#==================================================
+def polygon_area(pts):
+    """Signed area (shoelace); positive for counter-clockwise loops."""
+    area = 0.0
+    n = len(pts)
+    for k in range(n):
+        x0, y0 = pts[k]
+        x1, y1 = pts[(k + 1) % n]
+        area += x0 * y1 - x1 * y0
+    return area / 2.0
+
+
+def polygon_bbox(pts):
+    xs = [p[0] for p in pts]
+    ys = [p[1] for p in pts]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def bbox_contains(outer, inner):
+    return outer[0] <= inner[0] and outer[1] <= inner[1] and outer[2] >= inner[2] and outer[3] >= inner[3]
+
+
+def point_in_polygon(x, y, pts):
+    """Even-odd ray casting."""
+    inside = False
+    n = len(pts)
+    x0, y0 = pts[-1]
+    for k in range(n):
+        x1, y1 = pts[k]
+        if (y1 > y) != (y0 > y) and x < (x0 - x1) * (y - y1) / (y0 - y1) + x1:
+            inside = not inside
+        x0, y0 = x1, y1
+    return inside
+
+
+def nest_loops(polygons):
+    """Containment tree of non-crossing loops.
+    Loops are visited from the largest area down; a loop's parent is the
+    smallest already-visited loop whose bounding box holds its bounding
+    box and that contains its first point. The bounding-box test runs
+    first, so point-in-polygon is only tried on real candidates.
+    :return: (parents, depths) - parent index or None, depth per loop"""
+    n      = len(polygons)
+    areas  = [abs(polygon_area(p)) for p in polygons]
+    boxes  = [polygon_bbox(p) for p in polygons]
+    parent = [None] * n
+    depth  = [0] * n
+    placed = []             # visited loops, largest area first
+    for i in sorted(range(n), key=lambda k: -areas[k]):
+        x, y = polygons[i][0]
+        for j in reversed(placed):                  # smallest container first
+            if bbox_contains(boxes[j], boxes[i]) and point_in_polygon(x, y, polygons[j]):
+                parent[i] = j
+                depth[i]  = depth[j] + 1
+                break
+        placed.append(i)
+    return parent, depth
+
+
+def islands(polygons):
+    """Outer islands with their own holes.
+    :return: list of (outer index, [hole indices]), largest island first"""
+    parent, depth = nest_loops(polygons)
+    result = dict((i, []) for i in range(len(polygons)) if depth[i] % 2 == 0)
+    for i, p in enumerate(parent):
+        if depth[i] % 2 == 1:
+            result[p].append(i)
+    return sorted(result.items(), key=lambda item: -abs(polygon_area(polygons[item[0]])))
+
+
+def _distance(p, q):
+    return math.sqrt((p[0] - q[0]) ** 2 + (p[1] - q[1]) ** 2 + (p[2] - q[2]) ** 2)
+
+
+def _off_line(p, a, b):
+    """Distance of point p from the infinite line a-b, or None if p is not
+    between a and b (the run would fold back on itself)."""
+    dx, dy, dz = b[0] - a[0], b[1] - a[1], b[2] - a[2]
+    length2 = dx * dx + dy * dy + dz * dz
+    if length2 == 0.0:
+        return None
+    t = ((p[0] - a[0]) * dx + (p[1] - a[1]) * dy + (p[2] - a[2]) * dz) / length2
+    if not 0.0 < t < 1.0:
+        return None
+    return _distance(p, (a[0] + t * dx, a[1] + t * dy, a[2] + t * dz))
+
+
+def simplify_loop(loop, short=DEVIATION, deviation=DEVIATION):
+    """Merge consecutive colinear lines and absorb lines shorter than `short`.
+    :param loop: closed loop of edges (p0, p1, curve) - points as (x, y, z),
+                 curve None for a straight line, anything else for an edge
+                 that must be kept as it is (arcs, splines)
+    :return: simplified loop in the same form; straight lines come back with
+             curve None and possibly new end points. The input loop itself
+             if simplifying would leave fewer than three edges."""
+    edges = [[e[0], e[1], e[2]] for e in loop]
+
+    # 1) short lines: the previous (or next) line takes over their length
+    k = 0
+    while k < len(edges) and len(edges) > 3:
+        p0, p1, curve = edges[k]
+        if curve is not None or _distance(p0, p1) >= short:
+            k += 1
+            continue
+        prev, nxt = edges[k - 1], edges[(k + 1) % len(edges)]
+        if prev[2] is None and _distance(prev[0], p1) >= short:
+            prev[1] = p1
+        elif nxt[2] is None and _distance(p0, nxt[1]) >= short:
+            nxt[0] = p0
+        else:
+            k += 1                              # between two curves: keep it
+            continue
+        del edges[k]
+
+    # 2) colinear runs: extend the run's first line while every absorbed vertex stays on it
+    merged = []
+    for edge in edges:
+        if merged and merged[-1][2] is None and edge[2] is None:
+            run = merged[-1]
+            inner = run[3] + [edge[0]]
+            if all(_off_line(p, run[0], edge[1]) is not None
+                   and _off_line(p, run[0], edge[1]) <= deviation for p in inner):
+                run[1], run[3] = edge[1], inner
+                continue
+        merged.append([edge[0], edge[1], edge[2], []])
+    # the run may continue across the loop's start
+    while len(merged) > 3 and merged[0][2] is None and merged[-1][2] is None:
+        first, last = merged[0], merged[-1]
+        inner = last[3] + [first[0]] + first[3]
+        if not all(_off_line(p, last[0], first[1]) is not None
+                   and _off_line(p, last[0], first[1]) <= deviation for p in inner):
+            break
+        first[0], first[3] = last[0], inner
+        merged.pop()
+
+    if len(merged) < 3:
+        return loop
+    return [(e[0], e[1], e[2]) for e in merged]
+
+
+def simplify_curve_loops(curve_loops, short=DEVIATION, deviation=DEVIATION):
+    """simplify_loop() for Revit CurveLoops, just before Floor.Create.
+    :param short: usually Application.ShortCurveTolerance
+    :return: (list of CurveLoops, number of edges removed)"""
+    from Autodesk.Revit.DB import CurveLoop, Line, XYZ
+    simplified, removed = [], 0
+    for curve_loop in curve_loops:
+        loop = []
+        for crv in curve_loop:
+            p0, p1 = crv.GetEndPoint(0), crv.GetEndPoint(1)
+            loop.append(((p0.X, p0.Y, p0.Z), (p1.X, p1.Y, p1.Z), None if isinstance(crv, Line) else crv))
+        result = simplify_loop(loop, short, deviation)
+        removed += len(loop) - len(result)
+        if len(result) == len(loop):            # nothing merged or absorbed
+            simplified.append(curve_loop)
+            continue
+        new_loop = CurveLoop()
+        for p0, p1, curve in result:
+            new_loop.Append(curve if curve is not None else Line.CreateBound(XYZ(*p0), XYZ(*p1)))
+        simplified.append(new_loop)
+    return simplified, removed
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""On-disk cache of triangulated surfaces (Snippets._tin.TIN).
+Triangulating a site toposolid and indexing its triangles is the slow part
+of every height lookup. The finished TIN - vertices, filtered triangles,
+bounds and the triangle grid - is written as flat binary arrays to one file
+per element, named after its UniqueId. The file header holds the change
+token it was built from; a file with another token is rebuilt and
+overwritten. Reads go straight into typed arrays with array.fromfile, so a
+repeat run skips both the triangulation and the index construction.
+
+File layout (native byte order):
+    header   magic, version, byte order, token
+    counts   vertices, triangles, grid cells, grid items, cell size, bounds
+    arrays   xs ys zs (double) | ia ib ic (int) | kx ky offsets items (int)"""
+# ╦╔╦╗╔═╗╔═╗╦═╗╔╦╗╔═╗
+# ║║║║╠═╝║ ║╠╦╝ ║ ╚═╗
+# ╩╩ ╩╩  ╚═╝╩╚═ ╩ ╚═╝ IMPORTS
+#==================================================
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+from Snippets._spatial import SegmentGrid
+from Snippets._tin     import TIN
+
+# ╦  ╦╔═╗╦═╗╦╔═╗╔╗ ╦  ╔═╗╔═╗
+# ╚╗╔╝╠═╣╠╦╝║╠═╣╠╩╗║  ║╣ ╚═╗
+#  ╚╝ ╩ ╩╩╚═╩╩ ╩╚═╝╩═╝╚═╝╚═╝ VARIABLES
+#==================================================
+MAGIC     = b"QTIN"
+VERSION   = 1
+EXTENSION = ".tin"
+FOLDER    = os.path.join(tempfile.gettempdir(), "QAQC Mesh Cache")
+
+_HEADER = "<4sIcI"              # magic, version, byte order, token length
+_COUNTS = "<IIIId4d"            # vertices, triangles, cells, items, cell size, bounds
+_ORDER  = b"L" if sys.byteorder == "little" else b"B"
+
+# ╔═╗╦ ╦╔╗╔╔═╗╔╦╗╦╔═╗╔╗╔╔═╗
+# ╠╣ ║ ║║║║║   ║ ║║ ║║║║╚═╗
+# ╚  ╚═╝╝╚╝╚═╝ ╩ ╩╚═╝╝╚╝╚═╝ FUNCTIONS
+#==================================================
+def cache_path(unique_id, folder=None):
+    return os.path.join(folder or FOLDER, unique_id + EXTENSION)
+
+
+def save_tin(path, tin, token):
+    """Write `tin` to `path` (through a temporary file, so a crash never
+    leaves a half-written cache behind)."""
+    token = str(token).encode("utf-8")
+    kx, ky, offsets, items = tin.grid.to_columns()
+    folder = os.path.dirname(path)
+    if folder and not os.path.isdir(folder):
+        os.makedirs(folder)
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(struct.pack(_HEADER, MAGIC, VERSION, _ORDER, len(token)))
+        f.write(token)
+        f.write(struct.pack(_COUNTS, len(tin.xs), len(tin.ia), len(kx), len(items),
+                            tin.grid.cell_size, *tin.bounds()))
+        for column in (tin.xs, tin.ys, tin.zs):
+            array("d", column).tofile(f)
+        for column in (tin.ia, tin.ib, tin.ic, kx, ky, offsets, items):
+            array("i", column).tofile(f)
+    if os.path.exists(path):
+        os.remove(path)
+    os.rename(tmp, path)
+
+
+def _read(f, typecode, count):
+    column = array(typecode)
+    column.fromfile(f, count)
+    return column
+
+
+def load_tin(path, token):
+    """TIN stored at `path`, or None if there is no file, it was built from
+    another token, or it can't be read."""
+    if not os.path.exists(path):
+        return None
+    token = str(token).encode("utf-8")
+    try:
+        with open(path, "rb") as f:
+            magic, version, order, size = struct.unpack(_HEADER, f.read(struct.calcsize(_HEADER)))
+            if magic != MAGIC or version != VERSION or order != _ORDER or f.read(size) != token:
+                return None
+            counts = struct.unpack(_COUNTS, f.read(struct.calcsize(_COUNTS)))
+            nv, nt, ncells, nitems, cell_size = counts[:5]
+            xs, ys, zs = [_read(f, "d", nv) for _ in range(3)]
+            ia, ib, ic = [_read(f, "i", nt) for _ in range(3)]
+            kx, ky     = [_read(f, "i", ncells) for _ in range(2)]
+            offsets    = _read(f, "i", ncells + 1)
+            items      = _read(f, "i", nitems)
+    except (IOError, OSError, EOFError, struct.error):
+        return None
+    grid = SegmentGrid.from_columns(cell_size, kx, ky, offsets, items)
+    return TIN(xs, ys, zs, ia, ib, ic, grid=grid)
+
+
+def cached_tin(unique_id, token, build, folder=None):
+    """TIN of element `unique_id` from the cache, or build() stored for next time.
+    A cache that can't be written (read-only folder, full disk) is skipped.
+    :return: (tin, True if it came from the cache)"""
+    path = cache_path(unique_id, folder)
+    tin  = load_tin(path, token)
+    if tin is not None:
+        return tin, True
+    tin = build()
+    try:
+        save_tin(path, tin, token)
+    except (IOError, OSError):
+        pass
+    return tin, False
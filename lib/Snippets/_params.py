@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""Bulk transfer of instance parameters from an element to its replacements.
+The split tools delete a floor and create new ones; without a transfer
+every instance value (Comments, height offset, phases, shared parameters...)
+is lost.
+Which parameters are writable is worked out once per element type and kept
+as a plan of direct handles - BuiltInParameter, shared GUID or Definition -
+so copying to thousands of pieces never searches parameters by name."""
+# ╦╔╦╗╔═╗╔═╗╦═╗╔╦╗╔═╗
+# ║║║║╠═╝║ ║╠╦╝ ║ ╚═╗
+# ╩╩ ╩╩  ╚═╝╩╚═ ╩ ╚═╝ IMPORTS
+#==================================================
+from Autodesk.Revit.DB import BuiltInParameter, InternalDefinition, StorageType
+
+from Snippets._snapshot import id_value
+
+# ╦  ╦╔═╗╦═╗╦╔═╗╔╗ ╦  ╔═╗╔═╗
+# ╚╗╔╝╠═╣╠╦╝║╠═╣╠╩╗║  ║╣ ╚═╗
+#  ╚╝ ╩ ╩╩╚═╩╩ ╩╚═╝╩═╝╚═╝╚═╝ VARIABLES
+#==================================================
+# writable, but owned by the tools (type, level) or unique per element (Mark, GUIDs).
+# The height offset is copied: Floor.Create always places the new floor at offset 0.
+EXCLUDED = set(getattr(BuiltInParameter, name) for name in (
+    "ELEM_TYPE_PARAM", "ELEM_FAMILY_PARAM", "ELEM_FAMILY_AND_TYPE_PARAM",
+    "LEVEL_PARAM", "SCHEDULE_LEVEL_PARAM", "ALL_MODEL_MARK",
+    "IFC_GUID", "IFC_TYPE_GUID") if hasattr(BuiltInParameter, name))
+
+_GETTERS = {
+    StorageType.Double:    lambda p: p.AsDouble(),
+    StorageType.Integer:   lambda p: p.AsInteger(),
+    StorageType.String:    lambda p: p.AsString(),
+    StorageType.ElementId: lambda p: p.AsElementId(),
+}
+
+# ╔═╗╦  ╔═╗╔═╗╔═╗╔═╗╔═╗
+# ║  ║  ╠═╣╚═╗╚═╗║╣ ╚═╗
+# ╚═╝╩═╝╩ ╩╚═╝╚═╝╚═╝╚═╝ CLASSES
+#==================================================
+class ParameterTransfer(object):
+    """Per-type plans of transferable instance parameters.
+    Use one instance per run:
+        transfer = ParameterTransfer()
+        transfer.copy(old_floor, new_floors)     # inside a Transaction"""
+
+    def __init__(self, excluded=EXCLUDED):
+        self.excluded = excluded
+        self.copied   = 0
+        self.failed   = 0
+        self._plans   = {}          # type id -> list of (handle, getter)
+
+    @staticmethod
+    def handle(param):
+        """Direct lookup key for element.get_Parameter()."""
+        definition = param.Definition
+        if isinstance(definition, InternalDefinition) \
+                and definition.BuiltInParameter != BuiltInParameter.INVALID:
+            return definition.BuiltInParameter
+        if param.IsShared:
+            return param.GUID
+        return definition
+
+    def plan(self, element):
+        """Writable instance parameters of the element's type, computed on first use."""
+        key  = id_value(element.GetTypeId())
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = []
+            for param in element.Parameters:
+                getter = _GETTERS.get(param.StorageType)
+                if getter is None or param.IsReadOnly:
+                    continue
+                handle = self.handle(param)
+                if handle in self.excluded:
+                    continue
+                plan.append((handle, getter))
+            self._plans[key] = plan
+        return plan
+
+    def values(self, source):
+        """(handle, value) of every planned parameter that has a value on `source`."""
+        values = []
+        for handle, getter in self.plan(source):
+            param = source.get_Parameter(handle)
+            if param is None or not param.HasValue:
+                continue
+            value = getter(param)
+            if value is not None:
+                values.append((handle, value))
+        return values
+
+    def copy(self, source, targets):
+        """Copy the planned values of `source` to every target. Values are read
+        once; a parameter that refuses a value on a target is counted in
+        `failed` and left as it is. Must run inside a Transaction."""
+        values = self.values(source)
+        for target in targets:
+            for handle, value in values:
+                param = target.get_Parameter(handle)
+                if param is None or param.IsReadOnly:
+                    continue
+                try:
+                    ok = param.Set(value)
+                except Exception:
+                    ok = False
+                if ok:
+                    self.copied += 1
+                else:
+                    self.failed += 1
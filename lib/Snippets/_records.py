@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""Streaming record writer for read-only analysis runs (dry runs, reports).
+Each record is written and flushed as soon as it is produced, so memory
+stays flat however many records a scan yields."""
+# ╦╔╦╗╔═╗╔═╗╦═╗╔╦╗╔═╗
+# ║║║║╠═╝║ ║╠╦╝ ║ ╚═╗
+# ╩╩ ╩╩  ╚═╝╩╚═ ╩ ╚═╝ IMPORTS
+#==================================================
+import csv
+import io
+import json
+import os
+
+# ╔═╗╦  ╔═╗╔═╗╔═╗╔═╗╔═╗
+# ║  ║  ╠═╣╚═╗╚═╗║╣ ╚═╗
+# ╚═╝╩═╝╩ ╩╚═╝╚═╝╚═╝╚═╝ CLASSES
+#==================================================
+class RecordWriter(object):
+    """Write dict records to .jsonl (one JSON object per line) or .csv.
+    CSV columns are fixed by `columns` (or by the first record); list
+    values are joined with ';'. Use as a context manager."""
+
+    def __init__(self, path, columns=None, flush_every=1):
+        self.path   = path
+        self.format = "csv" if os.path.splitext(path)[1].lower() == ".csv" else "jsonl"
+        self.count  = 0
+        self._columns     = list(columns) if columns else None
+        self._flush_every = max(1, int(flush_every))
+        self._csv  = None
+        if self.format == "csv":
+            self._file = io.open(path, "w", encoding="utf-8", newline="") if str is not bytes else open(path, "wb")
+        else:
+            self._file = io.open(path, "w", encoding="utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def write(self, record):
+        if self.format == "csv":
+            if self._csv is None:
+                self._columns = self._columns or sorted(record)
+                self._csv = csv.writer(self._file)
+                self._csv.writerow([_csv_value(c) for c in self._columns])
+            self._csv.writerow([_csv_value(record.get(c)) for c in self._columns])
+        else:
+            line = json.dumps(record, sort_keys=True)
+            if not isinstance(line, type(u"")):
+                line = line.decode("utf-8")
+            self._file.write(line + u"\n")
+        self.count += 1
+        if self.count % self._flush_every == 0:
+            self._file.flush()
+
+    def write_all(self, records):
+        for record in records:
+            self.write(record)
+        return self.count
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+# ╔═╗╦ ╦╔╗╔╔═╗╔╦╗╦╔═╗╔╗╔╔═╗
+# ╠╣ ║ ║║║║║   ║ ║║ ║║║║╚═╗
+# ╚  ╚═╝╝╚╝╚═╝ ╩ ╩╚═╝╝╚╝╚═╝ FUNCTIONS
+#==================================================
+def _csv_value(value):
+    """Cell value as a native str. On Python 2 the csv module writes bytes,
+    so text (view, level, type names) is encoded to UTF-8 here."""
+    if isinstance(value, (list, tuple)):
+        return ";".join(_csv_value(v) for v in value)
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return repr(round(value, 9))
+    if isinstance(value, str):
+        return value
+    if str is bytes:
+        text = type(u"")
+        return (value if isinstance(value, text) else text(value)).encode("utf-8")
+    return str(value)
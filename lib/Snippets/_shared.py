@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""State shared between script runs.
+pyRevit runs every button in a fresh engine, so module globals do not
+survive a click. Dicts stored in the AppDomain do, for as long as Revit
+is open; outside of Revit (benchmarks) a module-level dict stands in."""
+# ╦  ╦╔═╗╦═╗╦╔═╗╔╗ ╦  ╔═╗╔═╗
+# ╚╗╔╝╠═╣╠╦╝║╠═╣╠╩╗║  ║╣ ╚═╗
+#  ╚╝ ╩ ╩╩╚═╩╩ ╩╚═╝╩═╝╚═╝╚═╝ VARIABLES
+#==================================================
+_LOCAL = {}
+
+# ╔═╗╦ ╦╔╗╔╔═╗╔╦╗╦╔═╗╔╗╔╔═╗
+# ╠╣ ║ ║║║║║   ║ ║║ ║║║║╚═╗
+# ╚  ╚═╝╝╚╝╚═╝ ╩ ╩╚═╝╝╚╝╚═╝ FUNCTIONS
+#==================================================
+def shared_dict(name):
+    """The dict stored under `name`, created on first use."""
+    try:
+        from System import AppDomain
+    except ImportError:
+        return _LOCAL.setdefault(name, {})
+    data = AppDomain.CurrentDomain.GetData(name)
+    if data is None:
+        data = {}
+        AppDomain.CurrentDomain.SetData(name, data)
+    return data
+
+
+def document_key(doc):
+    """Key of a document in shared state."""
+    return doc.PathName or doc.Title
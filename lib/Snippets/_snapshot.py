@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""Array-backed snapshots of curve elements.
+Every curve is read through the Revit API exactly once into compact
+parallel array('d') columns; everything downstream runs on plain floats.
+CurveSnapshot holds curves by their end points, ArcSnapshot holds
+circular arcs by centre, normal, radius and angular interval."""
+# ╦╔╦╗╔═╗╔═╗╦═╗╔╦╗╔═╗
+# ║║║║╠═╝║ ║╠╦╝ ║ ╚═╗
+# ╩╩ ╩╩  ╚═╝╩╚═ ╩ ╚═╝ IMPORTS
+#==================================================
+import math
+from array import array
+
+# ╦  ╦╔═╗╦═╗╦╔═╗╔╗ ╦  ╔═╗╔═╗
+# ╚╗╔╝╠═╣╠╦╝║╠═╣╠╩╗║  ║╣ ╚═╗
+#  ╚╝ ╩ ╩╩╚═╩╩ ╩╚═╝╩═╝╚═╝╚═╝ VARIABLES
+#==================================================
+# ElementId values are Int64 since Revit 2024; 'q' is not available everywhere,
+# doubles hold every integer up to 2**53 exactly.
+try:
+    array('q')
+    ID_TYPECODE = 'q'
+except ValueError:
+    ID_TYPECODE = 'd'
+
+NO_ID  = -1
+TWO_PI = 2.0 * math.pi
+CURVED = ("Arc", "Ellipse", "NurbSpline", "HermiteSpline", "CylindricalHelix")
+
+# ╔═╗╦ ╦╔╗╔╔═╗╔╦╗╦╔═╗╔╗╔╔═╗
+# ╠╣ ║ ║║║║║   ║ ║║ ║║║║╚═╗
+# ╚  ╚═╝╝╚╝╚═╝ ╩ ╩╚═╝╝╚╝╚═╝ FUNCTIONS
+#==================================================
+def id_value(element_id):
+    """Integer value of an ElementId (ElementId.Value in Revit 2024+)."""
+    value = getattr(element_id, "Value", None)
+    if value is None:
+        value = element_id.IntegerValue
+    return int(value)
+
+
+def is_curved(curve):
+    """True for Revit curves that are not straight lines."""
+    return type(curve).__name__ in CURVED
+
+
+def canonical_normal(nx, ny, nz, eps=1.0e-9):
+    """Normal flipped into a fixed hemisphere, so an arc and its reversed
+    copy share a plane. :return: ((nx, ny, nz), flipped)"""
+    flip = nz < -eps or (abs(nz) <= eps and (ny < -eps or (abs(ny) <= eps and nx < 0.0)))
+    if flip:
+        return (-nx, -ny, -nz), True
+    return (nx, ny, nz), False
+
+
+def plane_frame(nx, ny, nz):
+    """Unit vectors (u, v) of the plane with normal n, with u x v = n.
+    Always built the same way for the same normal, so angles measured in
+    it are comparable; for n = +Z it is the global X / Y."""
+    rx, ry, rz = (1.0, 0.0, 0.0) if abs(nx) < 0.9 else (0.0, 1.0, 0.0)
+    d = rx * nx + ry * ny + rz * nz
+    ux, uy, uz = rx - d * nx, ry - d * ny, rz - d * nz
+    length = math.sqrt(ux * ux + uy * uy + uz * uz)
+    ux, uy, uz = ux / length, uy / length, uz / length
+    return (ux, uy, uz), (ny * uz - nz * uy, nz * ux - nx * uz, nx * uy - ny * ux)
+
+
+# ╔═╗╦  ╔═╗╔═╗╔═╗╔═╗╔═╗
+# ║  ║  ╠═╣╚═╗╚═╗║╣ ╚═╗
+# ╚═╝╩═╝╩ ╩╚═╝╚═╝╚═╝╚═╝ CLASSES
+#==================================================
+class _Snapshot(object):
+    """Float columns named in COLUMNS plus, per row:
+    ids    - ElementId values
+    style  - GraphicsStyle id values of the LineStyle (NO_ID if none)
+    detail - 1 for view-specific (detail) curves, 0 for model curves"""
+    COLUMNS = ()
+
+    def __init__(self):
+        for name in self.COLUMNS:
+            setattr(self, name, array('d'))
+        self.ids    = array(ID_TYPECODE)
+        self.style  = array(ID_TYPECODE)
+        self.detail = array('b')
+        self._row   = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def cols(self):
+        """Float columns in the order the engines expect."""
+        return tuple(getattr(self, name) for name in self.COLUMNS)
+
+    def _append_row(self, element_id, values, style_id, detail):
+        for col, value in zip(self.cols, values):
+            col.append(value)
+        self.ids.append(element_id)
+        self.style.append(style_id)
+        self.detail.append(1 if detail else 0)
+        self._row = None
+
+    def append_row(self, other, i):
+        """Copy row i of another snapshot of the same kind."""
+        self._append_row(other.ids[i], [col[i] for col in other.cols], other.style[i], other.detail[i])
+
+    def row(self, element_id):
+        """Row index of an element id value (None if not in the snapshot)."""
+        if self._row is None:
+            self._row = dict((eid, i) for i, eid in enumerate(self.ids))
+        return self._row.get(element_id)
+
+    def partition(self):
+        """Rows split by (style id, detail flag): {(style, detail): [rows]}.
+        Merging inside a partition never crosses line styles or mixes
+        detail and model curves."""
+        parts = {}
+        style, detail = self.style, self.detail
+        for i in range(len(self.ids)):
+            key = (style[i], detail[i])
+            rows = parts.get(key)
+            if rows is None:
+                rows = parts[key] = []
+            rows.append(i)
+        return parts
+
+    @staticmethod
+    def _read_style(el):
+        try:
+            style_id = id_value(el.LineStyle.Id)
+        except:
+            style_id = NO_ID
+        return style_id, bool(getattr(el, "ViewSpecific", False))
+
+    def nbytes(self):
+        """Memory held by the columns."""
+        return sum(col.itemsize * len(col) for col in self.cols + (self.ids, self.style, self.detail))
+
+
+class CurveSnapshot(_Snapshot):
+    """One row per curve, by its end points (feet):
+    x0, y0, z0, x1, y1, z1"""
+    COLUMNS = ("x0", "y0", "z0", "x1", "y1", "z1")
+
+    def append(self, element_id, p0, p1, style_id=NO_ID, detail=0):
+        """Add one row. p0 / p1 are (x, y, z) tuples."""
+        self.x0.append(p0[0]); self.y0.append(p0[1]); self.z0.append(p0[2])
+        self.x1.append(p1[0]); self.y1.append(p1[1]); self.z1.append(p1[2])
+        self.ids.append(element_id)
+        self.style.append(style_id)
+        self.detail.append(1 if detail else 0)
+        self._row = None
+
+    @property
+    def cols(self):
+        """Endpoint columns in the order the engines expect."""
+        return self.x0, self.y0, self.z0, self.x1, self.y1, self.z1
+
+    def start(self, i):
+        return self.x0[i], self.y0[i], self.z0[i]
+
+    def end(self, i):
+        return self.x1[i], self.y1[i], self.z1[i]
+
+    @classmethod
+    def from_elements(cls, elements, lines_only=False):
+        """Read GeometryCurve endpoints and LineStyle of each element once.
+        Elements without a readable curve are skipped, and so are arcs and
+        splines with lines_only (their chord is not the curve).
+        Topology and gap checks only need end points and keep them all."""
+        snap = cls()
+        for el in elements:
+            try:
+                crv = el.GeometryCurve
+                if crv is None or (lines_only and is_curved(crv)):
+                    continue
+                p0 = crv.GetEndPoint(0)
+                p1 = crv.GetEndPoint(1)
+            except:
+                continue
+            style_id, detail = cls._read_style(el)
+            snap.append(id_value(el.Id), (p0.X, p0.Y, p0.Z), (p1.X, p1.Y, p1.Z), style_id, detail)
+        return snap
+
+
+class ArcSnapshot(_Snapshot):
+    """One row per circular arc:
+    cx, cy, cz - centre (feet)
+    nx, ny, nz - unit normal, flipped into a fixed hemisphere (canonical_normal)
+    r          - radius (feet)
+    a0, a1     - counter-clockwise angular interval around n, measured in
+                 plane_frame(n); 0 <= a0 < 2pi and a0 < a1 < a0 + 2pi"""
+    COLUMNS = ("cx", "cy", "cz", "nx", "ny", "nz", "r", "a0", "a1")
+
+    def append(self, element_id, center, normal, radius, p0, p1, style_id=NO_ID, detail=0):
+        """Add one arc running counter-clockwise around `normal` from p0 to p1."""
+        (nx, ny, nz), flipped = canonical_normal(*normal)
+        if flipped:
+            p0, p1 = p1, p0
+        (ux, uy, uz), (vx, vy, vz) = plane_frame(nx, ny, nz)
+        angles = []
+        for p in (p0, p1):
+            dx, dy, dz = p[0] - center[0], p[1] - center[1], p[2] - center[2]
+            angles.append(math.atan2(dx * vx + dy * vy + dz * vz, dx * ux + dy * uy + dz * uz) % TWO_PI)
+        a0, a1 = angles
+        if a1 <= a0:
+            a1 += TWO_PI
+        self._append_row(element_id, (center[0], center[1], center[2], nx, ny, nz, radius, a0, a1), style_id, detail)
+
+    def point(self, i, angle):
+        """Point of arc i's circle at `angle`."""
+        (ux, uy, uz), (vx, vy, vz) = plane_frame(self.nx[i], self.ny[i], self.nz[i])
+        c, s, r = math.cos(angle), math.sin(angle), self.r[i]
+        return (self.cx[i] + r * (c * ux + s * vx),
+                self.cy[i] + r * (c * uy + s * vy),
+                self.cz[i] + r * (c * uz + s * vz))
+
+    def start(self, i):
+        return self.point(i, self.a0[i])
+
+    def end(self, i):
+        return self.point(i, self.a1[i])
+
+    @classmethod
+    def from_elements(cls, elements):
+        """Read centre, normal, radius and end points of every circular arc once.
+        Lines, ellipses, splines and closed circles are skipped."""
+        snap = cls()
+        for el in elements:
+            try:
+                crv = el.GeometryCurve
+                if crv is None or type(crv).__name__ != "Arc" or not crv.IsBound:
+                    continue
+                c, n = crv.Center, crv.Normal
+                p0, p1 = crv.GetEndPoint(0), crv.GetEndPoint(1)
+                radius = crv.Radius
+            except:
+                continue
+            style_id, detail = cls._read_style(el)
+            snap.append(id_value(el.Id), (c.X, c.Y, c.Z), (n.X, n.Y, n.Z), radius,
+                        (p0.X, p0.Y, p0.Z), (p1.X, p1.Y, p1.Z), style_id, detail)
+        return snap
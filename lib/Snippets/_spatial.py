@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""Pure-Python spatial indexes shared by the line and floor tools.
+Everything here works on plain floats (Revit internal units = feet),
+so it runs the same under IronPython, CPython and outside of Revit."""
+# ╦╔╦╗╔═╗╔═╗╦═╗╔╦╗╔═╗
+# ║║║║╠═╝║ ║╠╦╝ ║ ╚═╗
+# ╩╩ ╩╩  ╚═╝╩╚═ ╩ ╚═╝ IMPORTS
+#==================================================
+import math
+
+# ╦  ╦╔═╗╦═╗╦╔═╗╔╗ ╦  ╔═╗╔═╗
+# ╚╗╔╝╠═╣╠╦╝║╠═╣╠╩╗║  ║╣ ╚═╗
+#  ╚╝ ╩ ╩╩╚═╩╩ ╩╚═╝╩═╝╚═╝╚═╝ VARIABLES
+#==================================================
+TOLERANCE = 1.0e-6      # feet. Two endpoints closer than this are "touching".
+
+# ╔═╗╦  ╔═╗╔═╗╔═╗╔═╗╔═╗
+# ║  ║  ╠═╣╚═╗╚═╗║╣ ╚═╗
+# ╚═╝╩═╝╩ ╩╚═╝╚═╝╚═╝╚═╝ CLASSES
+#==================================================
+class EndpointIndex(object):
+    """Uniform grid over points, keyed by tolerance-quantized (X, Y).
+    The cell size equals the tolerance, so every point within tolerance
+    of a query lies in the 3x3 block of cells around it.
+    Items are stored as (x, y, z, item); item is usually an endpoint id
+    (2 * segment_index + end)."""
+
+    def __init__(self, tolerance=TOLERANCE):
+        self.tolerance = float(tolerance)
+        self._inv      = 1.0 / self.tolerance
+        self._cells    = {}
+        self.count     = 0
+
+    def _key(self, x, y):
+        return int(math.floor(x * self._inv)), int(math.floor(y * self._inv))
+
+    def insert(self, x, y, z, item):
+        key  = self._key(x, y)
+        cell = self._cells.get(key)
+        if cell is None:
+            cell = self._cells[key] = []
+        cell.append((x, y, z, item))
+        self.count += 1
+
+    def remove(self, x, y, item):
+        """Remove an item that was inserted at (x, y). Returns True if found."""
+        cell = self._cells.get(self._key(x, y))
+        if not cell:
+            return False
+        for k, entry in enumerate(cell):
+            if entry[3] == item:
+                del cell[k]
+                if not cell:
+                    del self._cells[self._key(x, y)]
+                self.count -= 1
+                return True
+        return False
+
+    def query(self, x, y, z, tolerance=None):
+        """Items within tolerance (3D distance) of (x, y, z)."""
+        tol = self.tolerance if tolerance is None else float(tolerance)
+        tol2 = tol * tol
+        if tol <= self.tolerance:
+            reach = 1
+        else:
+            reach = int(math.ceil(tol * self._inv))
+        kx, ky = self._key(x, y)
+        cells  = self._cells
+        found  = []
+        for ix in range(kx - reach, kx + reach + 1):
+            for iy in range(ky - reach, ky + reach + 1):
+                cell = cells.get((ix, iy))
+                if not cell:
+                    continue
+                for px, py, pz, item in cell:
+                    dx = px - x; dy = py - y; dz = pz - z
+                    if dx * dx + dy * dy + dz * dz <= tol2:
+                        found.append(item)
+        return found
+
+    def nearest(self, x, y, z, k=1, max_distance=None, skip=None):
+        """Up to k items closest to (x, y, z), as sorted (distance, item) tuples.
+        Only items within max_distance (default: the cell size) are returned,
+        so the search never leaves the surrounding block of cells.
+        :param skip: optional callable(item) -> True to ignore an item."""
+        max_distance = self.tolerance if max_distance is None else float(max_distance)
+        reach  = max(1, int(math.ceil(max_distance * self._inv)))
+        limit2 = max_distance * max_distance
+        kx, ky = self._key(x, y)
+        cells  = self._cells
+        found  = []
+        for ix in range(kx - reach, kx + reach + 1):
+            for iy in range(ky - reach, ky + reach + 1):
+                cell = cells.get((ix, iy))
+                if not cell:
+                    continue
+                for px, py, pz, item in cell:
+                    if skip is not None and skip(item):
+                        continue
+                    dx = px - x; dy = py - y; dz = pz - z
+                    d2 = dx * dx + dy * dy + dz * dz
+                    if d2 <= limit2:
+                        found.append((d2, item))
+        found.sort(key=lambda entry: entry[0])
+        return [(math.sqrt(d2), item) for d2, item in found[:k]]
+
+    @classmethod
+    def from_segments(cls, x0, y0, z0, x1, y1, z1, tolerance=TOLERANCE, indices=None):
+        """Index both endpoints of every segment given as coordinate columns.
+        Endpoint id = 2 * i for the start point, 2 * i + 1 for the end point."""
+        index = cls(tolerance)
+        if indices is None:
+            indices = range(len(x0))
+        for i in indices:
+            index.insert(x0[i], y0[i], z0[i], 2 * i)
+            index.insert(x1[i], y1[i], z1[i], 2 * i + 1)
+        return index
+
+
+class SegmentGrid(object):
+    """Uniform grid over 2D segments: every segment is registered in each
+    cell its bounding box covers. With the cell size near the typical
+    segment length a point query touches O(1) segments on average."""
+
+    def __init__(self, cell_size):
+        self.cell_size = float(cell_size)
+        self._inv      = 1.0 / self.cell_size
+        self._cells    = {}
+
+    def _key(self, x, y):
+        return int(math.floor(x * self._inv)), int(math.floor(y * self._inv))
+
+    def insert(self, x0, y0, x1, y1, item, pad=0.0):
+        ax, ay = self._key(min(x0, x1) - pad, min(y0, y1) - pad)
+        bx, by = self._key(max(x0, x1) + pad, max(y0, y1) + pad)
+        cells  = self._cells
+        for ix in range(ax, bx + 1):
+            for iy in range(ay, by + 1):
+                cell = cells.get((ix, iy))
+                if cell is None:
+                    cell = cells[(ix, iy)] = []
+                cell.append(item)
+
+    def candidates(self, x, y):
+        """Items registered in the cell holding (x, y)."""
+        return self._cells.get(self._key(x, y), ())
+
+    def to_columns(self):
+        """Flat form of the grid: (cell x keys, cell y keys, offsets, items);
+        the items of cell k are items[offsets[k]:offsets[k + 1]]."""
+        kx, ky, offsets, items = [], [], [0], []
+        for (ix, iy), cell in self._cells.items():
+            kx.append(ix); ky.append(iy)
+            items.extend(cell)
+            offsets.append(len(items))
+        return kx, ky, offsets, items
+
+    @classmethod
+    def from_columns(cls, cell_size, kx, ky, offsets, items):
+        """Grid rebuilt from to_columns() output without re-registering anything."""
+        grid = cls(cell_size)
+        grid._cells = dict(((kx[k], ky[k]), items[offsets[k]:offsets[k + 1]]) for k in range(len(kx)))
+        return grid
+
+    @classmethod
+    def from_segments(cls, x0, y0, z0, x1, y1, z1, cell_size=None, pad=TOLERANCE, indices=None):
+        """Register segments by index. Default cell size = mean segment length."""
+        if indices is None:
+            indices = range(len(x0))
+        if cell_size is None:
+            total = sum(math.hypot(x1[i] - x0[i], y1[i] - y0[i]) for i in indices)
+            cell_size = max(total / max(len(indices), 1), 100 * pad, TOLERANCE)
+        grid = cls(cell_size)
+        for i in indices:
+            grid.insert(x0[i], y0[i], x1[i], y1[i], i, pad)
+        return grid
+
+
+class PointTree(object):
+    """Static 2D KD-tree over points for nearest-neighbour queries.
+    The tree is implicit: points are reordered so that every subrange
+    [lo, hi) has its splitting point at the middle, splitting on X and Y
+    by turns. Nothing but three flat lists is stored, and a query walks
+    an explicit stack (no recursion), visiting O(log n) nodes on average."""
+
+    LEAF = 8                # ranges this small are scanned directly
+
+    def __init__(self, xs, ys, items=None):
+        order = list(range(len(xs)))
+        stack = [(0, len(order), 0)]
+        while stack:
+            lo, hi, axis = stack.pop()
+            if hi - lo <= self.LEAF:
+                continue
+            coord = xs if axis == 0 else ys
+            order[lo:hi] = sorted(order[lo:hi], key=coord.__getitem__)
+            mid = (lo + hi) // 2
+            stack.append((lo, mid, 1 - axis))
+            stack.append((mid + 1, hi, 1 - axis))
+        self.xs    = [xs[i] for i in order]
+        self.ys    = [ys[i] for i in order]
+        self.items = order if items is None else [items[i] for i in order]
+
+    def __len__(self):
+        return len(self.xs)
+
+    def nearest(self, x, y):
+        """(distance, item) of the point closest to (x, y) in plan, or (inf, None) if empty."""
+        xs, ys, leaf = self.xs, self.ys, self.LEAF
+        best_d2, best = float("inf"), -1
+        stack = [(0, len(xs), 0, 0.0)]
+        while stack:
+            lo, hi, axis, bound2 = stack.pop()
+            if bound2 >= best_d2:
+                continue                            # the whole range is farther than the best
+            if hi - lo <= leaf:
+                for k in range(lo, hi):
+                    dx = xs[k] - x; dy = ys[k] - y
+                    d2 = dx * dx + dy * dy
+                    if d2 < best_d2:
+                        best_d2, best = d2, k
+                continue
+            mid = (lo + hi) // 2
+            dx = xs[mid] - x; dy = ys[mid] - y
+            d2 = dx * dx + dy * dy
+            if d2 < best_d2:
+                best_d2, best = d2, mid
+            diff = -dx if axis == 0 else -dy        # query minus splitting coordinate
+            far2 = diff * diff
+            if diff < 0:
+                stack.append((mid + 1, hi, 1 - axis, far2))
+                stack.append((lo, mid, 1 - axis, 0.0))      # near side is popped first
+            else:
+                stack.append((lo, mid, 1 - axis, far2))
+                stack.append((mid + 1, hi, 1 - axis, 0.0))
+        if best < 0:
+            return float("inf"), None
+        return math.sqrt(best_d2), self.items[best]
+
+    @classmethod
+    def from_xyz(cls, points):
+        """Tree over XYZ-like points (anything with .X, .Y, .Z); item = Z."""
+        return cls([p.X for p in points], [p.Y for p in points], [p.Z for p in points])
+
+
+def point_segment_distance(px, py, ax, ay, bx, by):
+    """(distance, t) from a 2D point to segment a-b; t in [0, 1] along a-b."""
+    dx = bx - ax; dy = by - ay
+    length2 = dx * dx + dy * dy
+    if length2 == 0.0:
+        return math.hypot(px - ax, py - ay), 0.0
+    t = ((px - ax) * dx + (py - ay) * dy) / length2
+    t = 0.0 if t < 0.0 else 1.0 if t > 1.0 else t
+    return math.hypot(px - (ax + t * dx), py - (ay + t * dy)), t
+
+
+# ╔═╗╦ ╦╔╗╔╔═╗╔╦╗╦╔═╗╔╗╔╔═╗
+# ╠╣ ║ ║║║║║   ║ ║║ ║║║║╚═╗
+# ╚  ╚═╝╝╚╝╚═╝ ╩ ╩╚═╝╝╚╝╚═╝ FUNCTIONS
+#==================================================
+def touching_pairs(x0, y0, z0, x1, y1, z1, tolerance=TOLERANCE, index=None, indices=None):
+    """Unique segment pairs (i, j), i < j, sharing an endpoint within tolerance.
+    Runs in near-linear time: every endpoint only looks at its own 3x3 cells.
+    Pass a prebuilt EndpointIndex to reuse it between passes, and indices to
+    restrict the search to a subset of segments."""
+    if indices is None:
+        indices = range(len(x0))
+    if index is None:
+        index = EndpointIndex.from_segments(x0, y0, z0, x1, y1, z1, tolerance, indices)
+    pairs = set()
+    for i in indices:
+        for x, y, z in ((x0[i], y0[i], z0[i]), (x1[i], y1[i], z1[i])):
+            for end_id in index.query(x, y, z, tolerance):
+                j = end_id >> 1
+                if j > i:
+                    pairs.add((i, j))
+    return pairs
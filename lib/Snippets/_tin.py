@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""Triangulated surface (TIN) height lookup.
+Keeps the triangles of a triangulated surface, not only its vertices, and
+returns the barycentric-interpolated Z under any (x, y). Triangles are
+registered in a uniform grid by their plan bounding box, so a query only
+tests the few triangles of one cell. Where several triangles lie over the
+same point (top and bottom of a solid) the highest one wins."""
+# ╦╔╦╗╔═╗╔═╗╦═╗╔╦╗╔═╗
+# ║║║║╠═╝║ ║╠╦╝ ║ ╚═╗
+# ╩╩ ╩╩  ╚═╝╩╚═ ╩ ╚═╝ IMPORTS
+#==================================================
+from Snippets._spatial import SegmentGrid, PointTree
+from Snippets           import _vectorized
+
+# ╦  ╦╔═╗╦═╗╦╔═╗╔╗ ╦  ╔═╗╔═╗
+# ╚╗╔╝╠═╣╠╦╝║╠═╣╠╩╗║  ║╣ ╚═╗
+#  ╚╝ ╩ ╩╩╚═╩╩ ╩╚═╝╩═╝╚═╝╚═╝ VARIABLES
+#==================================================
+EPSILON   = 1.0e-9      # barycentric slack, so points on shared edges are found
+MIN_AREA2 = 1.0e-12     # twice the plan area below which a triangle is vertical
+VECTOR_MIN = 1000       # smaller batches stay on the pure-Python path
+
+# ╔═╗╦  ╔═╗╔═╗╔═╗╔═╗╔═╗
+# ║  ║  ╠═╣╚═╗╚═╗║╣ ╚═╗
+# ╚═╝╩═╝╩ ╩╚═╝╚═╝╚═╝╚═╝ CLASSES
+#==================================================
+class TIN(object):
+    """Vertices as coordinate columns, triangles as three index columns."""
+
+    def __init__(self, xs, ys, zs, ia, ib, ic, cell_size=None, grid=None):
+        self.xs, self.ys, self.zs = xs, ys, zs
+        self._tree   = None
+        self._vector = None         # NumPy forms, built on first large batch
+        self._points = None
+        if grid is not None:
+            # restored from a cache (Snippets._meshcache): already filtered and indexed
+            self.ia, self.ib, self.ic = ia, ib, ic
+            self.grid = grid
+            return
+
+        self.ia, self.ib, self.ic = [], [], []
+        # vertical triangles have no plan area and can't be interpolated
+        for a, b, c in zip(ia, ib, ic):
+            area2 = (xs[b] - xs[a]) * (ys[c] - ys[a]) - (xs[c] - xs[a]) * (ys[b] - ys[a])
+            if abs(area2) > MIN_AREA2:
+                self.ia.append(a); self.ib.append(b); self.ic.append(c)
+
+        if cell_size is None:
+            # mean plan bounding-box size: a triangle covers a handful of cells
+            total = 0.0
+            for a, b, c in zip(self.ia, self.ib, self.ic):
+                total += max(xs[a], xs[b], xs[c]) - min(xs[a], xs[b], xs[c])
+                total += max(ys[a], ys[b], ys[c]) - min(ys[a], ys[b], ys[c])
+            cell_size = max(total / max(2 * len(self.ia), 1), 1.0e-3)
+        self.grid = SegmentGrid(cell_size)
+        for t, (a, b, c) in enumerate(zip(self.ia, self.ib, self.ic)):
+            self.grid.insert(min(xs[a], xs[b], xs[c]), min(ys[a], ys[b], ys[c]),
+                             max(xs[a], xs[b], xs[c]), max(ys[a], ys[b], ys[c]), t, EPSILON)
+
+    def __len__(self):
+        return len(self.ia)
+
+    def bounds(self):
+        """Plan extent (min x, min y, max x, max y) of the vertices."""
+        return min(self.xs), min(self.ys), max(self.xs), max(self.ys)
+
+    def height(self, x, y):
+        """Interpolated Z of the highest triangle over (x, y), or None outside the surface."""
+        xs, ys, zs = self.xs, self.ys, self.zs
+        ia, ib, ic = self.ia, self.ib, self.ic
+        best = None
+        for t in self.grid.candidates(x, y):
+            a, b, c = ia[t], ib[t], ic[t]
+            xa, ya = xs[a], ys[a]
+            e1x = xs[b] - xa; e1y = ys[b] - ya
+            e2x = xs[c] - xa; e2y = ys[c] - ya
+            det = e1x * e2y - e2x * e1y
+            px = x - xa; py = y - ya
+            u = (px * e2y - e2x * py) / det       # weight of b
+            v = (e1x * py - px * e1y) / det       # weight of c
+            if u < -EPSILON or v < -EPSILON or u + v > 1.0 + EPSILON:
+                continue
+            z = zs[a] + u * (zs[b] - zs[a]) + v * (zs[c] - zs[a])
+            if best is None or z > best:
+                best = z
+        return best
+
+    def nearest_vertex_z(self, x, y):
+        """Z of the closest vertex in plan; the KD-tree is built on first use."""
+        if self._tree is None:
+            self._tree = PointTree(self.xs, self.ys, self.zs)
+        return self._tree.nearest(x, y)[1]
+
+    def heights(self, xs, ys, outside=None):
+        """Batch query over coordinate columns. Large batches go through
+        the NumPy backend when it can be imported (CPython engine).
+        :param outside: 'nearest' to fall back to the nearest vertex Z for points
+                        off the surface, otherwise those points get None"""
+        if _vectorized.np is not None and len(xs) >= VECTOR_MIN:
+            return self._vector_heights(xs, ys, outside)
+        height = self.height
+        result = [height(x, y) for x, y in zip(xs, ys)]
+        if outside == "nearest":
+            for k, z in enumerate(result):
+                if z is None:
+                    result[k] = self.nearest_vertex_z(xs[k], ys[k])
+        return result
+
+    def _vector_heights(self, xs, ys, outside):
+        np = _vectorized.np
+        if self._vector is None:
+            self._vector = _vectorized.VectorTIN(self)
+        zs = self._vector.heights(xs, ys)
+        missing = np.flatnonzero(np.isnan(zs))
+        if outside == "nearest" and len(missing):
+            if self._points is None:
+                self._points = _vectorized.VectorPoints(self.xs, self.ys)
+            qx = np.asarray(xs, dtype=np.float64)[missing]
+            qy = np.asarray(ys, dtype=np.float64)[missing]
+            for k, vertex in zip(missing.tolist(), self._points.nearest(qx, qy).tolist()):
+                zs[k] = self.zs[vertex] if vertex >= 0 else self.nearest_vertex_z(xs[k], ys[k])
+        return [None if z != z else z for z in zs.tolist()]       # NaN -> None
+
+    @classmethod
+    def from_meshes(cls, meshes):
+        """TIN from Revit Mesh objects (Face.Triangulate()); vertex indices of
+        each mesh are offset so the meshes share one set of columns."""
+        xs, ys, zs, ia, ib, ic = [], [], [], [], [], []
+        for mesh in meshes:
+            offset = len(xs)
+            for pt in mesh.Vertices:
+                xs.append(pt.X); ys.append(pt.Y); zs.append(pt.Z)
+            for k in range(mesh.NumTriangles):
+                tri = mesh.get_Triangle(k)
+                ia.append(offset + int(tri.get_Index(0)))
+                ib.append(offset + int(tri.get_Index(1)))
+                ic.append(offset + int(tri.get_Index(2)))
+        return cls(xs, ys, zs, ia, ib, ic)
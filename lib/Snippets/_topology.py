@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""Planar topology graph of a line network (room separation lines, detail lines).
+Endpoints are snapped into shared vertices, segments become edges, and the
+graph reports what keeps a boundary from closing: dangling ends, T-junctions
+and open (unclosed) components. Pure Python on CurveSnapshot columns, so it
+can be checked on synthetic segment sets outside of Revit."""
+# ╦╔╦╗╔═╗╔═╗╦═╗╔╦╗╔═╗
+# ║║║║╠═╝║ ║╠╦╝ ║ ╚═╗
+# ╩╩ ╩╩  ╚═╝╩╚═ ╩ ╚═╝ IMPORTS
+#==================================================
+from Snippets._spatial   import EndpointIndex, SegmentGrid, point_segment_distance, TOLERANCE
+from Snippets._unionfind import DisjointSet
+
+# ╔═╗╦  ╔═╗╔═╗╔═╗╔═╗╔═╗
+# ║  ║  ╠═╣╚═╗╚═╗║╣ ╚═╗
+# ╚═╝╩═╝╩ ╩╚═╝╚═╝╚═╝╚═╝ CLASSES
+#==================================================
+class PlanarGraph(object):
+    """Graph of snapped vertices and segment edges.
+    vertices  - list of (x, y, z)
+    edges     - {segment index: (v0, v1)}; zero-length segments are left out
+    incident  - per vertex, the list of segment indices that end there"""
+
+    def __init__(self, cols, tolerance=TOLERANCE):
+        self.cols      = cols
+        self.tolerance = tolerance
+        self.vertices  = []
+        self.edges     = {}
+        self.incident  = []
+        self._t_junctions = None
+
+        # snap endpoints into vertices: first endpoint seen becomes the vertex
+        x0, y0, z0, x1, y1, z1 = cols
+        index = EndpointIndex(tolerance)
+        for i in range(len(x0)):
+            v0 = self._vertex(index, x0[i], y0[i], z0[i])
+            v1 = self._vertex(index, x1[i], y1[i], z1[i])
+            if v0 == v1:
+                continue
+            self.edges[i] = (v0, v1)
+            self.incident[v0].append(i)
+            self.incident[v1].append(i)
+
+    def _vertex(self, index, x, y, z):
+        found = index.query(x, y, z)
+        if found:
+            return found[0]
+        v = len(self.vertices)
+        self.vertices.append((x, y, z))
+        self.incident.append([])
+        index.insert(x, y, z, v)
+        return v
+
+    def degree(self, v):
+        return len(self.incident[v])
+
+    def dangling(self):
+        """Vertices of degree 1, including those that sit on another edge."""
+        return [v for v in range(len(self.vertices)) if len(self.incident[v]) == 1]
+
+    def t_junctions(self):
+        """Degree-1 vertices lying on the interior of another edge: (vertex, segment).
+        Revit does not join these, so they are a common reason for open rooms."""
+        if self._t_junctions is None:
+            x0, y0, z0, x1, y1, z1 = self.cols
+            grid = SegmentGrid.from_segments(*self.cols, pad=self.tolerance, indices=list(self.edges))
+            found = []
+            for v in self.dangling():
+                px, py, pz = self.vertices[v]
+                own = self.incident[v][0]
+                for seg in grid.candidates(px, py):
+                    if seg == own or v in self.edges[seg]:
+                        continue
+                    if abs(z0[seg] - pz) > self.tolerance and abs(z1[seg] - pz) > self.tolerance:
+                        continue
+                    dist, _t = point_segment_distance(px, py, x0[seg], y0[seg], x1[seg], y1[seg])
+                    if dist <= self.tolerance:
+                        found.append((v, seg))
+                        break
+            self._t_junctions = found
+        return self._t_junctions
+
+    def dangling_ends(self):
+        """Degree-1 vertices that are not T-junctions - true loose ends."""
+        on_edge = set(v for v, _ in self.t_junctions())
+        return [v for v in self.dangling() if v not in on_edge]
+
+    def components(self):
+        """Connected components, with T-junctions counted as connections.
+        :return: list of dicts with keys
+                 segments, vertices, open_ends (vertices), cycles (E - V + 1)"""
+        sets = DisjointSet()
+        for v0, v1 in self.edges.values():
+            sets.union(v0, v1)
+        extra = {}
+        for v, seg in self.t_junctions():
+            sets.union(v, self.edges[seg][0])
+            extra[v] = seg
+        loose = set(self.dangling_ends())
+
+        result = {}
+        for seg, (v0, v1) in self.edges.items():
+            comp = result.setdefault(sets.find(v0), {"segments": [], "vertices": set(), "open_ends": [], "links": 0})
+            comp["segments"].append(seg)
+            comp["vertices"].add(v0); comp["vertices"].add(v1)
+        for v in extra:
+            result[sets.find(v)]["links"] += 1
+
+        components = []
+        for comp in result.values():
+            vertices = sorted(comp["vertices"])
+            edges    = len(comp["segments"]) + comp.pop("links")
+            comp["vertices"]  = vertices
+            comp["open_ends"] = [v for v in vertices if v in loose]
+            comp["cycles"]    = edges - len(vertices) + 1
+            components.append(comp)
+        return components
+
+    def open_components(self):
+        """Components with loose ends - boundaries that do not close."""
+        return [c for c in self.components() if c["open_ends"]]
+
+    def summary(self):
+        comps = self.components()
+        return {"segments"   : len(self.edges),
+                "vertices"   : len(self.vertices),
+                "dangling"   : len(self.dangling_ends()),
+                "t_junctions": len(self.t_junctions()),
+                "components" : len(comps),
+                "open"       : sum(1 for c in comps if c["open_ends"]),
+                "closed"     : sum(1 for c in comps if not c["open_ends"] and c["cycles"] > 0)}
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Disjoint-set (union-find) used to build connected components from pairs.
+Items can be any hashable (segment index, ElementId.IntegerValue, ...) and
+can be added at any time, so components grow incrementally without a rebuild."""
+
+# ╔═╗╦  ╔═╗╔═╗╔═╗╔═╗╔═╗
+# ║  ║  ╠═╣╚═╗╚═╗║╣ ╚═╗
+# ╚═╝╩═╝╩ ╩╚═╝╚═╝╚═╝╚═╝ CLASSES
+#==================================================
+class DisjointSet(object):
+    """Union by size with path compression (path halving).
+    Every operation is amortised ~O(1)."""
+
+    def __init__(self, items=()):
+        self._parent = {}
+        self._size   = {}
+        for item in items:
+            self.add(item)
+
+    def __len__(self):
+        return len(self._parent)
+
+    def __contains__(self, item):
+        return item in self._parent
+
+    def add(self, item):
+        """Add item as its own singleton set (no-op if already present)."""
+        if item not in self._parent:
+            self._parent[item] = item
+            self._size[item]   = 1
+
+    def find(self, item):
+        """Root of the set holding item. Unknown items are added first."""
+        parent = self._parent
+        if item not in parent:
+            self.add(item)
+            return item
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a, b):
+        """Merge the sets of a and b. Returns the new root."""
+        ra = self.find(a)
+        rb = self.find(b)
+        if ra == rb:
+            return ra
+        if self._size[ra] < self._size[rb]:
+            ra, rb = rb, ra
+        self._parent[rb] = ra
+        self._size[ra]  += self._size.pop(rb)
+        return ra
+
+    def union_pairs(self, pairs):
+        for a, b in pairs:
+            self.union(a, b)
+        return self
+
+    def connected(self, a, b):
+        return self.find(a) == self.find(b)
+
+    def set_size(self, item):
+        return self._size[self.find(item)]
+
+    def groups(self, min_size=1):
+        """Components as lists of items, keyed by their root."""
+        result = {}
+        for item in self._parent:
+            result.setdefault(self.find(item), []).append(item)
+        return dict((root, members) for root, members in result.items() if len(members) >= min_size)
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""Optional NumPy backend for batch height queries.
+Under pyRevit's CPython engine NumPy may be importable; then the TIN and
+its vertices are held as contiguous float64 arrays and whole batches of
+points are resolved with array operations instead of a Python loop per
+point. Under IronPython `np` is None and the callers (Snippets._tin) keep
+the pure-Python path.
+
+Both indexes are dense cell tables in CSR form: `offsets` has one entry
+per grid cell (+1) and the items of cell c are items[offsets[c]:offsets[c + 1]].
+A batch is expanded into (query, candidate) pairs, tested in one go and
+reduced back to one value per query."""
+# ╦╔╦╗╔═╗╔═╗╦═╗╔╦╗╔═╗
+# ║║║║╠═╝║ ║╠╦╝ ║ ╚═╗
+# ╩╩ ╩╩  ╚═╝╩╚═ ╩ ╚═╝ IMPORTS
+#==================================================
+import math
+
+try:
+    import numpy as np
+except ImportError:         # IronPython, or CPython without NumPy
+    np = None
+
+# ╦  ╦╔═╗╦═╗╦╔═╗╔╗ ╦  ╔═╗╔═╗
+# ╚╗╔╝╠═╣╠╦╝║╠═╣╠╩╗║  ║╣ ╚═╗
+#  ╚╝ ╩ ╩╩╚═╩╩ ╩╚═╝╩═╝╚═╝╚═╝ VARIABLES
+#==================================================
+CHUNK     = 200000      # queries per batch; bounds the size of the pair arrays
+EPSILON   = 1.0e-9      # same barycentric slack as Snippets._tin
+MAX_CELLS = 1 << 24     # dense table limit; the cell size grows to stay below it
+
+# ╔═╗╦  ╔═╗╔═╗╔═╗╔═╗╔═╗
+# ║  ║  ╠═╣╚═╗╚═╗║╣ ╚═╗
+# ╚═╝╩═╝╩ ╩╚═╝╚═╝╚═╝╚═╝ CLASSES
+#==================================================
+class _CellTable(object):
+    """Dense uniform grid over a plan extent, boxes registered in every cell they cover."""
+
+    def __init__(self, x0, y0, x1, y1, cell_size, bx0, by0, bx1, by1):
+        area = max((x1 - x0) * (y1 - y0), 1.0e-12)
+        cell_size = max(cell_size, math.sqrt(area / MAX_CELLS))
+        self.x0, self.y0, self.cell_size = x0, y0, cell_size
+        self.nx = int((x1 - x0) / cell_size) + 1
+        self.ny = int((y1 - y0) / cell_size) + 1
+
+        ax, ay = self.keys(bx0, by0)
+        bx, by = self.keys(bx1, by1)
+        ax = np.clip(ax, 0, self.nx - 1); bx = np.clip(bx, 0, self.nx - 1)
+        ay = np.clip(ay, 0, self.ny - 1); by = np.clip(by, 0, self.ny - 1)
+        sy    = by - ay + 1
+        count = (bx - ax + 1) * sy
+        item  = np.repeat(np.arange(len(count)), count)
+        k     = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+        cell  = (ax[item] + k // sy[item]) * self.ny + ay[item] + k % sy[item]
+
+        order        = np.argsort(cell, kind="stable")
+        self.items   = item[order]
+        self.offsets = np.zeros(self.nx * self.ny + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cell, minlength=self.nx * self.ny), out=self.offsets[1:])
+
+    def keys(self, xs, ys):
+        inv = 1.0 / self.cell_size
+        return (np.floor((xs - self.x0) * inv).astype(np.int64),
+                np.floor((ys - self.y0) * inv).astype(np.int64))
+
+    def pairs(self, ix, iy):
+        """(query index, item) for every item of cell (ix, iy) of every query;
+        cells outside the table are empty."""
+        inside = (ix >= 0) & (ix < self.nx) & (iy >= 0) & (iy < self.ny)
+        cell   = np.where(inside, ix * self.ny + iy, 0)
+        start  = self.offsets[cell]
+        count  = np.where(inside, self.offsets[cell + 1] - start, 0)
+        query  = np.repeat(np.arange(len(ix)), count)
+        k      = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+        return query, self.items[start[query] + k]
+
+
+class VectorTIN(object):
+    """Array form of a Snippets._tin.TIN (any object with its columns)."""
+
+    def __init__(self, tin):
+        xs = np.asarray(tin.xs, dtype=np.float64)
+        ys = np.asarray(tin.ys, dtype=np.float64)
+        zs = np.asarray(tin.zs, dtype=np.float64)
+        a  = np.asarray(tin.ia, dtype=np.int64)
+        b  = np.asarray(tin.ib, dtype=np.int64)
+        c  = np.asarray(tin.ic, dtype=np.int64)
+
+        # per-triangle constants of the barycentric solve
+        self.xa,  self.ya  = xs[a], ys[a]
+        self.e1x, self.e1y = xs[b] - xs[a], ys[b] - ys[a]
+        self.e2x, self.e2y = xs[c] - xs[a], ys[c] - ys[a]
+        self.inv = 1.0 / (self.e1x * self.e2y - self.e2x * self.e1y)
+        self.za, self.dzb, self.dzc = zs[a], zs[b] - zs[a], zs[c] - zs[a]
+
+        tx = np.stack((xs[a], xs[b], xs[c])); ty = np.stack((ys[a], ys[b], ys[c]))
+        self.table = _CellTable(xs.min(), ys.min(), xs.max(), ys.max(), tin.grid.cell_size,
+                                tx.min(axis=0) - EPSILON, ty.min(axis=0) - EPSILON,
+                                tx.max(axis=0) + EPSILON, ty.max(axis=0) + EPSILON)
+
+    def heights(self, xs, ys):
+        """Interpolated Z of the highest triangle over each point; NaN off the surface."""
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        result = np.empty(len(xs))
+        for lo in range(0, len(xs), CHUNK):
+            result[lo:lo + CHUNK] = self._heights(xs[lo:lo + CHUNK], ys[lo:lo + CHUNK])
+        return result
+
+    def _heights(self, xs, ys):
+        query, t = self.table.pairs(*self.table.keys(xs, ys))
+        px = xs[query] - self.xa[t]
+        py = ys[query] - self.ya[t]
+        u  = (px * self.e2y[t] - self.e2x[t] * py) * self.inv[t]
+        v  = (self.e1x[t] * py - px * self.e1y[t]) * self.inv[t]
+        hit = (u >= -EPSILON) & (v >= -EPSILON) & (u + v <= 1.0 + EPSILON)
+        z   = self.za[t] + u * self.dzb[t] + v * self.dzc[t]
+
+        best = np.full(len(xs), -np.inf)
+        np.maximum.at(best, query[hit], z[hit])
+        best[best == -np.inf] = np.nan
+        return best
+
+
+class VectorPoints(object):
+    """Nearest point in plan for batches of queries.
+    Each query scans the 3x3 block of cells around it. Any point outside
+    that block is at least one cell size away, so a best distance within
+    one cell size is exact; the few queries without one are reported as
+    misses for the caller to resolve (Snippets._spatial.PointTree)."""
+
+    def __init__(self, xs, ys):
+        self.xs = np.asarray(xs, dtype=np.float64)
+        self.ys = np.asarray(ys, dtype=np.float64)
+        x0, y0, x1, y1 = self.xs.min(), self.ys.min(), self.xs.max(), self.ys.max()
+        # about two points per cell
+        cell_size  = math.sqrt(max((x1 - x0) * (y1 - y0), 1.0e-12) * 2.0 / max(len(self.xs), 1))
+        self.table = _CellTable(x0, y0, x1, y1, cell_size, self.xs, self.ys, self.xs, self.ys)
+
+    def nearest(self, xs, ys):
+        """Index of the nearest point per query, -1 where the block search can't be sure."""
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        result = np.empty(len(xs), dtype=np.int64)
+        for lo in range(0, len(xs), CHUNK):
+            result[lo:lo + CHUNK] = self._nearest(xs[lo:lo + CHUNK], ys[lo:lo + CHUNK])
+        return result
+
+    def _nearest(self, xs, ys):
+        ix, iy = self.table.keys(xs, ys)
+        queries, items = [], []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                query, item = self.table.pairs(ix + dx, iy + dy)
+                queries.append(query); items.append(item)
+        query = np.concatenate(queries)
+        item  = np.concatenate(items)
+        d2    = (self.xs[item] - xs[query]) ** 2 + (self.ys[item] - ys[query]) ** 2
+
+        best = np.full(len(xs), np.inf)
+        np.minimum.at(best, query, d2)
+
+        result = np.full(len(xs), -1, dtype=np.int64)
+        sure   = (d2 == best[query]) & (d2 <= self.table.cell_size ** 2)
+        result[query[sure]] = item[sure]            # ties: any of the closest
+        return result